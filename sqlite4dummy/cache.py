@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This module implements the optional query result cache used by
+:class:`~sqlite4dummy.engine.Sqlite3Engine`.
+
+The cache is a LRU (least recently used) dictionary, keyed by the compiled
+SQL of a :class:`~sqlite4dummy.schema.Select`, bounded by both the number of
+entries and the approximate memory used by the cached records. Every entry
+remembers which tables the query reads, so a write to a table only drops the
+entries that depend on it.
+
+**中文文档**
+
+:class:`~sqlite4dummy.engine.Sqlite3Engine` 的查询结果缓存。以Select的SQL语句
+为键, 以LRU策略淘汰, 并同时限制缓存条目数和大致的内存占用。每个条目都记录了
+所读取的表, 当某个表被写入时, 只有依赖于该表的缓存会失效。
+
+class, method, func, exception
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+from collections import OrderedDict
+import sys
+
+def estimate_size(records, limit=None):
+    """Estimate how many bytes a list of records takes in memory.
+
+    Stop counting as soon as the size exceeds ``limit``.
+
+    **中文文档**
+
+    估算一组record所占用的内存字节数。超过 ``limit`` 时提前终止。
+    """
+    size = sys.getsizeof(records)
+    for record in records:
+        size += sys.getsizeof(record)
+        for value in record:
+            size += sys.getsizeof(value)
+        if limit is not None and size > limit:
+            break
+    return size
+
+class ResultCache(object):
+    """LRU query result cache with table-level invalidation.
+
+    :param max_entries: maximum number of cached queries.
+    :type max_entries: int
+
+    :param max_bytes: maximum approximate bytes of all cached records.
+    :type max_bytes: int
+
+    **中文文档**
+
+    带有表级失效机制的LRU查询结果缓存。
+    """
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() # key: (records, table_names, nbytes)
+        self.keys_by_table = dict() # table_name: set of key
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """Return cached records of ``key``, or None if not cached.
+
+        **中文文档**
+
+        返回缓存的结果, 若不存在则返回None。命中的条目会被标记为最近使用。
+        """
+        try:
+            entry = self.entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self.entries[key] = entry # mark as most recently used
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, records, table_names, nbytes=None):
+        """Cache ``records`` under ``key``. ``table_names`` are the tables the
+        query reads. Result larger than ``max_bytes`` are not cached. 
+        ``nbytes`` is the estimated size if it is already known.
+
+        **中文文档**
+
+        缓存查询结果。``table_names`` 是该查询所读取的所有表。大于
+        ``max_bytes`` 的结果不会被缓存。
+        """
+        if nbytes is None:
+            nbytes = estimate_size(records, limit=self.max_bytes)
+        if nbytes > self.max_bytes:
+            return
+
+        if key in self.entries:
+            self._remove(key)
+
+        self.entries[key] = (records, table_names, nbytes)
+        self.nbytes += nbytes
+        for table_name in table_names:
+            self.keys_by_table.setdefault(table_name, set()).add(key)
+
+        # evict least recently used entries
+        while (len(self.entries) > self.max_entries) or \
+            (self.nbytes > self.max_bytes):
+            self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        """Remove one entry.
+        """
+        _, table_names, nbytes = self.entries.pop(key)
+        self.nbytes -= nbytes
+        for table_name in table_names:
+            keys = self.keys_by_table.get(table_name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.keys_by_table[table_name]
+
+    def invalidate(self, table_name):
+        """Drop all cached queries that read ``table_name``.
+
+        **中文文档**
+
+        删除所有读取了该表的缓存。
+        """
+        for key in self.keys_by_table.pop(table_name, set()):
+            if key in self.entries:
+                self._remove(key)
+
+    def clear(self):
+        """Drop everything, ``hits`` and ``misses`` are reset as well, so 
+        they never count the lookups of invalidated entries.
+
+        **中文文档**
+
+        清空缓存, ``hits`` 和 ``misses`` 计数也被清零。
+        """
+        self.entries.clear()
+        self.keys_by_table.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+if __name__ == "__main__":
+    import unittest
+
+    class ResultCacheUnittest(unittest.TestCase):
+        def test_lru(self):
+            cache = ResultCache(max_entries=2)
+            cache.put("a", [(1,)], {"t1"})
+            cache.put("b", [(2,)], {"t2"})
+            cache.get("a")
+            cache.put("c", [(3,)], {"t2"})
+            self.assertTrue("a" in cache)
+            self.assertFalse("b" in cache)
+
+        def test_invalidate(self):
+            cache = ResultCache()
+            cache.put("a", [(1,)], {"t1", "t2"})
+            cache.put("b", [(2,)], {"t2"})
+            cache.invalidate("t1")
+            self.assertFalse("a" in cache)
+            self.assertTrue("b" in cache)
+
+        def test_clear(self):
+            cache = ResultCache()
+            cache.put("a", [(1,)], {"t1"})
+            cache.get("a")
+            cache.get("b")
+            cache.clear()
+            self.assertEqual((len(cache), cache.nbytes), (0, 0))
+            self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+        def test_max_bytes(self):
+            cache = ResultCache(max_bytes=1024)
+            cache.put("a", [(i,) for i in range(1000)], {"t1"})
+            self.assertEqual(len(cache), 0)
+
+    unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This module implements the optional insert time type coercion used by
+:class:`~sqlite4dummy.engine.Sqlite3Engine`.
+
+A :class:`Coercer` is compiled once from a :class:`~sqlite4dummy.schema.Table`.
+For every record it fills in the column ``default`` for None value, enforces
+``nullable=False`` and converts the value with ``Column.data_type.coerce``, all
+in one pass. A record that can not be coerced raises :class:`CoerceError`.
+
+**中文文档**
+
+:class:`~sqlite4dummy.engine.Sqlite3Engine` 在插入数据时可选的类型转换功能。
+:class:`Coercer` 根据Table的定义编译一次, 然后对每条记录一次性完成: 用默认值
+填充None, 检查NOT NULL约束, 以及用 ``Column.data_type.coerce`` 转换数据类型。
+无法转换的记录会抛出 :class:`CoerceError` 异常。
+
+class, method, func, exception
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+try:
+    from sqlite4dummy.row import Row
+except ImportError:
+    from .row import Row
+
+class CoerceError(ValueError):
+    """Raised when a record doesn't match the table schema.
+    """
+    pass
+
+class Coercer(object):
+    """Compiled per table record/row coercer.
+
+    :param table: :class:`~sqlite4dummy.schema.Table` object.
+
+    **中文文档**
+
+    根据Table的定义编译的数据类型转换器。
+    """
+    def __init__(self, table):
+        self.table = table
+        self.steps = list() # (column_name, coerce, default, nullable)
+        for column in table.all:
+            # INTEGER PRIMARY KEY accept None, sqlite3 assigns the rowid
+            nullable = column.nullable or (column.primary_key and \
+                column.data_type.sqlite_name == "INTEGER")
+            self.steps.append((column.column_name, column.data_type.coerce,
+                               column.default, nullable))
+        self.steps_by_name = dict(
+            [(step[0], step) for step in self.steps])
+        self.required = [step[0] for step in self.steps \
+                         if (not step[3]) and (step[2] is None)]
+
+    def _coerce(self, steps, values):
+        new_values = list()
+        for (column_name, coerce, default, nullable), value in zip(
+            steps, values):
+            if value is None:
+                value = default
+                if value is None:
+                    if not nullable:
+                        raise CoerceError(
+                            "column '%s' is NOT NULL" % column_name)
+                    new_values.append(None)
+                    continue
+            try:
+                new_values.append(coerce(value))
+            except (ValueError, TypeError) as e:
+                raise CoerceError("column '%s': %s" % (column_name, e))
+        return new_values
+
+    def coerce_record(self, record):
+        """Coerce a tuple or list record, returns a new list.
+
+        **中文文档**
+
+        转换一条tuple或list记录, 返回新的list。
+        """
+        try:
+            n_values = len(record)
+        except TypeError:
+            raise CoerceError("%r is not a record" % (record,))
+        if n_values != len(self.steps):
+            raise CoerceError("expect %s values, got %s" % (
+                len(self.steps), n_values))
+        return self._coerce(self.steps, record)
+
+    def coerce_row(self, row):
+        """Coerce a :class:`~sqlite4dummy.row.Row`, returns a new Row. Missing
+        NOT NULL column without default is rejected.
+
+        **中文文档**
+
+        转换一个Row对象, 返回新的Row。缺少了没有默认值的NOT NULL列时拒绝。
+        """
+        try:
+            steps = [self.steps_by_name[name] for name in row.columns]
+        except KeyError as e:
+            raise CoerceError("unknown column %s" % e)
+        for column_name in self.required:
+            if column_name not in row.columns:
+                raise CoerceError("column '%s' is NOT NULL" % column_name)
+        return Row(row.columns, self._coerce(steps, row.values))
+
+    def coerce_dict(self, dictionary):
+        """Coerce a dict, returns a new dict of all columns. Missing key is 
+        treated as None.
+
+        **中文文档**
+
+        转换一个字典, 返回包含所有列的新字典。缺失的键视为None。
+        """
+        new_dict = dict()
+        try:
+            values = [dictionary.get(step[0]) for step in self.steps]
+        except AttributeError:
+            raise CoerceError("%r is not a dict" % (dictionary,))
+        for step, value in zip(self.steps, self._coerce(self.steps, values)):
+            new_dict[step[0]] = value
+        return new_dict
+
+    def _filter(self, coerce, items, error_sink):
+        for item in items:
+            try:
+                yield coerce(item)
+            except CoerceError as e:
+                if error_sink is not None:
+                    error_sink(item, e)
+
+    def filter_records(self, records, error_sink):
+        """Yield coerced records, call ``error_sink(record, exception)`` for
+        every rejected one. If ``error_sink`` is None, rejected records are
+        silently skipped.
+
+        **中文文档**
+
+        逐条转换并返回记录, 被拒绝的记录会被传给 ``error_sink(record, 异常)``。
+        ``error_sink`` 为None时, 被拒绝的记录直接被跳过。
+        """
+        return self._filter(self.coerce_record, records, error_sink)
+
+    def filter_rows(self, rows, error_sink):
+        """Row version of :meth:`Coercer.filter_records`.
+
+        **中文文档**
+
+        :meth:`Coercer.filter_records` 的Row版本。
+        """
+        return self._filter(self.coerce_row, rows, error_sink)
+
+    def filter_dicts(self, dicts, error_sink):
+        """dict version of :meth:`Coercer.filter_records`.
+
+        **中文文档**
+
+        :meth:`Coercer.filter_records` 的字典版本。
+        """
+        return self._filter(self.coerce_dict, dicts, error_sink)
@@ -20,6 +20,8 @@ sqlite3中所支持的, 以及我们常用到的数据类型有:
 - :class:`PICKLETYPE`: 任意 
   `pickable <https://docs.python.org/2/library/pickle.html#what-can-be-pickled-and-unpickled>`_ 
   的Python对象。
+- :class:`INTDATE`: 日期, 以整数序数 (date.toordinal()) 储存
+- :class:`INTDATETIME`: 日期时间, 以整数 (epoch起的微秒数) 储存
 
 由于我们定义了一个这些所有 :class:`DataType` 的实例, 所以访问这些数据类型是, 可以
 直接使用::
@@ -35,13 +37,43 @@ class, method, func, exception
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 """
 try:
-    from sqlite4dummy.pycompatible import PK_PROTOCOL, is_py3 
+    from sqlite4dummy.pycompatible import PK_PROTOCOL, is_py3, _str_type
 except:
-    from .pycompatible import PK_PROTOCOL, is_py3
+    from .pycompatible import PK_PROTOCOL, is_py3, _str_type
 
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+import numbers
 import binascii
 import pickle
+import json
+
+def _coerce_date(value):
+    """Convert date, datetime or "%Y-%m-%d" string to date.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    elif isinstance(value, date):
+        return value
+    elif isinstance(value, _str_type):
+        return datetime.strptime(value.strip()[:10], "%Y-%m-%d").date()
+    raise TypeError("%r is not a date" % (value,))
+
+def _coerce_datetime(value):
+    """Convert datetime, date or ISO format string to datetime.
+    """
+    if isinstance(value, datetime):
+        return value
+    elif isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    elif isinstance(value, _str_type):
+        text = value.strip().replace("T", " ")
+        for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+            try:
+                return datetime.strptime(text, fmt)
+            except ValueError:
+                pass
+        raise ValueError("%r is not a datetime string" % (value,))
+    raise TypeError("%r is not a datetime" % (value,))
 
 class BaseDataType():
     """DataType Base Class.
@@ -50,6 +82,11 @@ class BaseDataType():
     
     所有数据类型的父类。
     """
+    #: Python object => sqlite3 value function, None means no conversion.
+    adapt = None
+    #: sqlite3 value => Python object function, None means no conversion.
+    convert = None
+    
     def __init__(self):
         self.name = self.__class__.__name__
         
@@ -87,6 +124,36 @@ class BaseDataType():
             return None
         return eval(text)
     
+    def coerce(self, value):
+        """Convert Python object to the Python type of this data type, raise
+        ValueError or TypeError if not possible. Never receives None.
+        
+        **中文文档**
+        
+        将任意Python对象转化成该数据类型所对应的Python类型。无法转化时抛出
+        ValueError或TypeError异常。None值不会被传入。
+        """
+        return value
+    
+    def from_text(self, text):
+        """Convert a text field, from csv file for example, to Python object.
+        
+        **中文文档**
+        
+        将文本字段 (例如csv文件中的字段) 转化成Python对象。
+        """
+        return self.coerce(text)
+    
+    def to_text(self, value):
+        """Convert Python object to text field, reverse of 
+        :meth:`~BaseDataType.from_text`.
+        
+        **中文文档**
+        
+        将Python对象转化成文本字段, 是 :meth:`~BaseDataType.from_text` 的逆操作。
+        """
+        return str(value)
+    
 # sqlite3 built-in data type
 
 class TEXT(BaseDataType):
@@ -105,6 +172,18 @@ class TEXT(BaseDataType):
         else:
             return text[1:-1].replace("''", "'")
         
+    def coerce(self, value):
+        if isinstance(value, _str_type):
+            return value
+        elif isinstance(value, bytes):
+            return value.decode("utf-8")
+        elif isinstance(value, (numbers.Number, date)):
+            return str(value)
+        raise TypeError("%r is not a text" % (value,))
+    
+    def to_text(self, value):
+        return value
+        
 class INTEGER(BaseDataType):
     """Integer type.
     """
@@ -121,6 +200,17 @@ class INTEGER(BaseDataType):
         else:
             return int(text)
         
+    def coerce(self, value):
+        if isinstance(value, numbers.Integral):
+            return int(value)
+        elif isinstance(value, numbers.Real):
+            if float(value).is_integer():
+                return int(value)
+            raise ValueError("%r is not an integer" % (value,))
+        elif isinstance(value, _str_type):
+            return int(value)
+        raise TypeError("%r is not an integer" % (value,))
+        
 class REAL(BaseDataType):
     """Float type.
     """
@@ -130,6 +220,9 @@ class REAL(BaseDataType):
         """Convert Python object to SQL naive statement.
         """
         return str(float_)
+    
+    def to_text(self, value):
+        return repr(value)
 
     def from_sql_param(self, text):
         """Convert Sql Quote text to Python object.
@@ -139,6 +232,11 @@ class REAL(BaseDataType):
         else:
             return float(text)
         
+    def coerce(self, value):
+        if isinstance(value, (numbers.Real, _str_type)):
+            return float(value)
+        raise TypeError("%r is not a real number" % (value,))
+        
 class BLOB(BaseDataType):
     """Binary type.
     """
@@ -155,6 +253,23 @@ class BLOB(BaseDataType):
         if text is None:
             return None
         return binascii.unhexlify(text[2:-1])
+    
+    def coerce(self, value):
+        if isinstance(value, bytes):
+            return value
+        elif isinstance(value, (bytearray, memoryview)):
+            return bytes(value)
+        raise TypeError("%r is not bytes" % (value,))
+    
+    def from_text(self, text):
+        """Hex string to bytes.
+        """
+        return binascii.unhexlify(text)
+    
+    def to_text(self, bytes_):
+        """bytes to hex string.
+        """
+        return binascii.hexlify(bytes_).decode("utf-8")
 
 class DATE(BaseDataType):
     """datetime.date type.
@@ -173,6 +288,9 @@ class DATE(BaseDataType):
             return None
         return datetime.strptime(text, "'%Y-%m-%d'").date() 
     
+    def coerce(self, value):
+        return _coerce_date(value)
+    
 class DATETIME(BaseDataType):
     """datetime.datetime type
     """
@@ -193,6 +311,9 @@ class DATETIME(BaseDataType):
         except:
             return datetime.strptime(text, "'%Y-%m-%d %H:%M:%S.%f'")
     
+    def coerce(self, value):
+        return _coerce_datetime(value)
+    
 class PICKLETYPE(BaseDataType):
     """Any picklable Python objects. 
     
@@ -216,6 +337,106 @@ class PICKLETYPE(BaseDataType):
             return None
         return pickle.loads(binascii.unhexlify(text[2:-1]))
     
+    def from_text(self, text):
+        """JSON string to Python object.
+        """
+        return json.loads(text)
+    
+    def to_text(self, py_obj):
+        """Python object to JSON string.
+        """
+        return json.dumps(py_obj)
+    
+    def adapt(self, py_obj):
+        """Convert Python object to the value stored in sqlite3.
+        """
+        return pickle.dumps(py_obj, protocol=PK_PROTOCOL)
+    
+    def convert(self, bytes_):
+        """Convert the value stored in sqlite3 to Python object.
+        """
+        return pickle.loads(bytes_)
+
+# integer storage of date and datetime
+
+_EPOCH = datetime(1970, 1, 1)
+
+class INTDATE(BaseDataType):
+    """datetime.date type, stored as INTEGER ordinal (``date.toordinal()``).
+    
+    Compared to :class:`DATE`, no string parsing is needed when reading, 
+    storage is more compact and comparison in index is faster.
+    
+    **中文文档**
+    
+    以整数序数储存的日期类型。与 :class:`DATE` 相比, 读取时无需解析字符串,
+    储存更紧凑, 索引比较更快。
+    """
+    sqlite_name = "INTDATE"
+    
+    def to_sql_param(self, date_):
+        """Convert Python object to SQL naive statement.
+        """
+        return str(date_.toordinal())
+    
+    def from_sql_param(self, text):
+        """Convert Sql Quote text to Python object.
+        """
+        if text is None:
+            return None
+        return date.fromordinal(int(text))
+    
+    def adapt(self, date_):
+        """Convert Python object to the value stored in sqlite3.
+        """
+        return date_.toordinal()
+    
+    def convert(self, int_):
+        """Convert the value stored in sqlite3 to Python object.
+        """
+        return date.fromordinal(int_)
+    
+    def coerce(self, value):
+        return _coerce_date(value)
+    
+class INTDATETIME(BaseDataType):
+    """Naive datetime.datetime type, stored as INTEGER microseconds since 
+    1970-01-01 00:00:00.
+    
+    **中文文档**
+    
+    以整数储存的日期时间类型, 值为自1970-01-01 00:00:00起的微秒数。只支持
+    不带时区的datetime。
+    """
+    sqlite_name = "INTDATETIME"
+    
+    def to_sql_param(self, datetime_):
+        """Convert Python object to SQL naive statement.
+        """
+        return str(self.adapt(datetime_))
+    
+    def from_sql_param(self, text):
+        """Convert Sql Quote text to Python object.
+        """
+        if text is None:
+            return None
+        return self.convert(int(text))
+    
+    def adapt(self, datetime_):
+        """Convert Python object to the value stored in sqlite3.
+        """
+        delta = datetime_ - _EPOCH
+        return (delta.days * 86400 + delta.seconds) * 1000000 + \
+            delta.microseconds
+    
+    def convert(self, int_):
+        """Convert the value stored in sqlite3 to Python object.
+        """
+        return _EPOCH + timedelta(microseconds=int_)
+    
+    def coerce(self, value):
+        return _coerce_datetime(value)
+    
 class DataType():
     """A DataType container class. 
     
@@ -234,6 +455,8 @@ class DataType():
         self.DATE = DATE()
         self.DATETIME = DATETIME()
         self.PICKLETYPE = PICKLETYPE()
+        self.INTDATE = INTDATE()
+        self.INTDATETIME = INTDATETIME()
         
     def get_dtype_by_name(self, name):
         """将sqlite3数据库中存储的data type字符串映射成本模组中定义的data type.
@@ -245,6 +468,8 @@ class DataType():
             "BLOB": self.BLOB,
             "DATE": self.DATE,
             "TIMESTAMP": self.DATETIME,
+            "INTDATE": self.INTDATE,
+            "INTDATETIME": self.INTDATETIME,
             }
         return sqlite3_name_map_to_dtype[name]
     
@@ -279,6 +504,54 @@ if __name__ == "__main__":
             self.assertEqual(dtype.get_dtype_by_name("BLOB"), dtype.BLOB)
             self.assertEqual(dtype.get_dtype_by_name("DATE"), dtype.DATE)
             self.assertEqual(dtype.get_dtype_by_name("TIMESTAMP"), dtype.DATETIME)
+            self.assertEqual(dtype.get_dtype_by_name("INTDATE"), dtype.INTDATE)
+            self.assertEqual(dtype.get_dtype_by_name("INTDATETIME"), 
+                             dtype.INTDATETIME)
+        
+        def test_adapt_and_convert(self):
+            date_ = date(2000, 1, 1)
+            datetime_ = datetime(2015, 10, 1, 18, 30, 0, 123456)
+            self.assertEqual(
+                dtype.INTDATE.convert(dtype.INTDATE.adapt(date_)), date_)
+            self.assertEqual(
+                dtype.INTDATETIME.convert(dtype.INTDATETIME.adapt(datetime_)), 
+                datetime_)
+            self.assertEqual(dtype.INTDATETIME.adapt(datetime(1970, 1, 1)), 0)
+            self.assertEqual(
+                dtype.INTDATE.from_sql_param(dtype.INTDATE.to_sql_param(date_)),
+                date_)
+            self.assertEqual(dtype.TEXT.adapt, None)
+        
+        def test_coerce(self):
+            self.assertEqual(dtype.TEXT.coerce(1), "1")
+            self.assertEqual(dtype.INTEGER.coerce("3"), 3)
+            self.assertEqual(dtype.INTEGER.coerce(3.0), 3)
+            self.assertEqual(dtype.INTEGER.coerce(True), 1)
+            self.assertRaises(ValueError, dtype.INTEGER.coerce, 3.5)
+            self.assertRaises(ValueError, dtype.INTEGER.coerce, "abc")
+            self.assertEqual(dtype.REAL.coerce("3.5"), 3.5)
+            self.assertRaises(TypeError, dtype.REAL.coerce, [1])
+            self.assertEqual(dtype.BLOB.coerce(bytearray(b"a")), b"a")
+            self.assertEqual(dtype.DATE.coerce("2000-01-01"), date(2000, 1, 1))
+            self.assertEqual(dtype.DATE.coerce(datetime(2000, 1, 1, 8)), 
+                             date(2000, 1, 1))
+            self.assertEqual(dtype.INTDATETIME.coerce("2000-01-01T08:00:00"), 
+                             datetime(2000, 1, 1, 8))
+            self.assertEqual(dtype.DATETIME.coerce(date(2000, 1, 1)), 
+                             datetime(2000, 1, 1))
+            self.assertEqual(dtype.PICKLETYPE.coerce([1]), [1])
+        
+        def test_from_text(self):
+            self.assertEqual(dtype.INTEGER.from_text("1"), 1)
+            self.assertEqual(dtype.BLOB.from_text("6162"), b"ab")
+            self.assertEqual(dtype.PICKLETYPE.from_text("[1, 2]"), [1, 2])
+            for data_type, value in [
+                    (dtype.TEXT, "a,b"), (dtype.REAL, 0.1), 
+                    (dtype.BLOB, b"ab"), (dtype.DATE, date(2000, 1, 1)),
+                    (dtype.DATETIME, datetime(2000, 1, 1, 8, 30, 0, 1)),
+                    (dtype.PICKLETYPE, {"a": [1]})]:
+                self.assertEqual(
+                    data_type.from_text(data_type.to_text(value)), value)
         
         def test_to_sql_param_and_from_sql_param(self):
             """测试to_sql_param方法使能能将值正确的转换成sql语句。
@@ -56,28 +56,204 @@ except ImportError:
     from .iterate import grouper_list
     
 try:
-    from sqlite4dummy.schema import Select
+    from sqlite4dummy.schema import Select, SelectObjectError
 except ImportError:
-    from .schema import Select
+    from .schema import Select, SelectObjectError
+
+try:
+    from sqlite4dummy.cache import ResultCache, estimate_size
+except ImportError:
+    from .cache import ResultCache, estimate_size
+
+try:
+    from sqlite4dummy.sql import (SQL_Param, over_clause, 
+        _partition_terms, _term_params)
+except ImportError:
+    from .sql import (SQL_Param, over_clause, 
+        _partition_terms, _term_params)
+
+try:
+    from sqlite4dummy.coerce import Coercer
+except ImportError:
+    from .coerce import Coercer
+
+try:
+    from sqlite4dummy.validate import validator
+except ImportError:
+    from .validate import validator
+
+try:
+    from sqlite4dummy.fileio import open_text, infer_compression
+except ImportError:
+    from .fileio import open_text, infer_compression
+
+try:
+    from sqlite4dummy.pycompatible import _str_type
+except ImportError:
+    from .pycompatible import _str_type
 
 from collections import OrderedDict
 from datetime import datetime
+from itertools import groupby, count, chain
+import functools
 import sqlite3
+import json
+import csv
 import pickle
-import logging
 import sys
 import os
 
-try:
-    import pandas as pd
-except ImportError:
-    print("pandas not found, the select_df feature is not able to work.")
+def _invalidate_on_error(method):
+    """Decorator of engine write method. A write may be partially applied
+    before it fails, so drop the result cache and row counts on error.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except:
+            self._clear_caches()
+            raise
+    return wrapper
+
+def _pandas():
+    """Import pandas on first use, it takes hundreds of milliseconds, so
+    ``import sqlite4dummy`` doesn't pay it.
+    """
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("pandas not found, the DataFrame feature is not able"
+                          " to work.")
+    return pandas
+
+def _integer_series(pd, values):
+    """Build nullable Int64 Series. sqlite3 doesn't enforce the column type, 
+    so if the column holds REAL or TEXT values, fall back to float64, then
+    to object.
+    """
+    try:
+        return pd.Series(pd.array(values, dtype="Int64"))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return pd.Series(values, dtype="float64")
+    except (TypeError, ValueError):
+        return pd.Series(values, dtype="object")
+
+def _text_series(pd, values):
+    """Build string Series. Falls back to object if there's any non text 
+    value, e.g. ``func.round()`` is declared as TEXT but returns REAL, 
+    string dtype would turn 1.0 into ``'1.0'``.
+    """
+    for value in values:
+        if (value is not None) and (not isinstance(value, _str_type)):
+            return pd.Series(values, dtype="object")
+    return pd.Series(values, dtype="string")
+
+def _pyarrow():
+    """Import pyarrow, pyarrow.compute and pyarrow.parquet on first use.
+    """
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow not found, the arrow and parquet feature is"
+                          " not able to work.")
+    return pyarrow
 
 if sys.version_info[0] == 3:
     PK_PROTOCOL = 3
 else:
     PK_PROTOCOL = 2
 
+_EPOCH_ORDINAL = 719163 # date(1970, 1, 1).toordinal()
+#: dtype of date and datetime column in DataFrame, same for every chunk
+_DATETIME_DTYPE = "datetime64[us]"
+
+class InsertResult(object):
+    """Result of bulk insert.
+    
+    - ``inserted``: number of records been inserted.
+    - ``ignored``: number of records violate a constraint (IntegrityError), 
+      such as primary key conflict.
+    - ``failed``: number of records can't be inserted for other reason, such 
+      as unsupported data type or rejected by type coercion.
+    - ``failures``: list of (record, exception), only available when 
+      ``keep_failures=True``, otherwise None.
+    
+    **中文文档**
+    
+    批量插入的结果。``inserted`` 为成功插入的条数, ``ignored`` 为违反约束 (例如
+    主键冲突) 而被忽略的条数, ``failed`` 为由于其他原因 (例如数据类型不支持) 
+    而失败的条数。``failures`` 为 (record, 异常) 的列表, 仅在
+    ``keep_failures=True`` 时可用。
+    """
+    def __init__(self, keep_failures=False):
+        self.inserted = 0
+        self.ignored = 0
+        self.failed = 0
+        if keep_failures:
+            self.failures = list()
+        else:
+            self.failures = None
+    
+    def __repr__(self):
+        return "InsertResult(inserted=%s, ignored=%s, failed=%s)" % (
+            self.inserted, self.ignored, self.failed)
+    
+    def add_failure(self, record, exception):
+        """Count one failed record.
+        """
+        self.failed += 1
+        if self.failures is not None:
+            self.failures.append((record, exception))
+    
+    def merge(self, other):
+        """Add up another InsertResult.
+        """
+        self.inserted += other.inserted
+        self.ignored += other.ignored
+        self.failed += other.failed
+        if (self.failures is not None) and (other.failures is not None):
+            self.failures.extend(other.failures)
+        return self
+
+def _is_fatal(exception):
+    """Database level error, such as disk full, locked or malformed, can not 
+    be fixed by skipping the record.
+    """
+    return isinstance(exception, (
+        sqlite3.OperationalError, sqlite3.InternalError)) or \
+        (type(exception) is sqlite3.DatabaseError)
+
+#: conflict options stop at the first bad record, bulk insert skips bad records
+_BULK_UNSUPPORTED_CONFLICT = ("ROLLBACK", "FAIL")
+
+def _check_bulk_conflict(ins_obj):
+    """Bulk insert runs in a SAVEPOINT and replays a failed batch one by 
+    one. ``INSERT OR ROLLBACK`` would rollback the whole transaction (and 
+    the savepoint with it), ``INSERT OR FAIL`` stops at the bad record, 
+    neither works with that.
+    """
+    if ins_obj.conflict in _BULK_UNSUPPORTED_CONFLICT:
+        raise ValueError("bulk insert doesn't support conflict %r, use one "
+            "of ABORT, IGNORE, REPLACE or None." % ins_obj.conflict)
+
+def _column_data_types(table, column_names):
+    """Returns the data types of ``column_names`` in ``table``, raise 
+    ValueError if a column is not in the table.
+    """
+    data_types = list()
+    for column_name in column_names:
+        try:
+            data_types.append(table.get_column(column_name).data_type)
+        except AttributeError:
+            raise ValueError("table '%s' has no column '%s'" % (
+                table.table_name, column_name))
+    return data_types
+
 class PickleTypeConverter(object):
     """High performance PickleType data converter Class.
     
@@ -94,7 +270,8 @@ class PickleTypeConverter(object):
         picklable Python type <-- convert --> bytes
         
     The way I convert it is defined by the schema of the Table. So 
-    :class:`~PickleTypeConverter` takes a :class:`~sqlite4dummy.schema.Table` as
+    :class:`~PickleTypeConverter` takes a :class:`~sqlite4dummy.schema.Table` 
+    (or a :class:`~sqlite4dummy.schema.ResultDescriptor` of a Select) as
     initialize argument. Then we compile the convert method. Once it is done, 
     then we can make use of built-in high performance vectorize function 
     map(func, iterable).
@@ -114,6 +291,17 @@ class PickleTypeConverter(object):
     """
     def __init__(self, table):
         self.table = table
+        # compile (position, function) of columns need data conversion, 
+        # PICKLETYPE, INTDATE, INTDATETIME for example
+        self.adapters = list()
+        self.converters = list()
+        self.adapters_by_name = dict()
+        for i, column in enumerate(table.all):
+            if column.data_type.adapt is not None:
+                self.adapters.append((i, column.data_type.adapt))
+                self.converters.append((i, column.data_type.convert))
+                self.adapters_by_name[column.column_name] = \
+                    column.data_type.adapt
 
     def convert_record(self, record):
         """Covert PickleType value in record tuple to Blob.
@@ -127,17 +315,12 @@ class PickleTypeConverter(object):
         将record中的pickletype的项转化成blob。该方法用于在Insert操作之前对数据
         进行预处理。返回list。
         """
-        if len(self.table.pickletype_columns):
-            new_record = list()
-            for column, value in zip(self.table.all, record):
-                if value:
-                    if column.is_pickletype:
-                        new_record.append(
-                            pickle.dumps(value, protocol=PK_PROTOCOL))
-                    else:
-                        new_record.append(value)
-                else:
-                    new_record.append(value)
+        if self.adapters:
+            new_record = list(record)
+            for i, adapt in self.adapters:
+                value = new_record[i]
+                if value is not None:
+                    new_record[i] = adapt(value)
             return new_record
         else:
             return record
@@ -155,21 +338,28 @@ class PickleTypeConverter(object):
         将Row对象中的pickletype的项转化成blob。该方法用于在Insert操作之前对数据
         进行预处理。返回list。
         """
-        if len(self.table.pickletype_columns):
+        if self.adapters:
             new_values = list()
             for column_name, value in zip(row.columns, row.values):
-                if value:
-                    if self.table.get_column(column_name).is_pickletype:
-                        new_values.append(
-                            pickle.dumps(value, protocol=PK_PROTOCOL))
-                    else:
-                        new_values.append(value)
-                else:
-                    new_values.append(value)
+                if value is not None:
+                    adapt = self.adapters_by_name.get(column_name)
+                    if adapt is not None:
+                        value = adapt(value)
+                new_values.append(value)
             return new_values
         else:
             return row.values
         
+    def _recover(self, record):
+        """Convert values in record to Python object, returns list.
+        """
+        new_record = list(record)
+        for i, convert in self.converters:
+            value = new_record[i]
+            if value is not None:
+                new_record[i] = convert(value)
+        return new_record
+    
     def recover_tuple_record(self, record):
         """Convert PickleType value in record tuple that naive Python sqlite3 
         API returned to Python object, returns tuple. 
@@ -179,18 +369,8 @@ class PickleTypeConverter(object):
         将原生API cursor.execute("SELECT ...") 所返回的record tuple, 如果其中有
         PickleType, 则转换会Python object。最终返回tuple。
         """
-        if len(self.table.pickletype_columns):
-            new_record = list()
-            for column, value in zip(self.table.all, record):
-                if value:
-                    if column.is_pickletype:
-                        new_record.append(
-                            pickle.loads(value))
-                    else:
-                        new_record.append(value)
-                else:
-                    new_record.append(value)
-            return tuple(new_record)
+        if self.converters:
+            return tuple(self._recover(record))
         else:
             return record
 
@@ -203,18 +383,8 @@ class PickleTypeConverter(object):
         将原生API cursor.execute("SELECT ...") 所返回的record tuple, 如果其中有
         PickleType, 则转换会Python object。最终返回list。
         """
-        if len(self.table.pickletype_columns):
-            new_record = list()
-            for column, value in zip(self.table.all, record):
-                if value:
-                    if column.is_pickletype:
-                        new_record.append(
-                            pickle.loads(value))
-                    else:
-                        new_record.append(value)
-                else:
-                    new_record.append(value)
-            return new_record
+        if self.converters:
+            return self._recover(record)
         else:
             return record
         
@@ -228,21 +398,42 @@ class PickleTypeConverter(object):
         PickleType, 则转换会Python object。最终返回 
         :class:`~sqlite4dummy.row.Row`。
         """
-        if len(self.table.pickletype_columns):
-            new_record = list()
-            for column, value in zip(self.table.all, record):
-                if value:
-                    if column.is_pickletype:
-                        new_record.append(
-                            pickle.loads(value))
-                    else:
-                        new_record.append(value)
-                else:
-                    new_record.append(value)
+        if self.converters:
             return Row(columns=self.table.column_names, 
-                       values=new_record)
+                       values=self._recover(record))
         else:
             return Row(columns=self.table.column_names, values=record)
+    
+    def recover_column(self, i, values):
+        """Convert i-th column values that naive Python sqlite3 API returned 
+        to Python object, returns list. Used by column oriented select.
+        
+        **中文文档**
+        
+        将原生API返回的第i列的所有值一次性转换为Python object。用于以列为导向的
+        查询。
+        """
+        convert = self.table.all[i].data_type.convert
+        if convert is None:
+            return list(values)
+        return [convert(value) if value is not None else None \
+                for value in values]
+    
+    @classmethod
+    def from_select(cls, sel_obj):
+        """Return the converter of the result set of a 
+        :class:`~sqlite4dummy.schema.Select`. It's compiled once and cached 
+        on the shared :class:`~sqlite4dummy.schema.ResultDescriptor`.
+        
+        **中文文档**
+        
+        返回Select查询结果的转换器。转换器只编译一次, 缓存在共享的
+        ResultDescriptor上。
+        """
+        descriptor = sel_obj.result_descriptor
+        if descriptor.converter is None:
+            descriptor.converter = cls(descriptor)
+        return descriptor.converter
         
 ###############################################################################
 #                            Sqlite3Engine class                              #
@@ -263,6 +454,7 @@ class Sqlite3Engine(object):
     - :meth:`~Sqlite3Engine.insert_row`
     - :meth:`~Sqlite3Engine.insert_many_record`
     - :meth:`~Sqlite3Engine.insert_many_row`
+    - :meth:`~Sqlite3Engine.insert_many_dict`
     - :meth:`~Sqlite3Engine.insert_record_stream`
     - :meth:`~Sqlite3Engine.insert_row_stream`
     
@@ -273,16 +465,43 @@ class Sqlite3Engine(object):
     - :meth:`~Sqlite3Engine.select_row`
     - :meth:`~Sqlite3Engine.select_dict`
     - :meth:`~Sqlite3Engine.select_df`
+    - :meth:`~Sqlite3Engine.iter_df`
+    - :meth:`~Sqlite3Engine.paginate`
+    
+    **Import / Export**:
+    
+    - :meth:`~Sqlite3Engine.import_csv`
+    - :meth:`~Sqlite3Engine.export`
+    - :meth:`~Sqlite3Engine.to_arrow`
+    - :meth:`~Sqlite3Engine.to_parquet`
+    - :meth:`~Sqlite3Engine.from_arrow`
+    - :meth:`~Sqlite3Engine.from_parquet`
+    - :meth:`~Sqlite3Engine.insert_df`
     
     **Update**:
     
     - :meth:`~Sqlite3Engine.update`
+    - :meth:`~Sqlite3Engine.update_many`
     - :meth:`~Sqlite3Engine.insdate_many_record`
     - :meth:`~Sqlite3Engine.insdate_many_row`
     
     **Delete**:
     
     - :meth:`~Sqlite3Engine.delete`
+    - :meth:`~Sqlite3Engine.delete_many`
+    - :meth:`~Sqlite3Engine.in_keys`
+    - :meth:`~Sqlite3Engine.drop_temp_keys`
+    
+    **Type coercion**:
+    
+    - :meth:`~Sqlite3Engine.set_coerce`
+    
+    **Result cache**:
+    
+    - :meth:`~Sqlite3Engine.set_result_cache`
+    - :meth:`~Sqlite3Engine.set_count_cache`
+    - :meth:`~Sqlite3Engine.clear_cache`
+    - :meth:`~Sqlite3Engine.rollback`
     
     **Vanilla method**: sets of syntax sugar methods to reduce the code you need.
     
@@ -298,8 +517,13 @@ class Sqlite3Engine(object):
     - :meth:`~Sqlite3Engine.all_tablename`
     - :meth:`~Sqlite3Engine.all_indexname`
     """
+    # number of records fetched per block when filling the result cache
+    _cache_fetch_size = 1000
+    
     def __init__(self, dbname, 
-            autocommit=False, echo=False, log=False):
+            autocommit=False, echo=False, log=False,
+            cache_size=0, cache_bytes=64 * 1024 * 1024, count_cache=False,
+            coerce=False, error_sink=None):
         self.dbname = dbname
         self.connect = sqlite3.connect(
             dbname, detect_types=sqlite3.PARSE_DECLTYPES)
@@ -311,6 +535,15 @@ class Sqlite3Engine(object):
         
         self.set_logger(echo, log)
         
+        self.set_result_cache(cache_size, cache_bytes)
+        
+        self.set_count_cache(count_cache)
+        
+        self.set_coerce(coerce, error_sink)
+        
+        self._temp_key_tables = list()
+        self._temp_key_counter = count()
+        
     def __str__(self):
         return "Sqlite3Engine(dbname=r'%s', autocommit=%s)" % (
             self.dbname, self.is_autocommit)
@@ -333,6 +566,7 @@ class Sqlite3Engine(object):
         `Cursor.execute <https://docs.python.org/3.3/library/sqlite3.html#sqlite3.Cursor.execute>`_
         方法。
         """
+        self._touch_all(sql)
         return self.cursor.execute(sql, *args)
 
     def executemany(self, sql, *args):
@@ -344,6 +578,7 @@ class Sqlite3Engine(object):
         `Cursor.executemany <https://docs.python.org/3.3/library/sqlite3.html#sqlite3.Cursor.executemany>`_
         方法。
         """
+        self._touch_all(sql)
         return self.cursor.executemany(sql, *args)
     
     def commit(self):
@@ -355,6 +590,19 @@ class Sqlite3Engine(object):
         """
         self.connect.commit()
 
+    def rollback(self):
+        """Rollback the current transaction. The result cache and the row 
+        counts may hold uncommitted changes, so they are dropped. Use this 
+        instead of ``engine.connect.rollback()``.
+        
+        **中文文档**
+        
+        回滚当前事务。由于查询结果缓存和行数缓存中可能包含未提交的修改, 所以同时
+        清空这两个缓存。请使用该方法而不是 ``engine.connect.rollback()``。
+        """
+        self.connect.rollback()
+        self._clear_caches()
+
     def commit_nothing(self):
         """Method for doing nothing.
         
@@ -378,9 +626,134 @@ class Sqlite3Engine(object):
             self.is_autocommit = False
             self._commit = self.commit_nothing
     
+    def set_result_cache(self, max_entries, max_bytes=64 * 1024 * 1024):
+        """Switch on or off the :class:`~sqlite4dummy.cache.ResultCache` of
+        Select results. ``max_entries=0`` turns it off.
+        
+        Cached queries are automatically invalidated when the engine's own 
+        insert, update, insdate, delete, remove_all or drop_table method writes
+        to a table they read. Raw :meth:`~Sqlite3Engine.execute` of anything 
+        else than a SELECT clears the whole cache.
+        
+        **中文文档**
+        
+        设置查询结果缓存。``max_entries=0`` 时关闭缓存。当本引擎的insert, 
+        update, insdate, delete, remove_all, drop_table等方法写入某个表时, 所有
+        读取了该表的缓存会自动失效。用 :meth:`~Sqlite3Engine.execute` 执行
+        非SELECT语句会清空全部缓存。
+        """
+        if max_entries:
+            self.result_cache = ResultCache(max_entries, max_bytes)
+        else:
+            self.result_cache = None
+    
+    def clear_cache(self):
+        """Drop all cached Select results.
+        
+        **中文文档**
+        
+        清空查询结果缓存。
+        """
+        if self.result_cache is not None:
+            self.result_cache.clear()
+    
+    def set_count_cache(self, flag):
+        """Switch on or off the per table row count cache used by 
+        :meth:`~Sqlite3Engine.howmany`.
+        
+        The cached count is maintained by the engine's own insert and delete
+        methods. Raw :meth:`~Sqlite3Engine.execute` of anything else than a 
+        SELECT forgets all counts.
+        
+        **中文文档**
+        
+        设置 :meth:`~Sqlite3Engine.howmany` 所使用的行数缓存开关。缓存的行数由
+        本引擎的insert, delete等方法维护。用 :meth:`~Sqlite3Engine.execute`
+        执行非SELECT语句会清空所有缓存的行数。
+        """
+        if flag:
+            self.row_counts = dict()
+        else:
+            self.row_counts = None
+    
+    def set_coerce(self, flag, error_sink=None):
+        """Switch on or off the schema driven type coercion on insert.
+        
+        When it's on, every inserted record is converted by a 
+        :class:`~sqlite4dummy.coerce.Coercer` compiled from the table: None 
+        is replaced by the column default, NOT NULL is enforced and values are
+        converted to the column data type. In bulk insert, rejected records are
+        counted as failed in the :class:`InsertResult` (use 
+        ``keep_failures=True`` to get them back), and also passed to 
+        ``error_sink(record, exception)`` if it's given. Single record insert 
+        raises :class:`~sqlite4dummy.coerce.CoerceError`.
+        
+        **中文文档**
+        
+        设置插入数据时是否根据Table的定义进行类型转换。开启后, 每条记录的None值会
+        被替换为默认值, NOT NULL约束会被检查, 值会被转换为列的数据类型。批量插入时,
+        被拒绝的记录会被计入 :class:`InsertResult` 的failed中 (使用
+        ``keep_failures=True`` 可以取回这些记录), 如果指定了 ``error_sink``, 还会
+        被传给 ``error_sink(record, 异常)``。默认不保存被拒绝的记录, 以免长期使用的
+        engine占用越来越多的内存。插入单条记录时则直接抛出
+        :class:`~sqlite4dummy.coerce.CoerceError` 异常。
+        """
+        self.is_coerce = bool(flag)
+        self._coercers = dict() # table_name: Coercer
+        self.error_sink = error_sink
+    
+    def _get_coercer(self, table):
+        """Returns the compiled :class:`~sqlite4dummy.coerce.Coercer` of 
+        ``table``, or None if coercion is off.
+        """
+        if not self.is_coerce:
+            return None
+        coercer = self._coercers.get(table.table_name)
+        if (coercer is None) or (coercer.table is not table):
+            coercer = Coercer(table)
+            self._coercers[table.table_name] = coercer
+        return coercer
+    
+    def _insert_delta(self, ins_obj, inserted):
+        """Change of number of rows after insert, INSERT OR REPLACE may 
+        replace existing rows, so it's unknown.
+        """
+        if ins_obj.conflict == "REPLACE":
+            return None
+        return inserted
+    
+    def _touch(self, table, delta=None):
+        """Notify that ``table`` (Table object or table name) has been 
+        written. ``delta`` is the change of number of rows, None means unknown.
+        """
+        table_name = str(table)
+        if self.result_cache is not None:
+            self.result_cache.invalidate(table_name)
+        if self.row_counts is not None:
+            if delta is None:
+                self.row_counts.pop(table_name, None)
+            elif table_name in self.row_counts:
+                self.row_counts[table_name] += delta
+    
+    def _touch_all(self, sql):
+        """Notify that a raw sql has been executed.
+        """
+        if not sql.lstrip()[:6].upper() == "SELECT":
+            self._clear_caches()
+    
+    def _clear_caches(self):
+        """Drop the whole result cache and all cached row counts.
+        """
+        if self.result_cache is not None:
+            self.result_cache.clear()
+        if self.row_counts is not None:
+            self.row_counts.clear()
+    
     def set_logger(self, echo, log):
         """Switch on or off echo Sql command.
         """
+        import logging # logging is heavy, import it when engine is created
+        
         log_dir = "sqlite4dummy_log"
         log_file = "%s.log" % datetime.strftime(datetime.now(), "%Y-%m-%d_%H-%M-%S.%f")
         log_path = os.path.join(log_dir, log_file)
@@ -419,15 +792,11 @@ class Sqlite3Engine(object):
         :meth:`PickleTypeConverter.convert_record` 的类似版本, 用于只执行一次的
         insert和update的情况。
         """
-        if len(table.pickletype_columns):
+        if len(table.converted_columns):
             new_record = list()
             for column, value in zip(table.all, record):
-                if value:
-                    if column.is_pickletype:
-                        new_record.append(
-                            pickle.dumps(value, protocol=PK_PROTOCOL))
-                    else:
-                        new_record.append(value)
+                if (value is not None) and (column.data_type.adapt is not None):
+                    new_record.append(column.data_type.adapt(value))
                 else:
                     new_record.append(value)
             return new_record
@@ -442,15 +811,12 @@ class Sqlite3Engine(object):
         :meth:`PickleTypeConverter.convert_row` 的类似版本, 用于只执行一次的
         insert和update的情况。
         """
-        if len(table.pickletype_columns):
+        if len(table.converted_columns):
             new_values = list()
             for column_name, value in zip(row.columns, row.values):
-                if value:
-                    if table.get_column(column_name).is_pickletype:
-                        new_values.append(
-                            pickle.dumps(value, protocol=PK_PROTOCOL))
-                    else:
-                        new_values.append(value)
+                adapt = table.get_column(column_name).data_type.adapt
+                if (value is not None) and (adapt is not None):
+                    new_values.append(adapt(value))
                 else:
                     new_values.append(value)
             return new_values
@@ -458,6 +824,7 @@ class Sqlite3Engine(object):
             return row.values
         
     # Execute Insert
+    @_invalidate_on_error
     def insert_record(self, ins_obj, record):
         """Insert single record.
         
@@ -471,11 +838,16 @@ class Sqlite3Engine(object):
         
         插入单条tuple或list数据。
         """
-        ins_obj.sql_from_record()
-        self.cursor.execute(ins_obj.sql, self.convert_record(
+        coercer = self._get_coercer(ins_obj.table)
+        if coercer is not None:
+            record = coercer.coerce_record(record)
+        self.cursor.execute(ins_obj.sql_from_record(), self.convert_record(
                                             ins_obj.table, record))
+        self._touch(ins_obj.table, 
+                    self._insert_delta(ins_obj, self.cursor.rowcount))
         self._commit()
         
+    @_invalidate_on_error
     def insert_row(self, ins_obj, row):
         """Insert single Row.
         
@@ -489,56 +861,238 @@ class Sqlite3Engine(object):
         
         插入单条 :class:`~sqlite4dummy.row.Row` 数据。
         """
-        ins_obj.sql_from_row(row)
-        self.cursor.execute(ins_obj.sql, self.convert_row(
+        coercer = self._get_coercer(ins_obj.table)
+        if coercer is not None:
+            row = coercer.coerce_row(row)
+        self.cursor.execute(ins_obj.sql_from_row(row), self.convert_row(
                                             ins_obj.table, row))
+        self._touch(ins_obj.table, 
+                    self._insert_delta(ins_obj, self.cursor.rowcount))
         self._commit()
     
-    def insert_many_record(self, ins_obj, records):
+    def _rejecter(self, result):
+        """Error sink for type coercion in bulk insert, count the rejected
+        record as failed, then pass it to the engine's error sink if any.
+        """
+        def reject(record, exception):
+            result.add_failure(record, exception)
+            if self.error_sink is not None:
+                self.error_sink(record, exception)
+        return reject
+    
+    def _insert_batch(self, sql, originals, convert, result):
+        """Insert a batch of records with one executemany in a SAVEPOINT. If
+        any record fails, rollback to the savepoint and replay the batch one 
+        by one, so only the bad records are skipped.
+        
+        :param originals: list of input record or Row.
+        :param convert: converter function, turns input into sqlite3 values.
+          None means input are already sqlite3 values.
+        :param result: :class:`InsertResult` to fill in.
+        """
+        if convert is None:
+            records = good_originals = list(originals)
+        else:
+            records = list()
+            good_originals = list()
+            for original in originals:
+                try:
+                    records.append(convert(original))
+                    good_originals.append(original)
+                except Exception as e:
+                    result.add_failure(original, e)
+        if not records:
+            return
+        
+        if not self.connect.in_transaction:
+            self.cursor.execute("BEGIN")
+        self.cursor.execute("SAVEPOINT sqlite4dummy_insert")
+        try:
+            inserted = self.cursor.executemany(sql, records).rowcount
+        except Exception as e:
+            self.cursor.execute("ROLLBACK TO SAVEPOINT sqlite4dummy_insert")
+            self.cursor.execute("RELEASE SAVEPOINT sqlite4dummy_insert")
+            if _is_fatal(e):
+                raise
+        else:
+            self.cursor.execute("RELEASE SAVEPOINT sqlite4dummy_insert")
+            # INSERT OR IGNORE silently skips conflict records
+            if inserted < 0:
+                inserted = len(records)
+            result.inserted += inserted
+            result.ignored += len(records) - inserted
+            return
+        
+        # slow path, replay one by one
+        for original, record in zip(good_originals, records):
+            try:
+                if self.cursor.execute(sql, record).rowcount:
+                    result.inserted += 1
+                else:
+                    result.ignored += 1
+            except sqlite3.IntegrityError:
+                result.ignored += 1
+            except Exception as e:
+                if _is_fatal(e):
+                    raise
+                result.add_failure(original, e)
+    
+    @_invalidate_on_error
+    def insert_many_record(self, ins_obj, records, keep_failures=False):
         """Insert many records, skip all primary-key conflict data.
         
-        :param ins_obj: :class:`~sqlite4dummy.schema.Insert` object
+        All records are inserted with one executemany. Only when it fails, 
+        records are replayed one by one, the ones violate a constraint are 
+        counted as ignored, the ones failed for other reason are counted as 
+        failed. Database level error, such as disk full, is raised.
+        
+        :param ins_obj: :class:`~sqlite4dummy.schema.Insert` object, 
+          ``"ROLLBACK"`` and ``"FAIL"`` conflict are not supported, it 
+          raises ValueError.
         :type ins_obj: :class:`~sqlite4dummy.schema.Insert`
         
-        :param generator: data stream
-        :type generator: generator
+        :param records: list of tuple or list data.
+        :type records: list
+        
+        :param keep_failures: (default False) whether to keep the failed 
+          records and their exception in :attr:`InsertResult.failures`.
+        :type keep_failures: boolean
+        
+        :returns: :class:`InsertResult`
         
         **中文文档**
         
         插入多条tuple或list数据。
+        
+        所有数据首先用一次executemany插入。只有出错时才逐条重新插入, 违反约束的
+        计为ignored, 其他原因失败的计为failed。磁盘满等数据库级别的错误会被抛出。
         """
+        _check_bulk_conflict(ins_obj)
+        result = InsertResult(keep_failures)
         converter = PickleTypeConverter(ins_obj.table) # compile converter
-        ins_obj.sql_from_record()
-        for record in map(converter.convert_record, records):
-            try:
-                self.cursor.execute(ins_obj.sql, record)
-            except:
-                pass
+        coercer = self._get_coercer(ins_obj.table)
+        if coercer is not None:
+            records = coercer.filter_records(records, self._rejecter(result))
+        self._insert_batch(
+            ins_obj.sql_from_record(), records, converter.convert_record, result)
+        self._touch(ins_obj.table, self._insert_delta(ins_obj, result.inserted))
         self._commit()
+        return result
 
-    def insert_many_row(self, ins_obj, rows):
+    @_invalidate_on_error
+    def insert_many_row(self, ins_obj, rows, keep_failures=False):
         """Insert many Row, skip all primary-key conflict data.
         
+        See :meth:`~Sqlite3Engine.insert_many_record` for how errors are 
+        handled.
+        
         :param ins_obj: :class:`~sqlite4dummy.schema.Insert` object
         :type ins_obj: :class:`~sqlite4dummy.schema.Insert`
         
-        :param generator: data stream
-        :type generator: generator
+        :param rows: list of :class:`~sqlite4dummy.row.Row`
+        :type rows: list
+        
+        :param keep_failures: (default False) whether to keep the failed 
+          rows and their exception in :attr:`InsertResult.failures`.
+        :type keep_failures: boolean
+        
+        :returns: :class:`InsertResult`
+        
+        Rows don't need to have the same columns. They are grouped by their 
+        columns, each group is inserted with one executemany.
         
         **中文文档**
         
-        插入多条 :class:`~sqlite4dummy.row.Row` 数据。
+        插入多条 :class:`~sqlite4dummy.row.Row` 数据。错误的处理方式与
+        :meth:`~Sqlite3Engine.insert_many_record` 相同。各个Row的列可以不同, 
+        列相同的Row会被分为一组, 每组用一次executemany插入。
         """
+        _check_bulk_conflict(ins_obj)
+        result = InsertResult(keep_failures)
         converter = PickleTypeConverter(ins_obj.table) # compile converter
-        ins_obj.sql_from_row(rows[0])
-        for record in map(converter.convert_row, rows):
+        coercer = self._get_coercer(ins_obj.table)
+        if coercer is not None:
+            rows = coercer.filter_rows(rows, self._rejecter(result))
+        
+        # group rows by column signature, one INSERT sql per group
+        groups = OrderedDict()
+        for row in rows:
+            signature = tuple(row.columns)
             try:
-                self.cursor.execute(ins_obj.sql, record)
-            except:
-                pass
+                groups[signature].append(row)
+            except KeyError:
+                groups[signature] = [row,]
+        
+        for group in groups.values():
+            self._insert_batch(ins_obj.sql_from_row(group[0]), group, 
+                               converter.convert_row, result)
+        self._touch(ins_obj.table, self._insert_delta(ins_obj, result.inserted))
         self._commit()
+        return result
 
-    def insert_record_stream(self, ins_obj, generator, cache_size=1024):
+    @_invalidate_on_error
+    def insert_many_dict(self, ins_obj, dicts, keep_failures=False):
+        """Insert many plain dict, skip all primary-key conflict data.
+        
+        Dicts are passed to executemany with named placeholders directly, no
+        :class:`~sqlite4dummy.row.Row` is created. Missing keys are filled 
+        with ``Column.default``, extra keys are ignored. A dict is copied only
+        if it has missing key or there's PICKLETYPE like column to convert, 
+        the input dict is never modified. See 
+        :meth:`~Sqlite3Engine.insert_many_record` for how errors are handled.
+        
+        :param ins_obj: :class:`~sqlite4dummy.schema.Insert` object
+        :type ins_obj: :class:`~sqlite4dummy.schema.Insert`
+        
+        :param dicts: list of dict, {column_name: value}
+        :type dicts: list
+        
+        :param keep_failures: (default False) whether to keep the failed 
+          dicts and their exception in :attr:`InsertResult.failures`.
+        :type keep_failures: boolean
+        
+        :returns: :class:`InsertResult`
+        
+        **中文文档**
+        
+        直接插入多个字典, 无需先转化为Row对象。字典以命名占位符的形式直接传给
+        executemany。缺失的键会用 ``Column.default`` 填充, 多余的键会被忽略。只有
+        在有缺失的键或是需要转换PICKLETYPE等列时才会复制字典, 输入的字典永远不会
+        被修改。
+        """
+        _check_bulk_conflict(ins_obj)
+        result = InsertResult(keep_failures)
+        table = ins_obj.table
+        converter = PickleTypeConverter(table) # compile converter
+        adapters = list(converter.adapters_by_name.items())
+        defaults = dict([(column.column_name, column.default) \
+                         for column in table.all])
+        column_names = set(defaults)
+        
+        coercer = self._get_coercer(table)
+        if coercer is not None: # coerced dict is new and has all columns
+            dicts = coercer.filter_dicts(dicts, self._rejecter(result))
+        
+        def convert_dict(dictionary):
+            if not column_names.issubset(dictionary):
+                new_dict = defaults.copy()
+                new_dict.update(dictionary)
+                dictionary = new_dict
+            elif adapters and (coercer is None):
+                dictionary = dict(dictionary)
+            for column_name, adapt in adapters:
+                value = dictionary[column_name]
+                if value is not None:
+                    dictionary[column_name] = adapt(value)
+            return dictionary
+        
+        self._insert_batch(ins_obj.sql_from_dict(), dicts, convert_dict, result)
+        self._touch(table, self._insert_delta(ins_obj, result.inserted))
+        self._commit()
+        return result
+    
+    def insert_record_stream(self, ins_obj, generator, cache_size=1024,
+                             keep_failures=False):
         """Another version of :meth:`~Sqlite3Engine.insert_many_record`, take
         generator type input data stream.
         
@@ -555,11 +1109,15 @@ class Sqlite3Engine(object):
         
         以生成器形式插入多条tuple或list数据。
         """
+        result = InsertResult(keep_failures)
         for chunk in grouper_list(generator, n=cache_size):
-            self.insert_many_record(ins_obj, chunk)
+            result.merge(
+                self.insert_many_record(ins_obj, chunk, keep_failures))
         self._commit()
+        return result
         
-    def insert_row_stream(self, ins_obj, generator, cache_size=1024):
+    def insert_row_stream(self, ins_obj, generator, cache_size=1024,
+                          keep_failures=False):
         """Another version of :meth:`~Sqlite3Engine.insert_many_row`, take
         generator type input data stream.
         
@@ -576,11 +1134,311 @@ class Sqlite3Engine(object):
         
         以生成器的形式插入单条 :class:`~sqlite4dummy.row.Row` 数据。
         """
+        result = InsertResult(keep_failures)
         for chunk in grouper_list(generator, n=cache_size):
-            self.insert_many_row(ins_obj, chunk)
+            result.merge(self.insert_many_row(ins_obj, chunk, keep_failures))
         self._commit()
+        return result
+    
+    # INSERT INTO ... SELECT, data never leaves sqlite
+    def _check_copy_types(self, pairs):
+        """Values are copied as stored, so a converted column (PICKLETYPE,
+        INTDATE, ...) can only be copied into the same data type.
+        """
+        for (src_name, src_type), (dst_name, dst_type) in pairs:
+            if (src_type is None) or (dst_type is None):
+                continue
+            if (src_type.adapt is not None or dst_type.adapt is not None) \
+                    and (src_type.name != dst_type.name):
+                raise ValueError("can't copy %s %s into %s %s." % (
+                    src_type.name, src_name, dst_type.name, dst_name))
+    
+    @_invalidate_on_error
+    def _insert_select(self, table, into_clause, column_names, select_sql, 
+                       params, delta_known=True):
+        """Execute ``INSERT INTO table (columns) SELECT ...``, returns number
+        of inserted records.
+        """
+        sql = "%s (%s)\n%s" % (into_clause, ", ".join(column_names), 
+                               select_sql)
+        self.logger.info(sql)
+        self.cursor.execute(sql, params)
+        n_inserted = self.cursor.rowcount
+        if delta_known:
+            self._touch(table, n_inserted)
+        else:
+            self._touch(table)
+        self._commit()
+        return n_inserted
+    
+    def insert_from_select(self, ins_obj, sel_obj, columns=None):
+        """Insert the result of a :class:`~sqlite4dummy.schema.Select` by 
+        ``INSERT INTO ... SELECT``. No record crosses into Python, PICKLETYPE
+        values are copied as stored bytes. Returns number of inserted records.
+        
+        :param ins_obj: :class:`~sqlite4dummy.schema.Insert` object, its
+          conflict option (e.g. ``table.insert("IGNORE")``) is respected.
+        :param columns: list of Column or column name that receives the 
+          selected values by position. Default is all columns of the table.
+        
+        **中文文档**
+        
+        用 ``INSERT INTO ... SELECT`` 将Select的结果插入到表中, 数据完全不经过
+        Python, PICKLETYPE以原始字节复制。返回插入的记录数。
+        """
+        table = ins_obj.table
+        if columns is None:
+            column_names = list(table.column_names)
+        else:
+            column_names = [getattr(column, "column_name", column) \
+                            for column in columns]
+        if len(column_names) != len(sel_obj.param_list):
+            raise ValueError("select %s columns, but insert into %s." % (
+                len(sel_obj.param_list), len(column_names)))
+        try:
+            dst_types = [table.get_column(name).data_type \
+                         for name in column_names]
+        except AttributeError:
+            raise ValueError("%s has unknown column in %s" % (
+                table, column_names))
+        self._check_copy_types(zip(
+            zip(sel_obj.result_descriptor.column_names, 
+                sel_obj.result_descriptor.data_types),
+            zip(column_names, dst_types)))
+        
+        return self._insert_select(table, ins_obj.INSERT_INTO_clause, 
+            column_names, sel_obj.sql, sel_obj.params, 
+            ins_obj.conflict != "REPLACE")
+    
+    def copy_table(self, src, dst, where=None, conflict=None, 
+                   src_schema=None, dst_schema=None):
+        """Copy records from table ``src`` to table ``dst`` by 
+        ``INSERT INTO ... SELECT``, columns are matched by name. Works across
+        databases attached by :meth:`Sqlite3Engine.attach`. Returns number of
+        inserted records.
+        
+        :param where: SQL_Param or list of SQL_Param, filter of ``src``.
+        :param conflict: conflict option of INSERT, e.g. "IGNORE", "REPLACE".
+        :param src_schema: attached database name of ``src``, default main.
+        :param dst_schema: attached database name of ``dst``, default main.
+        
+        **中文文档**
+        
+        用 ``INSERT INTO ... SELECT`` 将src表中的记录复制到dst表, 按列名匹配。
+        可以在用 :meth:`Sqlite3Engine.attach` 附加的数据库之间复制。返回插入的
+        记录数。
+        """
+        column_names = [name for name in dst.column_names \
+                        if name in src.column_names]
+        if not column_names:
+            raise ValueError("%s and %s have no common column." % (src, dst))
+        self._check_copy_types([
+            ((name, src.get_column(name).data_type), 
+             (name, dst.get_column(name).data_type)) \
+            for name in column_names])
+        
+        conflict = dst.insert(conflict).conflict # validated, upper case
+        dst_name = dst.table_name
+        if dst_schema is not None:
+            validator.exam_table_name(dst_schema)
+            dst_name = "%s.%s" % (dst_schema, dst.table_name)
+        if conflict is None:
+            into_clause = "INSERT INTO\t%s" % dst_name
+        else:
+            into_clause = "INSERT OR %s INTO\t%s" % (conflict, dst_name)
+        src_name = src.table_name
+        if src_schema is not None:
+            validator.exam_table_name(src_schema)
+            src_name = "%s.%s" % (src_schema, src.table_name)
+        
+        select_sql = "SELECT\t%s\nFROM\t%s" % (
+            ",\n\t".join(column_names), src_name)
+        params = list()
+        if where is not None:
+            if not isinstance(where, (list, tuple)):
+                where = [where,]
+            select_sql = "%s\nWHERE\t%s" % (select_sql, 
+                "\n\tAND ".join([i.param for i in where]))
+            params = [p for i in where for p in i.params]
+        
+        delta_known = (conflict != "REPLACE") and \
+            (dst_schema in (None, "main"))
+        return self._insert_select(dst, into_clause, column_names, 
+                                   select_sql, params, delta_known)
+    
+    def attach(self, path, name):
+        """ATTACH another database file as ``name``, so tables in it can be
+        used by :meth:`Sqlite3Engine.copy_table`. It has to be called out of
+        transaction.
+        
+        **中文文档**
+        
+        以 ``name`` 附加另一个数据库文件, 用于跨数据库复制表。必须在事务之外调用。
+        """
+        validator.exam_table_name(name)
+        self.cursor.execute("ATTACH DATABASE ? AS %s" % name, (path,))
+    
+    def detach(self, name):
+        """DETACH a database attached by :meth:`Sqlite3Engine.attach`.
+        
+        **中文文档**
+        
+        分离用 :meth:`Sqlite3Engine.attach` 附加的数据库。
+        """
+        validator.exam_table_name(name)
+        self.cursor.execute("DETACH DATABASE %s" % name)
+        
+    @_invalidate_on_error
+    def import_csv(self, table, path, delimiter=None, header=True, 
+                   columns=None, null_value="", encoding="utf-8",
+                   compression="infer", chunksize=10000, conflict=None,
+                   keep_failures=False):
+        """Bulk import a csv/tsv file, can be gzip or bz2 compressed.
+        
+        Fields are converted by ``Column.data_type.from_text``: BLOB is hex
+        string, PICKLETYPE is JSON string. The file is streamed and inserted 
+        by chunk with executemany in one transaction, with 
+        ``PRAGMA synchronous = OFF`` during the load. If no transaction is 
+        open, the import is committed at the end, or rolled back on database
+        error. Otherwise it joins the open transaction and follows autocommit.
+        
+        :param table: :class:`~sqlite4dummy.schema.Table` object.
+        
+        :param path: file path, ``.gz``, ``.bz2`` file is decompressed.
         
-    # Execute Select    
+        :param delimiter: (default None) field delimiter, by default it's tab
+          for ``.tsv``, ``.tab`` file, otherwise comma.
+        
+        :param header: (default True) whether the first line is header.
+        
+        :param columns: (default None) column names of the fields. By default
+          it is the header, or all table columns if there's no header.
+        
+        :param null_value: (default "") field equals to this is NULL.
+        
+        :param chunksize: (default 10000) how many lines to insert at a time.
+        
+        :param conflict: (default None) conflict resolution algorithm, see 
+          :meth:`~sqlite4dummy.schema.Insert.on_conflict`. ``"ROLLBACK"`` 
+          and ``"FAIL"`` are not supported.
+        
+        :returns: :class:`InsertResult`, lines can't be converted are failed.
+        
+        **中文文档**
+        
+        批量导入csv/tsv文件 (可以是gzip或bz2压缩文件)。
+        
+        每个字段由 ``Column.data_type.from_text`` 进行转换: BLOB为十六进制字符串,
+        PICKLETYPE为JSON字符串。文件以流的形式读取, 在一个事务中分块用executemany
+        插入, 导入期间设置 ``PRAGMA synchronous = OFF``。如果当前没有打开的事务,
+        导入完成后会自动commit, 出现数据库错误时回滚; 否则加入当前事务, 
+        并遵循autocommit的设置。
+        """
+        if delimiter is None:
+            name = path.lower()
+            if infer_compression(path, compression) is not None:
+                name = os.path.splitext(name)[0]
+            if name.endswith(".tsv") or name.endswith(".tab"):
+                delimiter = "\t"
+            else:
+                delimiter = ","
+        
+        result = InsertResult(keep_failures)
+        ins_obj = table.insert(conflict)
+        _check_bulk_conflict(ins_obj)
+        
+        with open_text(path, "r", compression, encoding) as f:
+            reader = csv.reader(f, delimiter=str(delimiter))
+            if header:
+                header_names = next(reader, None)
+                if columns is None:
+                    columns = header_names
+            if columns is None:
+                columns = table.column_names
+            columns = [str(column) for column in columns]
+            
+            # compile field parser
+            parsers = list()
+            for data_type in _column_data_types(table, columns):
+                if data_type.name == "TEXT":
+                    parsers.append(None)
+                elif data_type.adapt is not None:
+                    parsers.append(lambda text, from_text=data_type.from_text,
+                                   adapt=data_type.adapt: adapt(from_text(text)))
+                else:
+                    parsers.append(data_type.from_text)
+            n_fields = len(parsers)
+            
+            def convert(fields):
+                if len(fields) != n_fields:
+                    raise ValueError("expect %s fields, got %s" % (
+                        n_fields, len(fields)))
+                return [None if field == null_value else \
+                        (field if parse is None else parse(field)) \
+                        for parse, field in zip(parsers, fields)]
+            
+            sql = ins_obj.sql_from_row(Row(columns, None))
+            
+            # bulk load in its own transaction, unless there's one already
+            bulk_mode = not self.connect.in_transaction
+            if bulk_mode:
+                synchronous = self.cursor.execute(
+                    "PRAGMA synchronous").fetchone()[0]
+                self.cursor.execute("PRAGMA synchronous = OFF")
+                self.cursor.execute("BEGIN")
+            try:
+                for chunk in grouper_list(reader, n=chunksize):
+                    self._insert_batch(sql, chunk, convert, result)
+                if bulk_mode:
+                    self.commit()
+                else:
+                    self._commit()
+            except:
+                if bulk_mode:
+                    self.rollback()
+                raise
+            finally:
+                if bulk_mode:
+                    self.cursor.execute(
+                        "PRAGMA synchronous = %s" % synchronous)
+        
+        self._touch(table, self._insert_delta(ins_obj, result.inserted))
+        return result
+    
+    # Execute Select
+    def _execute_select(self, sel_obj):
+        """Execute :class:`~sqlite4dummy.schema.Select` object, returns raw 
+        records iterable. Served from the result cache if it is enabled.
+        
+        **中文文档**
+        
+        执行Select, 返回原生的record。如果开启了结果缓存, 则优先从缓存中读取。
+        """
+        sql, params = sel_obj.sql, sel_obj.params
+        self.logger.info(sql)
+        if (self.result_cache is None) or (not sel_obj.table_names):
+            return self.cursor.execute(sql, params)
+        
+        key = (sql,) + tuple(params)
+        records = self.result_cache.get(key)
+        if records is not None:
+            return records
+        
+        # fetch block by block, stop caching once the result is too large
+        # and stream the rest, so big result is never loaded all at once.
+        cursor = self.cursor.execute(sql, params)
+        records, nbytes = list(), 0
+        while True:
+            chunk = cursor.fetchmany(self._cache_fetch_size)
+            if not chunk:
+                self.result_cache.put(key, records, sel_obj.table_names, 
+                                      nbytes)
+                return records
+            records.extend(chunk)
+            nbytes += estimate_size(chunk)
+            if nbytes > self.result_cache.max_bytes:
+                return chain(records, cursor)
+    
     def select(self, sel_obj, return_tuple=False):
         """Execute :class:`~sqlite4dummy.schema.Select` object, 
         if ``return_tuple=True``, yield ``tuple``, else, yield ``list``.
@@ -589,14 +1447,13 @@ class Sqlite3Engine(object):
         
         执行 :class:`~sqlite4dummy.schema.Select` 对象, 返回tuple数据
         """
-        self.logger.info(sel_obj.sql)
-        adaptor = PickleTypeConverter(sel_obj.temp_table)
+        adaptor = PickleTypeConverter.from_select(sel_obj)
         if return_tuple:
             return map(adaptor.recover_tuple_record, 
-                       self.cursor.execute(sel_obj.sql))
+                       self._execute_select(sel_obj))
         else:
             return map(adaptor.recover_list_record, 
-                       self.cursor.execute(sel_obj.sql))
+                       self._execute_select(sel_obj))
     
     def select_record(self, sel_obj, return_tuple=False):
         """Alias of :meth:`~Sqlite3Engine.select`
@@ -617,10 +1474,46 @@ class Sqlite3Engine(object):
         执行 :class:`~sqlite4dummy.schema.Select` 对象, 返回
         :class:`~sqlite4dummy.row.Row` 数据。
         """
-        adaptor = PickleTypeConverter(sel_obj.temp_table)
+        adaptor = PickleTypeConverter.from_select(sel_obj)
         return map(adaptor.recover_row, 
-                   self.cursor.execute(sel_obj.sql))
+                   self._execute_select(sel_obj))
     
+    def _fetch_chunks(self, sel_obj, chunksize):
+        """Execute :class:`~sqlite4dummy.schema.Select` object on a new 
+        cursor, yield list of raw records block by block with fetchmany. The 
+        result cache is bypassed, so memory usage is constant.
+        
+        **中文文档**
+        
+        在新的游标上执行Select, 用fetchmany分块返回原生的record列表。不使用结果
+        缓存, 因此内存占用恒定。
+        """
+        self.logger.info(sel_obj.sql)
+        cursor = self.connect.cursor() # keep self.cursor free
+        try:
+            cursor.execute(sel_obj.sql, sel_obj.params)
+            while True:
+                records = cursor.fetchmany(chunksize)
+                if not records:
+                    break
+                yield records
+        finally:
+            cursor.close()
+    
+    def _select_columns(self, sel_obj):
+        """Execute :class:`~sqlite4dummy.schema.Select` object, returns list 
+        of raw column values, without any data conversion.
+        
+        **中文文档**
+        
+        执行Select, 以列的形式返回未经任何转换的原生数据。
+        """
+        records = list(self._execute_select(sel_obj))
+        if records:
+            return list(zip(*records))
+        else:
+            return [tuple() for _ in sel_obj.result_descriptor.column_names]
+        
     def select_dict(self, sel_obj):
         """Execute :class:`~sqlite4dummy.schema.Select` object, 
         returns column oriented view of 2d-DataFrame.
@@ -638,13 +1531,12 @@ class Sqlite3Engine(object):
         
         执行 :class:`~sqlite4dummy.schema.Select` 对象, 返回以列为导向的字典视图。
         """
+        adaptor = PickleTypeConverter.from_select(sel_obj)
         d = OrderedDict()
-        for column_name in sel_obj.temp_table.column_names:
-            d[column_name] = list()
-        for record in self.select(sel_obj):
-            for column_name, value in zip(
-                sel_obj.temp_table.column_names, record):
-                d[column_name].append(value)
+        for i, (column_name, values) in enumerate(zip(
+            sel_obj.result_descriptor.column_names, 
+            self._select_columns(sel_obj))):
+            d[column_name] = adaptor.recover_column(i, values)
         return d
     
     def select_df(self, sel_obj):
@@ -653,18 +1545,646 @@ class Sqlite3Engine(object):
         `pandas.DataFrame <http://pandas.pydata.org/pandas-docs/stable/generated/pandas.DataFrame.html>`_ 
         column oriented view. Faster than :meth:`~Sqlite3Engine.select_dict`.
         
+        Each column is built with an explicit dtype derived from the column
+        data type, instead of being inferred by pandas: INTEGER is nullable 
+        Int64, REAL is float64, TEXT is string, DATE, DATETIME, INTDATE, 
+        INTDATETIME are datetime64[us] converted in one vectorized pass, BLOB
+        and PICKLETYPE are object.
+        
         **中文文档**
         
         执行 :class:`~sqlite4dummy.schema.Select` 对象, 返回
         `pandas.DataFrame <http://pandas.pydata.org/pandas-docs/stable/generated/pandas.DataFrame.html>`_
-        数据。
+        数据。每列的dtype由列的数据类型决定, 而不是由pandas推断: INTEGER为
+        可为空的Int64, REAL为float64, TEXT为string, 日期时间类型为datetime64,
+        BLOB和PICKLETYPE为object。
         """
-        return pd.DataFrame(
-            list(self.select(sel_obj)),
-            columns=sel_obj.temp_table.column_names,
-            )
+        return self._df_from_columns(
+            sel_obj.result_descriptor, self._select_columns(sel_obj), 
+            PickleTypeConverter.from_select(sel_obj))
+    
+    def _df_from_columns(self, table, raw_columns, adaptor):
+        """Build pandas.DataFrame from raw column values, with explicit dtype
+        derived from ``Column.data_type``:
+        
+        - INTEGER: nullable Int64, float64 or object if it holds REAL or TEXT
+        - REAL: float64
+        - DATE, DATETIME, INTDATE, INTDATETIME: datetime64[us]
+        - TEXT: string, object if it holds non text value
+        - BLOB, PICKLETYPE and others: object
+        
+        The dtype never depends on the values, so every chunk of 
+        :meth:`~Sqlite3Engine.iter_df` has the same dtypes.
+        """
+        pd = _pandas()
+        data = OrderedDict()
+        for i, (column, values) in enumerate(zip(table.all, raw_columns)):
+            name = column.data_type.name
+            if name == "INTEGER":
+                data[i] = _integer_series(pd, values)
+            elif name == "REAL":
+                data[i] = pd.Series(values, dtype="float64")
+            # fixed unit, pandas infers it from the values otherwise
+            elif name == "INTDATETIME": # vectorized epoch microseconds
+                data[i] = pd.Series(pd.to_datetime(
+                    pd.array(values, dtype="Int64"), unit="us"
+                    )).astype(_DATETIME_DTYPE)
+            elif name == "INTDATE": # vectorized date ordinal
+                data[i] = pd.Series(pd.to_datetime(
+                    pd.array(values, dtype="Int64") - _EPOCH_ORDINAL, unit="D"
+                    )).astype(_DATETIME_DTYPE)
+            elif name in ("DATE", "DATETIME"):
+                data[i] = pd.to_datetime(pd.Series(values, dtype="object")
+                                         ).astype(_DATETIME_DTYPE)
+            elif name == "TEXT":
+                data[i] = _text_series(pd, values)
+            else:
+                data[i] = pd.Series(
+                    adaptor.recover_column(i, values), dtype="object")
+        df = pd.DataFrame(data, columns=list(data))
+        df.columns = table.column_names
+        return df
+    
+    def iter_df(self, sel_obj, chunksize=10000):
+        """Execute :class:`~sqlite4dummy.schema.Select` object, yield 
+        `pandas.DataFrame <http://pandas.pydata.org/pandas-docs/stable/generated/pandas.DataFrame.html>`_ 
+        block by block, each has at most ``chunksize`` rows. Results are 
+        fetched with fetchmany, so tables larger than memory can be processed.
+        
+        Columns have the same explicit dtype as 
+        :meth:`~Sqlite3Engine.select_df`, in every block: INTEGER is nullable
+        Int64, REAL is float64, TEXT is string, DATE, DATETIME, INTDATE, 
+        INTDATETIME are datetime64[us], BLOB and PICKLETYPE are object.
+        
+        Requires pandas.
+        
+        **中文文档**
+        
+        执行Select, 分块返回pandas.DataFrame, 每块最多 ``chunksize`` 行。结果用
+        fetchmany分块读取, 所以可以处理比内存更大的表。每列的dtype由列的数据
+        类型决定, 与 :meth:`~Sqlite3Engine.select_df` 相同, 且每块都一样, 不会
+        因为某一块中有NULL而改变。需要安装pandas。
+        """
+        adaptor = PickleTypeConverter.from_select(sel_obj)
+        for records in self._fetch_chunks(sel_obj, chunksize):
+            yield self._df_from_columns(
+                sel_obj.result_descriptor, list(zip(*records)), adaptor)
+    
+    def paginate(self, sel_obj, key, page_size=1000, descending=False,
+                 return_tuple=False):
+        """Execute :class:`~sqlite4dummy.schema.Select` object page by page, 
+        yield list of records. Keyset (seek) pagination is used::
+        
+            SELECT ... WHERE ... AND key > last_seen_key ORDER BY key LIMIT n
+        
+        So each page costs an index seek, no matter how deep it is, unlike 
+        ``LIMIT n OFFSET m`` which has to skip ``m`` rows.
+        
+        :param key: the key column, or list of columns for compound key. Key
+          columns have to be selected, and should be unique all together.
+        :type key: :class:`~sqlite4dummy.schema.Column` or list of Column
+        
+        :param page_size: (default 1000) number of records per page.
+        :type page_size: int
+        
+        :param descending: (default False) walk in descending order.
+        :type descending: boolean
+        
+        ORDER BY, LIMIT and OFFSET of ``sel_obj`` are ignored. Rows having
+        NULL key are skipped. GROUP BY and window function select are not 
+        supported, wrap it with :meth:`~sqlite4dummy.schema.Select.select_from`.
+        
+        **中文文档**
+        
+        使用键集分页(keyset pagination), 逐页执行Select, 每次返回一页record的
+        列表。每一页都只需一次索引定位, 而 ``LIMIT n OFFSET m`` 则需要跳过m行,
+        越往后越慢。``key`` 必须被Select选中, 并且能唯一确定一行。
+        """
+        if sel_obj.GROUP_BY_clause or sel_obj.HAVING_clause:
+            raise SelectObjectError(
+                "paginate doesn't support GROUP BY, use select_from.")
+        # window is computed over the page instead of the whole result
+        if " OVER (" in sel_obj.SELECT_WHAT_clause:
+            raise SelectObjectError(
+                "paginate doesn't support window function, use select_from.")
+        
+        if isinstance(key, (list, tuple)):
+            key_columns = list(key)
+        else:
+            key_columns = [key,]
+        
+        # locate key values in the selected record
+        key_index = list()
+        for column in key_columns:
+            try:
+                key_index.append(sel_obj.all_full_name.index(column.full_name))
+            except ValueError:
+                raise SelectObjectError(
+                    "key column %s has to be selected." % column)
+        
+        key_names = [column.full_name for column in key_columns]
+        if descending:
+            operator, order = "<", "DESC"
+        else:
+            operator, order = ">", "ASC"
+        if len(key_names) == 1:
+            seek_condition = "%s %s ?" % (key_names[0], operator)
+        else: # row value comparison
+            seek_condition = "(%s) %s (%s)" % (
+                ", ".join(key_names), operator, ", ".join(["?"] * len(key_names)))
+        not_null_condition = "\n\tAND ".join(
+            ["%s NOT NULL" % name for name in key_names])
+        
+        if sel_obj.WHERE_clause:
+            where_clause = "%s\n\tAND %s" % (
+                sel_obj.WHERE_clause, not_null_condition)
+        else:
+            where_clause = "WHERE\t%s" % not_null_condition
+        seek_where_clause = "%s\n\tAND %s" % (where_clause, seek_condition)
+        ORDER_BY_clause = "ORDER BY %s" % ", ".join(
+            ["%s %s" % (name, order) for name in key_names])
+        LIMIT_clause = "LIMIT %s" % page_size
+        
+        first_sql, seek_sql = [
+            "\n".join([sel_obj.SELECT_WHAT_clause, sel_obj.SELECT_FROM_clause,
+                       where, ORDER_BY_clause, LIMIT_clause]) \
+            for where in (where_clause, seek_where_clause)
+        ]
+        
+        adaptor = PickleTypeConverter.from_select(sel_obj)
+        if return_tuple:
+            recover = adaptor.recover_tuple_record
+        else:
+            recover = adaptor.recover_list_record
+        
+        # ORDER BY of sel_obj is replaced by the key order
+        params = sel_obj.SELECT_params + sel_obj.FROM_params + \
+            sel_obj.WHERE_params
+        self.logger.info(first_sql)
+        records = self.cursor.execute(first_sql, params).fetchall()
+        while records:
+            last_key = [records[-1][i] for i in key_index]
+            yield list(map(recover, records))
+            if len(records) < page_size:
+                break
+            records = self.cursor.execute(
+                seek_sql, params + last_key).fetchall()
+    
+    def top_n_per_group(self, sel_obj, group, order, n=1, with_ties=False,
+                        return_tuple=False):
+        """Execute :class:`~sqlite4dummy.schema.Select` object, returns the
+        first ``n`` records of each group, in group order then ``order``.
+        Ranking is done by sqlite window function::
+        
+            SELECT * FROM (
+                SELECT ..., ROW_NUMBER() OVER (
+                    PARTITION BY group ORDER BY order) AS rank
+                FROM ... WHERE ...)
+            WHERE rank <= n
+        
+        :param group: Column, SQL_Param, string or list of them.
+        :param order: Column, ``asc()``, ``desc()``, string or list of them.
+        :param n: (default 1) number of records per group.
+        :param with_ties: (default False) use RANK() instead of ROW_NUMBER(), 
+          so records tied with the n-th one are also returned.
+        
+        ORDER BY, LIMIT and OFFSET of ``sel_obj`` are ignored. Requires 
+        sqlite 3.25.0+.
+        
+        **中文文档**
+        
+        返回每个分组中按 ``order`` 排序的前n条记录。分组排名由sqlite的窗口函数
+        完成, 无需将所有数据读入Python再排序。
+        """
+        group_terms = _partition_terms(group)
+        if not group_terms:
+            raise ValueError("group can't be empty.")
+        if with_ties:
+            rank_func = "RANK()"
+        else:
+            rank_func = "ROW_NUMBER()"
+        
+        # partition keys are selected for sorting the final result
+        extra = ["%s AS _sqlite4dummy_group_%s" % (term, i) \
+                 for i, term in enumerate(group_terms)]
+        extra.append("%s %s AS _sqlite4dummy_rank" % (
+            rank_func, over_clause(group, order)))
+        inner_sql = "\n".join([i for i in [
+            ",\n\t".join([sel_obj.SELECT_WHAT_clause,] + extra),
+            sel_obj.SELECT_FROM_clause,
+            sel_obj.WHERE_clause,
+            sel_obj.GROUP_BY_clause,
+            sel_obj.HAVING_clause,
+            ] if i])
+        sql = "SELECT\t*\nFROM\t(%s)\nWHERE\t_sqlite4dummy_rank <= ?\n"\
+            "ORDER BY %s" % (inner_sql.replace("\n", "\n\t"), ", ".join(
+                ["_sqlite4dummy_group_%s" % i \
+                 for i in range(len(group_terms))] + ["_sqlite4dummy_rank",]))
+        params = sel_obj.SELECT_params + _term_params(group) + \
+            _term_params(group) + _term_params(order) + sel_obj.FROM_params + \
+            sel_obj.WHERE_params + sel_obj.GROUP_BY_params + \
+            sel_obj.HAVING_params + [n,]
+        
+        adaptor = PickleTypeConverter.from_select(sel_obj)
+        if return_tuple:
+            recover = adaptor.recover_tuple_record
+        else:
+            recover = adaptor.recover_list_record
+        n_extra = len(extra)
+        self.logger.info(sql)
+        for record in self.cursor.execute(sql, params).fetchall():
+            yield recover(record[:-n_extra])
+    
+    def export(self, sel_obj, path, format="csv", delimiter=None, header=True,
+               null_value="", encoding="utf-8", compression="infer", 
+               chunksize=10000, buffer_size=1024 * 1024):
+        """Stream the result of :class:`~sqlite4dummy.schema.Select` to a csv 
+        or JSON Lines file, can be gzip or bz2 compressed.
+        
+        Results are fetched by chunk with fetchmany, so memory usage is 
+        constant. Values are serialized by ``Column.data_type.to_text``, so 
+        that the csv file can be loaded back by 
+        :meth:`~Sqlite3Engine.import_csv`. In JSON Lines file, each line is an
+        object of {column_name: value}, PICKLETYPE is decoded to Python 
+        object, date, datetime are string, BLOB is hex string.
+        
+        :param sel_obj: :class:`~sqlite4dummy.schema.Select` object.
+        
+        :param path: file path, ``.gz``, ``.bz2`` file is compressed.
+        
+        :param format: (default "csv") "csv" or "jsonl".
+        
+        :param delimiter: (default None) csv field delimiter, by default it's
+          tab for ``.tsv``, ``.tab`` file, otherwise comma.
+        
+        :param header: (default True) whether to write csv header.
+        
+        :param null_value: (default "") csv text of NULL.
+        
+        :param chunksize: (default 10000) how many rows to fetch at a time.
+        
+        :param buffer_size: (default 1MB) size of the write buffer.
+        
+        :returns: number of rows been written.
+        
+        **中文文档**
+        
+        将Select的结果以流的形式写入csv或JSON Lines文件 (可以是gzip或bz2压缩
+        文件)。
+        
+        使用fetchmany分块读取, 内存占用恒定。值由 ``Column.data_type.to_text``
+        序列化, 所以导出的csv文件可以用 :meth:`~Sqlite3Engine.import_csv` 导入。
+        JSON Lines文件中每一行是一个{列名: 值}的对象, PICKLETYPE会被解码为Python
+        对象, date, datetime为字符串, BLOB为十六进制字符串。
+        """
+        if format not in ("csv", "jsonl"):
+            raise ValueError("format has to be 'csv' or 'jsonl'")
+        if delimiter is None:
+            name = path.lower()
+            if infer_compression(path, compression) is not None:
+                name = os.path.splitext(name)[0]
+            if name.endswith(".tsv") or name.endswith(".tab"):
+                delimiter = "\t"
+            else:
+                delimiter = ","
+        
+        columns = sel_obj.result_descriptor.all
+        column_names = sel_obj.result_descriptor.column_names
+        
+        # compile value serializer
+        serializers = list()
+        for column in columns:
+            data_type = column.data_type
+            if format == "csv":
+                to_text = None if data_type.name == "TEXT" else \
+                    data_type.to_text
+            elif data_type.name in ("DATE", "DATETIME", "INTDATE", 
+                                    "INTDATETIME", "BLOB"):
+                to_text = data_type.to_text
+            else: # JSON native value, or decoded PICKLETYPE object
+                to_text = None
+            
+            convert = data_type.convert
+            if convert is None:
+                serializers.append(to_text)
+            elif to_text is None:
+                serializers.append(convert)
+            else:
+                serializers.append(lambda value, to_text=to_text, 
+                                   convert=convert: to_text(convert(value)))
+        
+        if format == "csv":
+            def serialize_record(record):
+                return [null_value if value is None else \
+                        (value if serialize is None else serialize(value)) \
+                        for serialize, value in zip(serializers, record)]
+        else:
+            encoder = json.JSONEncoder(ensure_ascii=False)
+            def serialize_record(record):
+                return encoder.encode(OrderedDict([
+                    (column_name, value if (value is None) or \
+                        (serialize is None) else serialize(value)) \
+                    for column_name, serialize, value in zip(
+                        column_names, serializers, record)
+                ])) + "\n"
+        
+        n_rows = 0
+        with open_text(path, "w", compression, encoding, buffer_size) as f:
+            if format == "csv":
+                writer = csv.writer(f, delimiter=str(delimiter), 
+                                    lineterminator="\n")
+                if header:
+                    writer.writerow(column_names)
+            for records in self._fetch_chunks(sel_obj, chunksize):
+                n_rows += len(records)
+                if format == "csv":
+                    writer.writerows(map(serialize_record, records))
+                else:
+                    f.write("".join(map(serialize_record, records)))
+        return n_rows
+    
+    # DataFrame
+    def _df_column_values(self, series, data_type):
+        """Convert a pandas.Series to list of sqlite3 values, column-wise.
+        NaN, NaT, NA become None, datetime64 become date, datetime or integer
+        for INTDATE, INTDATETIME, categorical become its category value.
+        """
+        pd = _pandas()
+        name = data_type.name
+        mask = series.isna().tolist() if series.hasnans else None
+        
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            if series.dt.tz is not None: # store as naive UTC time
+                series = series.dt.tz_convert(None)
+            if name == "INTDATETIME":
+                values = series.values.astype("datetime64[us]").\
+                    astype("int64").tolist()
+            elif name == "INTDATE":
+                values = (series.values.astype("datetime64[D]").\
+                    astype("int64") + _EPOCH_ORDINAL).tolist()
+            elif name in ("DATE", "DATETIME"):
+                values = series.dt.to_pydatetime().tolist()
+                if name == "DATE":
+                    values = [value.date() for value in values]
+            else:
+                values = series.astype(str).tolist()
+            adapt = None
+        else:
+            values = series.tolist() # python scalar, category value
+            adapt = data_type.adapt
+        
+        if mask is not None:
+            values = [None if isnull else value \
+                      for value, isnull in zip(values, mask)]
+        if adapt is not None: # PICKLETYPE for example, in one pass
+            values = [None if value is None else adapt(value) \
+                      for value in values]
+        return values
+    
+    @_invalidate_on_error
+    def insert_df(self, table, df, chunksize=10000, conflict=None,
+                  keep_failures=False):
+        """Bulk insert a `pandas.DataFrame <http://pandas.pydata.org/pandas-docs/stable/generated/pandas.DataFrame.html>`_.
+        
+        DataFrame columns are mapped to table columns by name, the index is 
+        ignored. Each block of ``chunksize`` rows is converted column by 
+        column: NaN, NaT become NULL, datetime64 become date or datetime (or
+        integer for INTDATE, INTDATETIME), categorical become its values, 
+        PICKLETYPE columns are pickled in one pass. Then it's inserted with
+        executemany. See :meth:`~Sqlite3Engine.insert_many_record` for how 
+        errors are handled.
+        
+        Requires pandas.
+        
+        :param conflict: (default None) conflict resolution algorithm, see 
+          :meth:`~sqlite4dummy.schema.Insert.on_conflict`. ``"ROLLBACK"`` 
+          and ``"FAIL"`` are not supported.
+        
+        :returns: :class:`InsertResult`
+        
+        **中文文档**
+        
+        批量插入pandas.DataFrame。DataFrame的列按名称对应到表的列, 忽略index。
+        每 ``chunksize`` 行按列转换: NaN, NaT转换为NULL, datetime64转换为date或
+        datetime, 分类变量转换为其值, PICKLETYPE列一次性pickle。然后用
+        executemany插入。需要安装pandas。
+        """
+        column_names = [str(column_name) for column_name in df.columns]
+        data_types = _column_data_types(table, column_names)
+        
+        result = InsertResult(keep_failures)
+        ins_obj = table.insert(conflict)
+        _check_bulk_conflict(ins_obj)
+        sql = ins_obj.sql_from_row(Row(column_names, None))
+        for start in range(0, len(df), chunksize):
+            chunk = df.iloc[start:start + chunksize]
+            columns = [self._df_column_values(chunk.iloc[:, i], data_type) \
+                       for i, data_type in enumerate(data_types)]
+            self._insert_batch(sql, zip(*columns), None, result)
+        self._touch(table, self._insert_delta(ins_obj, result.inserted))
+        self._commit()
+        return result
+    
+    # Arrow and Parquet
+    def _arrow_type(self, data_type):
+        """Arrow type of a :mod:`~sqlite4dummy.dtype` data type. PICKLETYPE
+        is the pickled bytes. None means let arrow infer it.
+        """
+        pa = _pyarrow()
+        name = data_type.name
+        if name == "INTEGER":
+            return pa.int64()
+        elif name == "REAL":
+            return pa.float64()
+        elif name == "TEXT":
+            return pa.string()
+        elif name in ("BLOB", "PICKLETYPE"):
+            return pa.binary()
+        elif name in ("DATE", "INTDATE"):
+            return pa.date32()
+        elif name in ("DATETIME", "INTDATETIME"):
+            return pa.timestamp("us")
+        else:
+            return None
+    
+    def _iter_arrow_batches(self, sel_obj, chunksize):
+        """Yield arrow schema, then pyarrow.RecordBatch of each fetchmany 
+        block, built column by column.
+        """
+        pa = _pyarrow()
+        pc = pa.compute
+        columns = sel_obj.result_descriptor.all
+        fields = list()
+        for column in columns:
+            arrow_type = self._arrow_type(column.data_type)
+            if arrow_type is None:
+                arrow_type = pa.null() # replaced by the inferred type
+            fields.append(pa.field(column.column_name, arrow_type))
+        schema = pa.schema(fields)
+        yield schema
+        
+        for records in self._fetch_chunks(sel_obj, chunksize):
+            arrays = list()
+            for column, field, values in zip(columns, fields, zip(*records)):
+                name = column.data_type.name
+                if name == "INTDATE": # vectorized ordinal to date32
+                    array = pc.subtract(pa.array(values, pa.int64()),
+                                        _EPOCH_ORDINAL)
+                    array = array.cast(pa.int32()).cast(pa.date32())
+                elif name == "INTDATETIME": # epoch microseconds
+                    array = pa.array(values, pa.int64()).cast(field.type)
+                elif pa.types.is_null(field.type):
+                    array = pa.array(values)
+                else:
+                    array = pa.array(values, field.type)
+                arrays.append(array)
+            yield pa.RecordBatch.from_arrays(
+                arrays, names=[field.name for field in fields])
+    
+    def to_arrow(self, sel_obj, chunksize=65536):
+        """Execute :class:`~sqlite4dummy.schema.Select`, returns 
+        `pyarrow.Table <https://arrow.apache.org/docs/python/generated/pyarrow.Table.html>`_.
+        
+        Results are fetched by chunk with fetchmany, and converted to arrow
+        column by column. Data type mapping: INTEGER -> int64, REAL -> 
+        float64, TEXT -> string, BLOB -> binary, PICKLETYPE -> binary (the
+        pickled bytes), DATE, INTDATE -> date32, DATETIME, INTDATETIME -> 
+        timestamp("us").
+        
+        Requires pyarrow.
+        
+        **中文文档**
+        
+        执行Select, 返回pyarrow.Table。结果用fetchmany分块读取, 然后按列转化成
+        arrow的数组。需要安装pyarrow。
+        """
+        pa = _pyarrow()
+        batches = self._iter_arrow_batches(sel_obj, chunksize)
+        schema = next(batches)
+        batches = list(batches)
+        if batches:
+            return pa.Table.from_batches(batches)
+        else:
+            return schema.empty_table()
+    
+    def to_parquet(self, sel_obj, path, chunksize=65536, **kwargs):
+        """Stream the result of :class:`~sqlite4dummy.schema.Select` to a 
+        Parquet file, one row group per fetchmany block. ``kwargs`` are passed
+        to ``pyarrow.parquet.ParquetWriter``. See 
+        :meth:`~Sqlite3Engine.to_arrow` for data type mapping.
+        
+        Requires pyarrow.
+        
+        :returns: number of rows been written.
+        
+        **中文文档**
+        
+        将Select的结果以流的形式写入Parquet文件, 每个fetchmany块为一个row group。
+        需要安装pyarrow。
+        """
+        pq = _pyarrow().parquet
+        batches = self._iter_arrow_batches(sel_obj, chunksize)
+        schema = next(batches)
+        writer = None
+        n_rows = 0
+        try:
+            for batch in batches:
+                if writer is None:
+                    writer = pq.ParquetWriter(path, batch.schema, **kwargs)
+                writer.write_batch(batch)
+                n_rows += batch.num_rows
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema, **kwargs)
+        finally:
+            if writer is not None:
+                writer.close()
+        return n_rows
+    
+    @_invalidate_on_error
+    def _load_arrow_batches(self, table, schema, batches, conflict, 
+                            keep_failures):
+        """Insert pyarrow.RecordBatch into table, column by column. Field 
+        names of the arrow ``schema`` are validated before any insert.
+        """
+        pa = _pyarrow()
+        pc = pa.compute
+        column_names = schema.names
+        data_types = _column_data_types(table, column_names)
+        result = InsertResult(keep_failures)
+        ins_obj = table.insert(conflict)
+        _check_bulk_conflict(ins_obj)
+        sql = ins_obj.sql_from_row(Row(column_names, None))
+        for batch in batches:
+            columns = list()
+            for data_type, array in zip(data_types, batch.columns):
+                name = data_type.name
+                if name == "INTDATE": # vectorized date to ordinal
+                    array = pc.add(array.cast(pa.date32()).cast(pa.int32()).\
+                                   cast(pa.int64()), _EPOCH_ORDINAL)
+                    columns.append(array.to_pylist())
+                elif name == "INTDATETIME":
+                    columns.append(array.cast(pa.timestamp("us")).\
+                                   cast(pa.int64()).to_pylist())
+                elif (data_type.adapt is not None) and \
+                    not pa.types.is_binary(array.type): # not pickled yet
+                    adapt = data_type.adapt
+                    columns.append([None if value is None else adapt(value) \
+                                    for value in array.to_pylist()])
+                else:
+                    columns.append(array.to_pylist())
+            self._insert_batch(sql, zip(*columns), None, result)
+        self._touch(table, self._insert_delta(ins_obj, result.inserted))
+        self._commit()
+        return result
+    
+    def from_arrow(self, table, arrow_table, chunksize=65536, conflict=None,
+                   keep_failures=False):
+        """Bulk insert a pyarrow.Table (or RecordBatch) into table. Arrow 
+        column name has to be table column name, otherwise ValueError is 
+        raised before any insert. Each block of ``chunksize``
+        rows is converted column by column, then inserted with executemany.
+        Binary column for PICKLETYPE is treated as pickled bytes. See 
+        :meth:`~Sqlite3Engine.insert_many_record` for how errors are handled.
+        
+        Requires pyarrow.
+        
+        :returns: :class:`InsertResult`
+        
+        **中文文档**
+        
+        将pyarrow.Table批量插入表中, arrow的列名必须是表的列名。每 ``chunksize``
+        行按列转换后用executemany插入。需要安装pyarrow。
+        """
+        pa = _pyarrow()
+        if isinstance(arrow_table, pa.RecordBatch):
+            arrow_table = pa.Table.from_batches([arrow_table])
+        return self._load_arrow_batches(
+            table, arrow_table.schema, 
+            arrow_table.to_batches(max_chunksize=chunksize), 
+            conflict, keep_failures)
+    
+    def from_parquet(self, table, path, chunksize=65536, conflict=None,
+                     keep_failures=False):
+        """Stream a Parquet file into table. See 
+        :meth:`~Sqlite3Engine.from_arrow`.
+        
+        Requires pyarrow.
+        
+        :returns: :class:`InsertResult`
+        
+        **中文文档**
+        
+        以流的形式将Parquet文件导入表中。需要安装pyarrow。
+        """
+        pq = _pyarrow().parquet
+        parquet_file = pq.ParquetFile(path)
+        return self._load_arrow_batches(
+            table, parquet_file.schema_arrow, 
+            parquet_file.iter_batches(batch_size=chunksize),
+            conflict, keep_failures)
     
     # Execute Update
+    @_invalidate_on_error
     def update(self, upd_obj):
         """Execute :class:`~sqlite4dummy.schema.Update` object.
         
@@ -672,10 +2192,91 @@ class Sqlite3Engine(object):
         
         执行 :class:`~sqlite4dummy.schema.Update` 对象。
         """
-        self.cursor.execute(upd_obj.sql)
+        self.cursor.execute(upd_obj.sql, upd_obj.params)
+        self._touch(upd_obj.table, 0)
         self._commit()
     
+    def _key_names(self, table, key):
+        """Resolve the ``key`` argument of bulk update and delete to list of
+        column name. None means primary key.
+        """
+        if key is None:
+            key_names = list(table.primary_key_columns)
+        elif isinstance(key, (list, tuple)):
+            key_names = [str(column).split(".")[-1] for column in key]
+        else:
+            key_names = [str(key).split(".")[-1],]
+        if not key_names:
+            raise ValueError("%s has no primary key, please specify key." % table)
+        return key_names
+    
+    @_invalidate_on_error
+    def update_many(self, table, rows, key=None):
+        """Bulk update many :class:`~sqlite4dummy.row.Row` (or dict) by key.
+        
+        One parameterized statement is generated for each column signature
+        and executed by ``executemany``::
+        
+            UPDATE table
+            SET column1 = ?, column2 = ?
+            WHERE key = ?
+        
+        :param table: the table to update.
+        :type table: :class:`~sqlite4dummy.schema.Table`
+        
+        :param rows: iterable of Row or dict, has to contain the key columns.
+        
+        :param key: (default primary key) column name, Column, or list of them,
+          used to locate the row.
+        
+        :return: number of updated rows.
+        
+        **中文文档**
+        
+        根据key (默认为主键) 批量更新多条Row或字典数据。对于每一种列的组合只生成
+        一条带占位符的UPDATE语句, 然后用 ``executemany`` 执行。
+        """
+        key_names = self._key_names(table, key)
+        
+        converter = PickleTypeConverter(table) # compile converter
+        
+        def to_row(row):
+            if isinstance(row, dict):
+                return Row.from_dict(row)
+            return row
+        
+        updated = 0
+        for columns, group in groupby(
+                map(to_row, rows), key=lambda row: tuple(row.columns)):
+            try:
+                key_index = [columns.index(name) for name in key_names]
+            except ValueError:
+                raise ValueError("row has to contain key %s." % key_names)
+            value_index = [
+                i for i, name in enumerate(columns) if name not in key_names]
+            if not value_index:
+                continue
+            
+            sql = "UPDATE\t%s\nSET\t%s\nWHERE\t%s" % (
+                table.table_name,
+                ",\n\t".join(["%s = ?" % columns[i] for i in value_index]),
+                "\n\tAND ".join(["%s = ?" % columns[i] for i in key_index]),
+            )
+            param_index = value_index + key_index
+            
+            self.logger.info(sql)
+            self.cursor.executemany(sql, (
+                [values[i] for i in param_index] \
+                for values in map(converter.convert_row, group)
+            ))
+            updated += self.cursor.rowcount
+        
+        self._touch(table, 0)
+        self._commit()
+        return updated
+    
     # Execute Insdate
+    @_invalidate_on_error
     def insdate_many_record(self, ins_obj, records):
         """INSDATE (insert or update), batch insert and update records.
         
@@ -718,11 +2319,16 @@ class Sqlite3Engine(object):
         """
         upd_obj = ins_obj.table.update()
         ins_obj.sql_from_record()
+        coercer = self._get_coercer(ins_obj.table)
+        if coercer is not None:
+            records = coercer.filter_records(records, self.error_sink)
         
+        inserted = 0
         for record in records: # try insert one by one
             try: # try insert
                 self.cursor.execute(ins_obj.sql, self.convert_record(
                                                     ins_obj.table, record))
+                inserted += 1
             except sqlite3.IntegrityError:
                 values_kwarg = dict() # update.values() argument
                 where_args = list() # update.values().where() argument
@@ -744,8 +2350,10 @@ class Sqlite3Engine(object):
             except Exception as e:
                 print("Error message: %s" % e)
                 
+        self._touch(ins_obj.table, inserted)
         self._commit()
         
+    @_invalidate_on_error
     def insdate_many_row(self, ins_obj, rows):
         """Another version taking :class:`~sqlite4dummy.row.Row` object data.
         
@@ -755,12 +2363,17 @@ class Sqlite3Engine(object):
         :class:`~sqlite4dummy.row.Row` 数据。
         """
         upd_obj = ins_obj.table.update()
+        coercer = self._get_coercer(ins_obj.table)
+        if coercer is not None:
+            rows = coercer.filter_rows(rows, self.error_sink)
         
+        inserted = 0
         for row in rows: # try insert one by one
             try: # try insert
                 ins_obj.sql_from_row(row)
                 self.cursor.execute(ins_obj.sql, self.convert_row(
                                                     ins_obj.table, row))
+                inserted += 1
                 
             except sqlite3.IntegrityError:
                 values_kwarg = dict() # update.values() argument
@@ -781,9 +2394,11 @@ class Sqlite3Engine(object):
             except Exception as e:
                 print("Error message: %s" % e)
                 
+        self._touch(ins_obj.table, inserted)
         self._commit()
         
     # Execute Delete
+    @_invalidate_on_error
     def delete(self, del_obj):
         """Execute :class:`~sqlite4dummy.schema.Delete` object.
         
@@ -791,12 +2406,145 @@ class Sqlite3Engine(object):
         
         执行 :class:`~sqlite4dummy.schema.Delete` 对象。
         """
-        self.cursor.execute(del_obj.sql)
+        self.cursor.execute(del_obj.sql, del_obj.params)
+        self._touch(del_obj.table, -self.cursor.rowcount)
+        self._commit()
+    
+    def _load_temp_keys(self, key_columns, keys):
+        """Bulk load keys into a new TEMP table, returns the 
+        ``key IN (SELECT ...)`` sql condition.
+        
+        **中文文档**
+        
+        将keys用 ``executemany`` 批量写入一个新的临时表, 返回
+        ``key IN (SELECT ...)`` 形式的SQL条件。
+        """
+        temp_table_name = "_sqlite4dummy_keys_%s" % next(self._temp_key_counter)
+        key_fields = ["_key%s" % i for i in range(len(key_columns))]
+        
+        self.cursor.execute("CREATE TEMP TABLE %s (%s)" % (
+            temp_table_name,
+            ", ".join(["%s %s" % (field, column.data_type.sqlite_name) \
+                       for field, column in zip(key_fields, key_columns)]),
+        ))
+        self._temp_key_tables.append(temp_table_name)
+        
+        if len(key_columns) == 1:
+            keys = ((key,) for key in keys)
+        adapters = [(i, column.data_type.adapt) \
+                    for i, column in enumerate(key_columns) \
+                    if column.data_type.adapt is not None]
+        if adapters:
+            keys = (self._adapt_key(key, adapters) for key in keys)
+        self.cursor.executemany("INSERT INTO temp.%s VALUES (%s)" % (
+            temp_table_name, ", ".join(["?"] * len(key_fields))), keys)
+        
+        if len(key_columns) == 1:
+            key_names = key_columns[0].full_name
+        else: # row value
+            key_names = "(%s)" % ", ".join(
+                [column.full_name for column in key_columns])
+        return "%s IN (SELECT %s FROM temp.%s)" % (
+            key_names, ", ".join(key_fields), temp_table_name)
+    
+    @staticmethod
+    def _adapt_key(key, adapters):
+        """Adapt the values of a key tuple, None is kept as is.
+        
+        **中文文档**
+        
+        对key中的值调用各列的 ``adapt``, None保持不变。
+        """
+        key = list(key)
+        for i, adapt in adapters:
+            if key[i] is not None:
+                key[i] = adapt(key[i])
+        return key
+    
+    def drop_temp_keys(self):
+        """Drop all TEMP key tables created by :meth:`~Sqlite3Engine.in_keys`.
+        
+        **中文文档**
+        
+        删除所有由 :meth:`~Sqlite3Engine.in_keys` 创建的临时表。
+        """
+        while self._temp_key_tables:
+            self.cursor.execute(
+                "DROP TABLE IF EXISTS temp.%s" % self._temp_key_tables.pop())
+        
+    def in_keys(self, column, keys):
+        """Construct a ``column IN (...)`` Select filter for large key set.
+        
+        Unlike :meth:`Column.in_<sqlite4dummy.schema.Column.in_>`, keys are 
+        not rendered into the sql, but loaded into a TEMP table, and the 
+        filter is ``column IN (SELECT _key0 FROM temp...)``. The TEMP table 
+        lives until :meth:`~Sqlite3Engine.drop_temp_keys` or the connection 
+        is closed. 
+        
+        Example::
+        
+            >>> sel = Select(table.all).where(
+            ...     engine.in_keys(table.c._id, range(1000000)))
+        
+        :param column: a Column, or list of Column for compound key. For
+          compound key, keys are tuples.
+        
+        **中文文档**
+        
+        为大量的key构造 ``column IN (...)`` 的Select筛选条件。与 
+        :meth:`Column.in_<sqlite4dummy.schema.Column.in_>` 不同, key不会被写入
+        SQL语句中, 而是被批量写入一个临时表中。临时表一直存在, 直到调用
+        :meth:`~Sqlite3Engine.drop_temp_keys` 或者关闭连接。
+        """
+        if isinstance(column, (list, tuple)):
+            key_columns = list(column)
+        else:
+            key_columns = [column,]
+        return SQL_Param(self._load_temp_keys(key_columns, keys), sql_name="IN")
+    
+    @_invalidate_on_error
+    def delete_many(self, table, keys, key=None):
+        """Delete all rows whose key is in ``keys``.
+        
+        Keys are loaded into a TEMP table via ``executemany``, then deleted 
+        by a single ``DELETE ... WHERE key IN (SELECT ...)``. So there's no
+        limit of how many keys. 
+        
+        :param table: the table to delete from.
+        :type table: :class:`~sqlite4dummy.schema.Table`
+        
+        :param keys: iterable of key value, or tuple of values for compound key.
+        
+        :param key: (default primary key) column name, Column, or list of them.
+        
+        :return: number of deleted rows.
+        
+        **中文文档**
+        
+        删除所有key (默认为主键) 在keys中的行。keys被批量写入一个临时表, 然后只
+        需执行一条 ``DELETE ... WHERE key IN (SELECT ...)``。所以对key的数量没有
+        限制。
+        """
+        key_names = self._key_names(table, key)
+        key_columns = [table.get_column(name) for name in key_names]
+        
+        where = self._load_temp_keys(key_columns, keys)
+        sql = "DELETE FROM\t%s\nWHERE\t%s" % (table.table_name, where)
+        self.logger.info(sql)
+        try:
+            self.cursor.execute(sql)
+            deleted = self.cursor.rowcount
+        finally:
+            self.cursor.execute(
+                "DROP TABLE temp.%s" % self._temp_key_tables.pop())
+        self._touch(table, -deleted)
         self._commit()
+        return deleted
         
     # Drop TABLE, INDEX command aliase
     # CREATE TABLE, INDEX operation can only performed by creating 
     # Table(), Index() objects, and call the create(engine) method.
+    @_invalidate_on_error
     def drop_table(self, table):
         """Drop a table by Table object (or by table name).
         
@@ -805,7 +2553,8 @@ class Sqlite3Engine(object):
         删除某个表的所有数据, 结构, 索引。接受Table对象或table name字符串。
         """
         try:
-            self.execute("DROP TABLE %s" % table)
+            self.cursor.execute("DROP TABLE %s" % table)
+            self._touch(table)
             table.metadata._remove_table(table)
         except sqlite3.OperationalError as e:
             raise e
@@ -821,7 +2570,7 @@ class Sqlite3Engine(object):
         删除某个索引。接受Index对象或index name字符串。
         """
         try:
-            self.execute("DROP INDEX %s" % index)
+            self.cursor.execute("DROP INDEX %s" % index)
             index.metadata._remove_index(index)
         except sqlite3.OperationalError as e:
             raise e
@@ -830,25 +2579,69 @@ class Sqlite3Engine(object):
             raise
         
     # Vanilla method
-    def howmany(self, table):
+    def howmany(self, table, approximate=False):
         """Returns how many records in a table.
         
+        ``SELECT COUNT(*) FROM table`` is used, so sqlite can scan the 
+        smallest index instead of the table. If the count cache is on (see
+        :meth:`~Sqlite3Engine.set_count_cache`), the count is only computed
+        once and then maintained by the engine's own write methods.
+        
         :param table: Represent the table you want to count with.
         :type table: Table object or string
         
+        :param approximate: (default False) if True, read the estimated row
+          count from ``sqlite_stat1`` collected by the last ``ANALYZE``. Falls
+          back to the exact count if there's no statistics.
+        :type approximate: boolean
+        
         **中文文档**
         
         返回表中有多少条记录。
+        
+        使用 ``SELECT COUNT(*) FROM table``, sqlite会自动选择最小的索引进行扫描。
+        如果开启了行数缓存, 则只需计算一次, 之后由本引擎的写入方法维护。
+        ``approximate=True`` 时, 直接读取上一次 ``ANALYZE`` 所收集的
+        ``sqlite_stat1`` 中的估计行数。
         """
+        table_name = str(table)
+        if approximate:
+            count = self._approximate_count(table_name)
+            if count is not None:
+                return count
+        
+        if self.row_counts is not None:
+            try:
+                return self.row_counts[table_name]
+            except KeyError:
+                pass
+            
         try:
-            return self.execute("SELECT COUNT(*) FROM (SELECT * FROM %s)" % table).\
-                fetchone()[0]
+            count = self.cursor.execute(
+                "SELECT COUNT(*) FROM %s" % table).fetchone()[0]
+            if self.row_counts is not None:
+                self.row_counts[table_name] = count
+            return count
         except sqlite3.OperationalError as e:
             raise e
         except:
             print("Argument has to be a Table object or a table name.")
             raise
         
+    def _approximate_count(self, table_name):
+        """Read estimated row count from ``sqlite_stat1``. Returns None if
+        the table has not been analyzed.
+        """
+        try:
+            record = self.cursor.execute(
+                "SELECT stat FROM sqlite_stat1 WHERE tbl = ?", 
+                (table_name,)).fetchone()
+        except sqlite3.OperationalError: # no sqlite_stat1 table
+            return None
+        if record is None:
+            return None
+        return int(record[0].split(" ")[0])
+        
     def tabulate(self, table):
         """Return all data in a table in list of records format.
         
@@ -894,6 +2687,7 @@ class Sqlite3Engine(object):
             print(record)
         print("%s records returns" % counter)
 
+    @_invalidate_on_error
     def remove_all(self, table):
         """Remove all data in a table by Table object (or by table name).
         
@@ -902,7 +2696,10 @@ class Sqlite3Engine(object):
         删除某个表中的数据。接受Table对象或table name字符串。
         """
         try:
-            self.execute("DELETE FROM %s" % table)
+            self.cursor.execute("DELETE FROM %s" % table)
+            self._touch(table)
+            if self.row_counts is not None:
+                self.row_counts[str(table)] = 0
             self._commit()
             print("All data in %s has been removed, (index is keeped)" % table)
         except sqlite3.OperationalError as e:
@@ -917,7 +2714,7 @@ class Sqlite3Engine(object):
         返回数据库中的所有表名的list。
         """
         tablename_list = list()
-        for record in self.execute(
+        for record in self.cursor.execute(
             "SELECT name FROM sqlite_master WHERE type = 'table'"):
             tablename_list.append(record[0])
         return tablename_list
@@ -931,7 +2728,7 @@ class Sqlite3Engine(object):
         返回数据库中的所有索引名的list。
         """
         indexname_list = list()
-        for record in self.execute(
+        for record in self.cursor.execute(
             "SELECT name FROM sqlite_master "
             "WHERE type = 'index' AND sql NOT NULL;"):
             indexname_list.append(record[0])
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+File IO helpers used by the bulk import and export methods of
+:class:`~sqlite4dummy.engine.Sqlite3Engine`. Supports plain, gzip and bz2
+compressed text file.
+
+**中文文档**
+
+:class:`~sqlite4dummy.engine.Sqlite3Engine` 的批量导入导出所使用的文件读写
+工具。支持普通文本文件, 以及gzip, bz2压缩的文本文件。
+
+class, method, func, exception
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+try:
+    from sqlite4dummy.pycompatible import is_py3
+except ImportError:
+    from .pycompatible import is_py3
+
+import io
+
+def infer_compression(path, compression="infer"):
+    """Returns "gzip", "bz2" or None. When ``compression="infer"``, it is
+    decided by the file extension.
+
+    **中文文档**
+
+    根据文件扩展名判断压缩格式, 返回"gzip", "bz2"或None。
+    """
+    if compression != "infer":
+        return compression
+    lower_path = path.lower()
+    if lower_path.endswith(".gz"):
+        return "gzip"
+    elif lower_path.endswith(".bz2"):
+        return "bz2"
+    else:
+        return None
+
+def open_text(path, mode="r", compression="infer", encoding="utf-8",
+              buffer_size=io.DEFAULT_BUFFER_SIZE):
+    """Open a (compressed) text file for csv module or line by line IO.
+
+    :param mode: "r" for read, "w" for write.
+    :param compression: "infer", "gzip", "bz2" or None.
+    :param buffer_size: size of the binary IO buffer.
+
+    **中文文档**
+
+    打开一个文本文件 (可以是压缩文件), 用于csv模块或逐行读写。
+    """
+    compression = infer_compression(path, compression)
+    if compression is None:
+        f = io.open(path, mode + "b", buffering=buffer_size)
+    else:
+        if compression == "gzip":
+            import gzip # imported on demand, keep package import cheap
+            f = gzip.open(path, mode + "b")
+        elif compression == "bz2":
+            import bz2
+            f = bz2.BZ2File(path, mode)
+        else:
+            raise ValueError("unknown compression %r" % compression)
+        if mode == "w":
+            f = io.BufferedWriter(f, buffer_size)
+        else:
+            f = io.BufferedReader(f, buffer_size)
+
+    if is_py3:
+        return io.TextIOWrapper(f, encoding=encoding, newline="")
+    else: # csv module in Python2 works with bytes
+        return f
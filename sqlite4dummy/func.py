@@ -34,6 +34,8 @@ class SqlFunction():
     Implement SQL generic functions.
     
     All method can only take :class:`~sqlite4dummy.schema.Column` object argument.
+    Column is referenced by full name in SQL, so it works with JOIN. The 
+    result is labeled by column name, for example ``COUNT(_id)``.
     
     **中文文档**
     
@@ -47,7 +49,8 @@ class SqlFunction():
         """COUNT(column) function.
         """
         if isinstance(column, Column):
-            return SQL_Param("COUNT(%s)" % column.column_name,
+            return SQL_Param("COUNT(%s)" % column.full_name,
+                              label="COUNT(%s)" % column.column_name,
                               column_name=column.column_name, 
                               table_name=column.table_name,
                               func_name="_count_",
@@ -59,7 +62,8 @@ class SqlFunction():
         """MAX(column) function.
         """
         if isinstance(column, Column):
-            return SQL_Param("MAX(%s)" % column.column_name,
+            return SQL_Param("MAX(%s)" % column.full_name,
+                              label="MAX(%s)" % column.column_name,
                               column_name=column.column_name, 
                               table_name=column.table_name,
                               func_name="_max_",
@@ -71,7 +75,8 @@ class SqlFunction():
         """MIN(column) function.
         """
         if isinstance(column, Column):
-            return SQL_Param("MIN(%s)" % column.column_name,
+            return SQL_Param("MIN(%s)" % column.full_name,
+                              label="MIN(%s)" % column.column_name,
                               column_name=column.column_name, 
                               table_name=column.table_name,
                               func_name="_min_",
@@ -83,7 +88,8 @@ class SqlFunction():
         """ABS(column) function.
         """
         if isinstance(column, Column):
-            return SQL_Param("ABS(%s)" % column.column_name,
+            return SQL_Param("ABS(%s)" % column.full_name,
+                              label="ABS(%s)" % column.column_name,
                               column_name=column.column_name, 
                               table_name=column.table_name,
                               func_name="_abs_",
@@ -95,7 +101,8 @@ class SqlFunction():
         """LENGTH(column) function.
         """
         if isinstance(column, Column):
-            return SQL_Param("LENGTH(%s)" % column.column_name,
+            return SQL_Param("LENGTH(%s)" % column.full_name,
+                              label="LENGTH(%s)" % column.column_name,
                               column_name=column.column_name, 
                               table_name=column.table_name,
                               func_name="_length_",
@@ -107,7 +114,8 @@ class SqlFunction():
         """LOWER(column) function.
         """
         if isinstance(column, Column):
-            return SQL_Param("LOWER(%s)" % column.column_name,
+            return SQL_Param("LOWER(%s)" % column.full_name,
+                              label="LOWER(%s)" % column.column_name,
                               column_name=column.column_name, 
                               table_name=column.table_name,
                               func_name="_lower_",
@@ -119,7 +127,8 @@ class SqlFunction():
         """UPPER(column) function.
         """
         if isinstance(column, Column):
-            return SQL_Param("UPPER(%s)" % column.column_name,
+            return SQL_Param("UPPER(%s)" % column.full_name,
+                              label="UPPER(%s)" % column.column_name,
                               column_name=column.column_name, 
                               table_name=column.table_name,
                               func_name="_upper_",
@@ -131,12 +140,132 @@ class SqlFunction():
         """ROUND(column) function.
         """
         if isinstance(column, Column):
-            return SQL_Param("ROUND(%s)" % column.column_name,
+            return SQL_Param("ROUND(%s)" % column.full_name,
+                              label="ROUND(%s)" % column.column_name,
                               column_name=column.column_name, 
                               table_name=column.table_name,
                               func_name="_round_",
                               dtype=dtype.TEXT,)
         else:
             raise Exception("func.upper()'s argument has to be Column object.")
+    
+    def sum(self, column):
+        """SUM(column) function. Result is INTEGER for INTEGER column, 
+        otherwise REAL.
+        """
+        if isinstance(column, Column):
+            if column.data_type.name == "INTEGER":
+                data_type = dtype.INTEGER
+            else:
+                data_type = dtype.REAL
+            return SQL_Param("SUM(%s)" % column.full_name,
+                              label="SUM(%s)" % column.column_name,
+                              column_name=column.column_name, 
+                              table_name=column.table_name,
+                              func_name="_sum_",
+                              dtype=data_type,)
+        else:
+            raise Exception("func.sum()'s argument has to be Column object.")
+    
+    def avg(self, column):
+        """AVG(column) function.
+        """
+        if isinstance(column, Column):
+            return SQL_Param("AVG(%s)" % column.full_name,
+                              label="AVG(%s)" % column.column_name,
+                              column_name=column.column_name, 
+                              table_name=column.table_name,
+                              func_name="_avg_",
+                              dtype=dtype.REAL,)
+        else:
+            raise Exception("func.avg()'s argument has to be Column object.")
+    
+    def total(self, column):
+        """TOTAL(column) function. Same as SUM, but always returns a float,
+        and 0.0 instead of NULL for empty group.
+        """
+        if isinstance(column, Column):
+            return SQL_Param("TOTAL(%s)" % column.full_name,
+                              label="TOTAL(%s)" % column.column_name,
+                              column_name=column.column_name, 
+                              table_name=column.table_name,
+                              func_name="_total_",
+                              dtype=dtype.REAL,)
+        else:
+            raise Exception("func.total()'s argument has to be Column object.")
+    
+    def group_concat(self, column, separator=None):
+        """GROUP_CONCAT(column[, separator]) function.
+        """
+        if isinstance(column, Column):
+            if separator is None:
+                template = "GROUP_CONCAT(%s)"
+            else:
+                template = "GROUP_CONCAT(%%s, '%s')" % \
+                    separator.replace("'", "''").replace("%", "%%")
+            return SQL_Param(template % column.full_name,
+                              label=template % column.column_name,
+                              column_name=column.column_name, 
+                              table_name=column.table_name,
+                              func_name="_group_concat_",
+                              dtype=dtype.TEXT,)
+        else:
+            raise Exception(
+                "func.group_concat()'s argument has to be Column object.")
+    
+    # window functions, use with SQL_Param.over()
+    def row_number(self):
+        """ROW_NUMBER() window function, use with 
+        :meth:`~sqlite4dummy.sql.SQL_Param.over`.
+        """
+        return SQL_Param("ROW_NUMBER()", func_name="_row_number_",
+                         dtype=dtype.INTEGER)
+    
+    def rank(self):
+        """RANK() window function, use with 
+        :meth:`~sqlite4dummy.sql.SQL_Param.over`.
+        """
+        return SQL_Param("RANK()", func_name="_rank_", dtype=dtype.INTEGER)
+    
+    def dense_rank(self):
+        """DENSE_RANK() window function, use with 
+        :meth:`~sqlite4dummy.sql.SQL_Param.over`.
+        """
+        return SQL_Param("DENSE_RANK()", func_name="_dense_rank_",
+                         dtype=dtype.INTEGER)
+    
+    def _offset_function(self, name, column, offset, default):
+        if not isinstance(column, Column):
+            raise Exception(
+                "func.%s()'s argument has to be Column object." % name.lower())
+        if default is None:
+            template = "%s(%%s, %s)" % (name, int(offset))
+            params = list()
+        else:
+            template = "%s(%%s, %s, ?)" % (name, int(offset))
+            if column.data_type.adapt is not None:
+                default = column.data_type.adapt(default)
+            params = [default,]
+        return SQL_Param(template % column.full_name,
+                         label=template.replace(", ?", "") % column.column_name,
+                         column_name=column.column_name, 
+                         table_name=column.table_name,
+                         func_name="_%s_" % name.lower(),
+                         dtype=column.data_type,
+                         params=params)
+    
+    def lag(self, column, offset=1, default=None):
+        """LAG(column, offset[, default]) window function, value of the 
+        previous ``offset`` row. Use with 
+        :meth:`~sqlite4dummy.sql.SQL_Param.over`.
+        """
+        return self._offset_function("LAG", column, offset, default)
+    
+    def lead(self, column, offset=1, default=None):
+        """LEAD(column, offset[, default]) window function, value of the 
+        next ``offset`` row. Use with 
+        :meth:`~sqlite4dummy.sql.SQL_Param.over`.
+        """
+        return self._offset_function("LEAD", column, offset, default)
         
 func = SqlFunction()
\ No newline at end of file
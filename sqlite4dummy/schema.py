@@ -59,7 +59,15 @@ try:
 except:
     from .pycompatible import _str_type
 
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
+import json
+
+#: :meth:`Column.in_` with more values than this binds them as a single json
+#: array parameter, instead of rendering every value into the sql.
+IN_JSON_THRESHOLD = 1000
+
+#: data type that can be round-tripped through json_each() for IN filter.
+_json_in_dtype_names = {"INTEGER", "REAL", "TEXT", "DATE", "DATETIME"}
 
 ###############################################################################
 #                               Insert Class                                  #
@@ -83,12 +91,48 @@ class Insert(object):
     
     Insert语句的面向对象形式的定义类。
     """
-    def __init__(self, table):
+    #: allowed conflict resolution algorithm, INSERT OR <conflict> INTO ...
+    CONFLICT_OPTIONS = ("ROLLBACK", "ABORT", "FAIL", "IGNORE", "REPLACE")
+    
+    def __init__(self, table, conflict=None):
         self.table = table
-            
+        self.on_conflict(conflict)
+        
+    def on_conflict(self, conflict):
+        """Set the conflict resolution algorithm, one of ``"ROLLBACK"``, 
+        ``"ABORT"``, ``"FAIL"``, ``"IGNORE"``, ``"REPLACE"``, or None for
+        the default behavior.
+        
+        Example::
+        
+            INSERT OR IGNORE INTO table_name VALUES (?,?,...,?);
+        
+        **中文文档**
+        
+        设置冲突处理方式, 可以是 ``"ROLLBACK"``, ``"ABORT"``, ``"FAIL"``, 
+        ``"IGNORE"``, ``"REPLACE"``, 或是None (默认方式)。
+        """
+        if conflict is not None:
+            conflict = conflict.upper()
+            if conflict not in self.CONFLICT_OPTIONS:
+                raise ValueError("conflict has to be one of %s" % (
+                    self.CONFLICT_OPTIONS,))
+        self.conflict = conflict
+        # column signature: sql, None for record, "dict" for named placeholder
+        self._sql_cache = dict()
+        return self
+    
+    @property
+    def INSERT_INTO_clause(self):
+        if self.conflict is None:
+            return "INSERT INTO\t%s" % self.table.table_name
+        else:
+            return "INSERT OR %s INTO\t%s" % (
+                self.conflict, self.table.table_name)
+    
     def sql_from_record(self):
         """Generate the 'INSERT INTO table...' sqlite command for recrod
-        insertion.
+        insertion. The sql is generated only once, then cached.
         
         Example::
     
@@ -96,19 +140,23 @@ class Insert(object):
         
         **中文文档**
         
-        生成INSERT INTO table ... Sqlite语句。
+        生成INSERT INTO table ... Sqlite语句。语句只会生成一次, 之后会被缓存。
         """
-        sql_INSERT_INTO = "INSERT INTO\t%s" % self.table.table_name
-        sql_KEYWORD_VALUES = "VALUES"
-        sql_QUESTION_MARK = "(%s)" % ", ".join(["?"] * len(self.table.all) )
-        template = "%s\n%s\n\t%s;"
-        self.sql = template % (sql_INSERT_INTO,
-                               sql_KEYWORD_VALUES,
-                               sql_QUESTION_MARK,)
+        try:
+            self.sql = self._sql_cache[None]
+        except KeyError:
+            sql_KEYWORD_VALUES = "VALUES"
+            sql_QUESTION_MARK = "(%s)" % ", ".join(["?"] * len(self.table.all) )
+            template = "%s\n%s\n\t%s;"
+            self.sql = template % (self.INSERT_INTO_clause,
+                                   sql_KEYWORD_VALUES,
+                                   sql_QUESTION_MARK,)
+            self._sql_cache[None] = self.sql
+        return self.sql
         
     def sql_from_row(self, row):
         """Generate the 'INSERT INTO table...' sqlite command for row
-        insertion.
+        insertion. The sql is cached for each distinct columns of row.
         
         Example::
         
@@ -119,31 +167,164 @@ class Insert(object):
                 
         **中文文档**
         
-        生成INSERT INTO table ... Sqlite语句。
+        生成INSERT INTO table ... Sqlite语句。对于每种不同的列组合, 语句只会
+        生成一次, 之后会被缓存。
         """
-        sql_INSERT_INTO = "INSERT INTO\t%s" % self.table.table_name
-        sql_COLUMNS = "(%s)" % ", ".join(row.columns)
-        sql_KEYWORD_VALUES = "VALUES"
-        sql_QUESTION_MARK = "(%s)" % ", ".join(["?"] * len(row.columns) )
-        template = "%s\n\t%s\n%s\n\t%s;"
-        self.sql = template % (sql_INSERT_INTO,
-                               sql_COLUMNS,
-                               sql_KEYWORD_VALUES,
-                               sql_QUESTION_MARK,)
+        signature = tuple(row.columns)
+        try:
+            self.sql = self._sql_cache[signature]
+        except KeyError:
+            sql_COLUMNS = "(%s)" % ", ".join(signature)
+            sql_KEYWORD_VALUES = "VALUES"
+            sql_QUESTION_MARK = "(%s)" % ", ".join(["?"] * len(signature) )
+            template = "%s\n\t%s\n%s\n\t%s;"
+            self.sql = template % (self.INSERT_INTO_clause,
+                                   sql_COLUMNS,
+                                   sql_KEYWORD_VALUES,
+                                   sql_QUESTION_MARK,)
+            self._sql_cache[signature] = self.sql
+        return self.sql
+    
+    def sql_from_dict(self):
+        """Generate the 'INSERT INTO table...' sqlite command with named 
+        placeholders of all columns, for dict insertion.
         
+        Example::
+        
+            INSERT INTO table_name 
+                (column1, column2, ..., columnN) 
+            VALUES 
+                (:column1, :column2, ..., :columnN);
+        
+        **中文文档**
+        
+        生成使用命名占位符的INSERT INTO table ... Sqlite语句, 用于直接插入字典。
+        """
+        try:
+            self.sql = self._sql_cache["dict"]
+        except KeyError:
+            sql_COLUMNS = "(%s)" % ", ".join(self.table.column_names)
+            sql_KEYWORD_VALUES = "VALUES"
+            sql_NAMED_MARK = "(%s)" % ", ".join(
+                [":%s" % name for name in self.table.column_names])
+            template = "%s\n\t%s\n%s\n\t%s;"
+            self.sql = template % (self.INSERT_INTO_clause,
+                                   sql_COLUMNS,
+                                   sql_KEYWORD_VALUES,
+                                   sql_NAMED_MARK,)
+            self._sql_cache["dict"] = self.sql
+        return self.sql
+        
+###############################################################################
+#                            Generative Statement                             #
+###############################################################################
+
+class _Generative(object):
+    """Base class of :class:`Select`, :class:`Update` and :class:`Delete`.
+
+    Builder methods never modify the statement in place, they return a new
+    statement, so a base statement can be reused and derived from safely.
+    The compiled SQL is cached on each statement. Subclass lists the names of
+    its clause attributes in ``_clauses``, in SQL order, :meth:`_compile` 
+    joins the non-empty ones.
+
+    **中文文档**
+
+    Select, Update, Delete的基类。所有构造方法都不修改原对象, 而是返回一个新
+    对象, 所以一个基础语句可以被安全地重复使用和派生。编译后的SQL缓存在对象上。
+    子类在 ``_clauses`` 中按SQL顺序列出各子句的属性名, :meth:`_compile` 将其中
+    非空的子句拼接起来。
+    """
+    _sql = None
+    _clauses = ()
+
+    def _clone(self):
+        """Shallow copy, the SQL cache is reset. Builder methods always 
+        rebind attributes instead of modifying them in place, so sharing is
+        safe.
+        """
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__ = self.__dict__.copy()
+        new._sql = None
+        return new
+
+    def _compile(self):
+        """Return SQL, the non-empty clauses joined by new line.
+        """
+        return "\n".join([clause for clause in [
+            getattr(self, name) for name in self._clauses] if clause])
+
+    @property
+    def sql(self):
+        """Return the compiled SQL, it's compiled only once.
+        """
+        if self._sql is None:
+            self._sql = self._compile()
+        return self._sql
+
 ###############################################################################
 #                               Select Class                                  #
 ###############################################################################
 
 class SelectObjectError(Exception):
     pass
-        
-class Select(object):
+
+#: light weight column of a select result, only name and data type.
+ResultColumn = namedtuple("ResultColumn", ["column_name", "data_type"])
+
+class ResultDescriptor(object):
+    """Schema of the result set of a :class:`Select`: column names, data 
+    types and the positions of the columns need conversion. It has the same
+    ``all`` and ``column_names`` attributes as a :class:`Table`, so it can be
+    used to compile :class:`~sqlite4dummy.engine.PickleTypeConverter`.
+    
+    Use :meth:`ResultDescriptor.get`, descriptor is created once per select
+    shape and shared by all Select objects with the same columns.
+    
+    **中文文档**
+    
+    Select查询结果的结构描述: 列名, 数据类型, 以及需要转换的列的位置。拥有与
+    Table相同的 ``all``, ``column_names`` 属性, 可以用于编译PickleTypeConverter。
+    请使用 :meth:`ResultDescriptor.get` 获取, 相同列结构的Select共享同一个描述。
+    """
+    _cache = dict()
+    _cache_size = 1024
+    
+    def __init__(self, column_names, data_types):
+        self.column_names = list(column_names)
+        self.data_types = list(data_types)
+        self.all = [ResultColumn(name, data_type) for name, data_type in \
+                    zip(self.column_names, self.data_types)]
+        # positions of column need data conversion, PICKLETYPE for example
+        self.converted_positions = [i for i, data_type in \
+            enumerate(self.data_types) if data_type.adapt is not None]
+        # compiled PickleTypeConverter, set by Sqlite3Engine on first use
+        self.converter = None
+
+    @classmethod
+    def get(cls, column_names, data_types):
+        """Return the cached descriptor of this select shape.
+        """
+        key = tuple(zip(column_names, data_types))
+        try:
+            return cls._cache[key]
+        except KeyError:
+            if len(cls._cache) >= cls._cache_size:
+                cls._cache.clear()
+            descriptor = cls(column_names, data_types)
+            cls._cache[key] = descriptor
+            return descriptor
+        
+class Select(_Generative):
     """A Select statement objective oriented constructor.
 
     To create a Select object, you have to name a list of Column object has to 
     select. And use where(), limit(), offset(), distinct(), order_by() method 
-    to specify your selection.
+    to specify your selection. These methods return a new Select, the 
+    original one is not changed::
+
+        >>> base = Select(table.all)
+        >>> sel = base.where(table.c._id > 100) # base is still SELECT all
 
     For usage example, go :mod:`unittest page<sqlite4dummy.tests.test_Select>`
     and read the testcase source code.
@@ -152,8 +333,14 @@ class Select(object):
     
     Select语句的面向对象形式的定义类。
     :class:`Sqlite3Engine<sqlite4dummy.engine.Sqlite3Engine>` 在执行Select对象
-    时会将会调用 :attr:`sql<Select.sql>` 其转化为SQL, 然后执行。
+    时会将会调用 :attr:`sql<Select.sql>` 其转化为SQL, 然后执行。where(),
+    order_by()等方法返回新的Select对象, 原对象保持不变。
     """
+    _temp_table = None
+    _clauses = ("SELECT_WHAT_clause", "SELECT_FROM_clause", "WHERE_clause",
+                "GROUP_BY_clause", "HAVING_clause", "ORDER_BY_clause",
+                "LIMIT_clause", "OFFSET_clause")
+    
     def __init__(self, args):
         try:
             self.param_list = [c.to_SQL_Param_instance() for c in args]
@@ -163,36 +350,143 @@ class Select(object):
             
             # 用于储存所有的full_name
             self.all_full_name = [i.full_name for i in self.param_list]
-    
-            # 用于储存SELECT XXX FROM 中 XXX 的部分
-            self.all_selected = [i.param for i in self.param_list]
-            
-            # 用于生成一个临时的Table, 供PickleType Converter编译器使用
-            self.temp_table_columns = [
-                Column(i.label, i.dtype, skip_validate=True) \
-                for i in self.param_list]
         except:
             raise SelectObjectError("Initiation Error")
-
-        self.temp_table = Table("temp_table", MetaData(),
-                                *self.temp_table_columns)
-        
-        # construct SELECT WHAT clause
-        self.SELECT_WHAT_clause = "SELECT\t%s" % ",\n\t".\
-            join(self.all_selected)
         
-        # construct SELECT WHERE clause
+        # FROM子句中的表名 (按出现顺序), 以及JOIN子句
+        self.from_tables = list()
         for i in self.param_list:
-            try:
-                self.SELECT_FROM_clause = "FROM\t%s" % i.table_name
-            except:
-                pass
+            if i.table_name and (i.table_name not in self.from_tables):
+                self.from_tables.append(i.table_name)
+        self.JOIN_clauses = list()
+        self.is_subquery = False
+        
+        # 多表查询时, 列使用full_name, 并以full_name作为结果的列名
+        self.use_full_name = len(self.from_tables) > 1
+        self.is_distinct = False
+        
+        # construct SELECT WHAT and FROM clause
+        self._build_select_what()
+        self._build_select_from()
+        
+        # 用于储存所有被读取的表名, 供查询结果缓存失效时使用
+        self.table_names = set(self.from_tables)
         
         self.WHERE_clause = None
+        self.GROUP_BY_clause = None
+        self.HAVING_clause = None
         self.ORDER_BY_clause = None
         self.LIMIT_clause = None
         self.OFFSET_clause = None
-
+        
+        # 用于储存FROM, WHERE, GROUP BY, HAVING, ORDER BY子句中的占位符所对应的值
+        self.FROM_params = list()
+        self.WHERE_params = list()
+        self.GROUP_BY_params = list()
+        self.HAVING_params = list()
+        self.ORDER_BY_params = list()
+
+    def _build_select_what(self):
+        """Construct SELECT WHAT clause and the result descriptor. In multi
+        table select, plain column is selected and labeled by its full name,
+        such as ``movie.title AS "movie.title"``.
+        """
+        selected, labels = list(), list()
+        for i in self.param_list:
+            if self.use_full_name and i.full_name and \
+                    (i.expression == i.column_name):
+                if i.label == i.column_name:
+                    label = i.full_name
+                else: # keep the alias
+                    label = i.label
+                selected.append('%s AS "%s"' % (i.full_name, label))
+                labels.append(label)
+            else:
+                selected.append(i.param)
+                labels.append(i.label)
+        
+        # 用于储存SELECT XXX FROM 中 XXX 的部分, 以及其中占位符所对应的值
+        self.all_selected = selected
+        self.SELECT_params = [p for i in self.param_list for p in i.params]
+        if self.is_distinct:
+            self.SELECT_WHAT_clause = "SELECT DISTINCT\t%s" % ",\n\t\t".\
+                join(selected)
+        else:
+            self.SELECT_WHAT_clause = "SELECT\t%s" % ",\n\t".join(selected)
+        
+        # 查询结果的结构, 供PickleType Converter编译器使用
+        self.result_descriptor = ResultDescriptor.get(
+            labels, [i.dtype for i in self.param_list])
+        self._temp_table = None
+    
+    def _build_select_from(self):
+        """Construct FROM clause from table names and JOIN clauses. Multiple
+        tables without JOIN are separated by comma.
+        """
+        if self.from_tables:
+            self.SELECT_FROM_clause = "FROM\t%s" % "".join(
+                [", ".join(self.from_tables),] + \
+                ["\n\t%s" % join for join in self.JOIN_clauses])
+        else:
+            self.SELECT_FROM_clause = None
+    
+    def join(self, table, on=None, isouter=False):
+        """JOIN clause, join another table::
+        
+            >>> s = Select([movie.c.title, review.c.score]).\\
+            ...     join(review, on=movie.c._id == review.c.movie_id)
+        
+        When more than one table is involved, selected columns are labeled 
+        by full name, e.g. ``row["movie.title"]``.
+        
+        :param table: :class:`Table` object or table name.
+        :param on: join condition, a :class:`~sqlite4dummy.sql.SQL_Param`. 
+          CROSS JOIN if None.
+        :param isouter: (default False) LEFT OUTER JOIN if True.
+        
+        **中文文档**
+        
+        JOIN子句, 让多表连接在sqlite中利用索引完成。涉及多个表时, 被选择的列使用
+        全名作为结果的列名。
+        """
+        if self.is_subquery:
+            raise SelectObjectError("can't join a select_from() Select.")
+        table_name = getattr(table, "table_name", table)
+        
+        new = self._clone()
+        new.from_tables = [t for t in self.from_tables if t != table_name]
+        if not new.from_tables:
+            raise SelectObjectError(
+                "nothing to join with %s, select from other table." % table_name)
+        if isouter:
+            join_type = "LEFT OUTER JOIN"
+        elif on is None:
+            join_type = "CROSS JOIN"
+        else:
+            join_type = "JOIN"
+        if on is None:
+            clause = "%s %s" % (join_type, table_name)
+        else:
+            clause = "%s %s ON %s" % (join_type, table_name, on.param)
+            new.FROM_params = self.FROM_params + list(on.params)
+        new.JOIN_clauses = self.JOIN_clauses + [clause,]
+        new.table_names = self.table_names | {table_name,}
+        
+        if not new.use_full_name:
+            new.use_full_name = True
+            new._build_select_what()
+        new._build_select_from()
+        return new
+    
+    def outerjoin(self, table, on=None):
+        """LEFT OUTER JOIN clause, see :meth:`Select.join`.
+        
+        **中文文档**
+        
+        LEFT OUTER JOIN子句, 参考 :meth:`Select.join`。
+        """
+        return self.join(table, on=on, isouter=True)
+    
     def where(self, *args):
         """where() method is used to filter records. It takes arbitrary many 
         comparison of column and value. SQL_Param object is created for 
@@ -213,8 +507,57 @@ class Select(object):
             :meth:`~Column.between`, :meth:`~Column.like`, :meth:`~Column.in_`
         
         """
-        self.WHERE_clause = "WHERE\t%s" % "\n\tAND ".join([i.param for i in args])
-        return self
+        new = self._clone()
+        new.WHERE_clause = "WHERE\t%s" % "\n\tAND ".join(
+            [i.param for i in args])
+        new.WHERE_params = [p for i in args for p in i.params]
+        return new
+    
+    def group_by(self, *argv):
+        """GROUP BY clause, takes Column, SQL_Param or column name string.
+        Use it with aggregate function in :data:`~sqlite4dummy.func.func`, 
+        so the aggregation is done in sqlite::
+        
+            >>> s = Select([table.c.year, func.avg(table.c.rate)]).\\
+            ...     group_by(table.c.year)
+        
+        **中文文档**
+        
+        GROUP BY子句, 接受Column, SQL_Param或列名字符串。与 
+        :data:`~sqlite4dummy.func.func` 中的聚合函数一起使用, 让聚合计算在
+        sqlite中完成。
+        """
+        keys = list()
+        for i in argv:
+            if isinstance(i, Column):
+                keys.append(i.full_name)
+            elif isinstance(i, _str_type):
+                keys.append(i)
+            else:
+                keys.append(i.expression)
+        new = self._clone()
+        new.GROUP_BY_clause = "GROUP BY %s" % ", ".join(keys)
+        new.GROUP_BY_params = [p for i in argv if isinstance(i, SQL_Param) \
+                               for p in i.params]
+        return new
+    
+    def having(self, *args):
+        """HAVING clause, filter the groups. Takes comparison of aggregate
+        function, for example::
+        
+            >>> s = Select([table.c.year, func.count(table.c._id)]).\\
+            ...     group_by(table.c.year).\\
+            ...     having(func.count(table.c._id) >= 2)
+        
+        **中文文档**
+        
+        HAVING子句, 用于过滤分组。接受聚合函数的比较表达式。
+        """
+        new = self._clone()
+        new.HAVING_clause = "HAVING\t%s" % "\n\tAND ".join(
+            [i.param for i in args])
+        new.HAVING_params = [p for i in args for p in i.params]
+        return new
     
     def order_by(self, *argv):
         """Sort the result-set by one or more columns. you can custom the 
@@ -241,49 +584,69 @@ class Select(object):
                 priority.append("%s ASC" % i)
             else:
                 priority.append(i.param)
-        self.ORDER_BY_clause = "ORDER BY %s" % ", ".join(priority)
-        return self
+        new = self._clone()
+        new.ORDER_BY_clause = "ORDER BY %s" % ", ".join(priority)
+        new.ORDER_BY_params = [p for i in argv if isinstance(i, SQL_Param) \
+                               for p in i.params]
+        return new
     
     def limit(self, howmany):
         """LIMIT clause.
         """
-        self.LIMIT_clause = "LIMIT %s" % howmany
-        return self
+        new = self._clone()
+        new.LIMIT_clause = "LIMIT %s" % howmany
+        return new
     
     def offset(self, howmany):
         """OFFSET clause.
         """
-        self.OFFSET_clause = "OFFSET %s" % howmany
-        return self
+        new = self._clone()
+        new.OFFSET_clause = "OFFSET %s" % howmany
+        return new
     
     def distinct(self):
         """DISTINCT clause.
         """
-        self.SELECT_WHAT_clause = self.SELECT_WHAT_clause.replace(
-            "SELECT\t", "SELECT DISTINCT\t")
-        self.SELECT_WHAT_clause = self.SELECT_WHAT_clause.replace(
-            "\n\t", "\n\t\t")
-        return self
+        new = self._clone()
+        if not self.is_distinct:
+            new.is_distinct = True
+            new._build_select_what()
+        return new
     
     def select_from(self, select_obj):
-        """SELECT FROM clause.
+        """SELECT FROM clause. Sub query of a single table is aliased by the
+        table name, so columns of that table can be used in the outer query.
         """
-        self.SELECT_FROM_clause = "FROM\t(%s)" % select_obj.sql.replace(
+        new = self._clone()
+        new.SELECT_FROM_clause = "FROM\t(%s)" % select_obj.sql.replace(
                                                     "\n", "\n\t")
-        return self
+        if len(select_obj.from_tables) == 1 and \
+                (not select_obj.JOIN_clauses):
+            new.SELECT_FROM_clause = "%s AS %s" % (
+                new.SELECT_FROM_clause, select_obj.from_tables[0])
+        new.table_names = self.table_names | select_obj.table_names
+        new.FROM_params = list(select_obj.params)
+        new.is_subquery = True
+        return new
     
     @property
-    def sql(self):
-        """Return SELECT SQL.
+    def params(self):
+        """Return values bound to the ``?`` placeholders in :attr:`sql`.
+        """
+        return self.SELECT_params + self.FROM_params + self.WHERE_params + \
+            self.GROUP_BY_params + self.HAVING_params + self.ORDER_BY_params
+    
+    @property
+    def temp_table(self):
+        """A :class:`Table` of the result set, built on first access. Kept for
+        backward compatibility, use :attr:`result_descriptor` instead.
         """
-        return "\n".join([i for i in [
-            self.SELECT_WHAT_clause,
-            self.SELECT_FROM_clause,
-            self.WHERE_clause,
-            self.ORDER_BY_clause,
-            self.LIMIT_clause,
-            self.OFFSET_clause,
-            ] if i ])
+        if self._temp_table is None:
+            self._temp_table = Table("temp_table", MetaData(), *[
+                Column(column.column_name, column.data_type, 
+                       skip_validate=True) \
+                for column in self.result_descriptor.all])
+        return self._temp_table
 
 ###############################################################################
 #                               Update Class                                  #
@@ -292,7 +655,7 @@ class Select(object):
 class UpdateObjectError(Exception):
     pass
 
-class Update(object):
+class Update(_Generative):
     """A Update statement objective oriented constructor.
     
     An update construct with 
@@ -320,11 +683,15 @@ class Update(object):
     
     Update语句的面向对象形式的定义类。
     """
+    _clauses = ("UPDATE_clause", "SET_clause", "WHERE_clause")
+    
     def __init__(self, table):
         self.table = table
         self.UPDATE_clause = "UPDATE\t%s" % self.table.table_name
         self.SET_clause = None
         self.WHERE_clause = None
+        self.SET_params = list()
+        self.WHERE_params = list()
         
     def values(self, **kwarg):
         """Construct set values clause for an UPDATE.
@@ -346,6 +713,7 @@ class Update(object):
         3. 相对更新: 列 = 列 #操作符 列
         """
         res = list()
+        set_params = list()
         for column_name, value in kwarg.items():
             if column_name in self.table.column_names:
                 column = self.table.get_column(column_name)
@@ -353,12 +721,13 @@ class Update(object):
                 raise UpdateObjectError("%s are not column of %s" % (
                     column_name, self.table))
                 
-            if value == None: # 把值更新为NULL, SQL语句为field = NULL
+            if value is None: # 把值更新为NULL, SQL语句为field = NULL
                 res.append("%s = %s" % (column_name, "NULL"))
             else:
                 try: # value是SQL_Param对象, 处理相对更新
                     res.append("%s = %s" % (
                         column_name, value.param)) # 直接使用
+                    set_params.extend(value.params)
                 except: # value是一个值, 处理绝对更新
                     if isinstance(value, _str_type):
                         res.append("%s = '%s'" % ( # 处理字符串的特殊字符
@@ -370,30 +739,31 @@ class Update(object):
                         res.append("%s = %s" % ( # 处理sql param
                             column_name, column.to_sql_param(value)))
             
-        self.SET_clause = "SET\t%s" % ",\n\t".join(res)
-        return self
+        new = self._clone()
+        new.SET_clause = "SET\t%s" % ",\n\t".join(res)
+        new.SET_params = set_params
+        return new
     
     def where(self, *argv):
         """Define WHERE clause in UPDATE SQL command
         """
-        self.WHERE_clause = "WHERE\t%s" % "\n\tAND ".join([i.param for i in argv])
-        return self
+        new = self._clone()
+        new.WHERE_clause = "WHERE\t%s" % "\n\tAND ".join(
+            [i.param for i in argv])
+        new.WHERE_params = [p for i in argv for p in i.params]
+        return new
 
     @property
-    def sql(self):
-        """Return UPDATE SQL.
+    def params(self):
+        """Return values bound to the ``?`` placeholders in :attr:`sql`.
         """
-        return "\n".join([i for i in [
-            self.UPDATE_clause,
-            self.SET_clause,
-            self.WHERE_clause,
-            ] if i ])
+        return self.SET_params + self.WHERE_params
 
 ###############################################################################
 #                               Delete Class                                  #
 ###############################################################################
 
-class Delete(object):
+class Delete(_Generative):
     """A Delete statement objective oriented constructor.
     
     The :meth:`Delete.where` method specifies which record or records that should 
@@ -406,10 +776,13 @@ class Delete(object):
     
     Delete语句的面向对象形式的定义类。
     """
+    _clauses = ("DELETE_FROM_clause", "WHERE_clause")
+    
     def __init__(self, table):
         self.table = table
         self.DELETE_FROM_clause = "DELETE FROM\t%s" % table.table_name
         self.WHERE_clause = None
+        self.WHERE_params = list()
 
     def where(self, *argv):
         """where() method is used to filter records. It takes arbitrary many 
@@ -422,15 +795,17 @@ class Delete(object):
             >>> s = S
             where(column1 >= 3.14, column2.between(1, 100), column3.like("%pattern%"))
         """
-        self.WHERE_clause = "WHERE\t%s" % "\n\tAND ".join([i.param for i in argv])
-        return self
+        new = self._clone()
+        new.WHERE_clause = "WHERE\t%s" % "\n\tAND ".join(
+            [i.param for i in argv])
+        new.WHERE_params = [p for i in argv for p in i.params]
+        return new
 
     @property
-    def sql(self):
-        return "\n".join([i for i in [
-            self.DELETE_FROM_clause,
-            self.WHERE_clause,
-            ] if i ])
+    def params(self):
+        """Return values bound to the ``?`` placeholders in :attr:`sql`.
+        """
+        return self.WHERE_params
         
 ###############################################################################
 #                               Column Class                                  #
@@ -571,7 +946,7 @@ class Column(object):
             return SQL_Param("%s = %s" % (
                 self.full_name, other.full_name))
         else:
-            if other == None: # if Column == None, means column_name is Null
+            if other is None: # if Column == None, means column_name is Null
                 return SQL_Param("%s IS NULL" % self.full_name)
             else:
                 return SQL_Param("%s = %s" % (
@@ -582,7 +957,7 @@ class Column(object):
             return SQL_Param("%s != %s" % (
                 self.full_name, other.full_name))
         else:
-            if other == None: # if Column != None, means column_name NOT Null
+            if other is None: # if Column != None, means column_name NOT Null
                 return SQL_Param("%s NOT NULL" % self.full_name)
             else:
                 return SQL_Param("%s != %s" % (
@@ -657,7 +1032,32 @@ class Column(object):
 
     def in_(self, choice):
         """WHERE ... IN ... clause.
+        
+        If there are more than :data:`IN_JSON_THRESHOLD` values, they are 
+        bound as one json array parameter::
+        
+            column IN (SELECT value FROM json_each(?))
+        
+        So the sql text is constant no matter how many values, and can be 
+        cached by sqlite3 statement cache.
+        
+        **中文文档**
+        
+        当值的个数超过 :data:`IN_JSON_THRESHOLD` 时, 所有的值会被作为一个json
+        数组参数绑定, 而不是逐个写入SQL语句中。这样SQL语句的长度与值的个数无关,
+        并且可以被sqlite3的statement cache缓存。
         """
+        choice = list(choice)
+        if (len(choice) > IN_JSON_THRESHOLD) and \
+            (self.data_type.name in _json_in_dtype_names):
+            if self.data_type.name in ("DATE", "DATETIME"):
+                choice = [str(i) for i in choice]
+            return SQL_Param(
+                    param="%s IN (SELECT value FROM json_each(?))" % (
+                        self.full_name),
+                    sql_name="IN",
+                    params=[json.dumps(choice),],
+                )
         return SQL_Param(
                 param="%s IN (%s)" % (
                     self.full_name, 
@@ -901,6 +1301,7 @@ class Table(object):
         
         self.primary_key_columns = list()
         self.pickletype_columns = list()
+        self.converted_columns = list()
         
         for column in args:
             
@@ -912,6 +1313,8 @@ class Table(object):
                 self.primary_key_columns.append(column.column_name)
             if column.is_pickletype: # 定位PICKLETYPE的列
                 self.pickletype_columns.append(column.column_name)
+            if column.data_type.adapt is not None: # 定位需要转换数据的列
+                self.converted_columns.append(column.column_name)
         
         self.c = ColumnCollection(*self.all)
         self.metadata._add_table(self)
@@ -986,10 +1389,11 @@ class Table(object):
         except Exception as e:
             print(e)
             
-    def insert(self):
-        """Construct an Insert object.
+    def insert(self, conflict=None):
+        """Construct an Insert object. ``conflict`` is the conflict resolution
+        algorithm, see :meth:`Insert.on_conflict`.
         """
-        return Insert(self)
+        return Insert(self, conflict)
 
     def update(self):
         """Construct an Update object.
@@ -58,6 +58,13 @@ class SQL_Param():
     :param dtype: Data type
     :type dtype: :class:`data type<sqlite4dummy.dtype.BaseDataType>`
     
+    :param params: values bound to the ``?`` placeholders in ``param``, in
+      order.
+    :type params: list
+    
+    :param label: column name in query result, default is ``param``.
+    :type label: string
+    
     **中文文档**
     
     SQL_Param是一个SQL参数的语法构造器。接受的输入参数中处理在SQL中的语句以外,
@@ -67,23 +74,162 @@ class SQL_Param():
     def __init__(self, param,  
             column_name=None, full_name=None, table_name=None, 
             func_name=None, sql_name=None,
-            dtype=None):
+            dtype=None, params=None, label=None):
         self.param = param
-        self.label = param
+        if label is None:
+            self.label = param
+        else:
+            self.label = label
+        self.expression = param # param without "AS label"
         self.column_name = column_name
         self.full_name = full_name
         self.table_name = table_name
         self.func_name = func_name
         self.sql_name = sql_name
         self.dtype = dtype
+        if params is None:
+            self.params = list()
+        else:
+            self.params = params
     
     def as_(self, label):
-        self.param = "%s AS %s" % (self.param, label)
+        """Give an alias in SELECT clause, returns self.
+        """
+        self.param = "%s AS %s" % (self.expression, label)
         self.label = label
+        return self
         
     def to_SQL_Param_instance(self):
         return self
     
+    def _compare(self, operator, other):
+        """Compare the expression with a value, a Column or another 
+        SQL_Param. Value is bound to a ``?`` placeholder. Used for HAVING
+        clause, for example ``func.count(table.c._id) >= 2``.
+        """
+        if isinstance(other, SQL_Param):
+            return SQL_Param("%s %s %s" % (
+                self.expression, operator, other.expression),
+                params=self.params + other.params)
+        elif getattr(other, "full_name", None) is not None: # Column
+            return SQL_Param("%s %s %s" % (
+                self.expression, operator, other.full_name),
+                params=list(self.params))
+        else:
+            if (self.dtype is not None) and (self.dtype.adapt is not None):
+                other = self.dtype.adapt(other)
+            return SQL_Param("%s %s ?" % (self.expression, operator),
+                             params=self.params + [other,])
+    
+    def __lt__(self, other):
+        return self._compare("<", other)
+    
+    def __le__(self, other):
+        return self._compare("<=", other)
+    
+    def __eq__(self, other):
+        if other is None:
+            return SQL_Param("%s IS NULL" % self.expression, 
+                             params=list(self.params))
+        return self._compare("=", other)
+    
+    def __ne__(self, other):
+        if other is None:
+            return SQL_Param("%s IS NOT NULL" % self.expression, 
+                             params=list(self.params))
+        return self._compare("!=", other)
+    
+    def __gt__(self, other):
+        return self._compare(">", other)
+    
+    def __ge__(self, other):
+        return self._compare(">=", other)
+    
+    def __hash__(self): # __eq__ is overridden, keep it hashable by identity
+        return id(self)
+    
+    def over(self, partition_by=None, order_by=None):
+        """Turn an aggregate or ranking function into a window function::
+        
+            >>> func.row_number().over(partition_by=t.c.year, 
+            ...                        order_by=desc(t.c.rate))
+            >>> func.sum(t.c.amount).over(order_by=t.c.date) # running total
+        
+        :param partition_by: Column, SQL_Param, string or list of them.
+        :param order_by: Column, ``asc()``, ``desc()``, string or list of 
+          them.
+        
+        Requires sqlite 3.25.0+.
+        
+        **中文文档**
+        
+        将聚合函数或排名函数变为窗口函数, 在sqlite中完成分组排名, 累计求和等计算。
+        """
+        window = over_clause(partition_by, order_by)
+        return SQL_Param("%s %s" % (self.expression, window),
+            label="%s %s" % (self.label, window),
+            column_name=self.column_name, 
+            full_name=self.full_name,
+            table_name=self.table_name,
+            func_name=self.func_name,
+            dtype=self.dtype,
+            params=self.params + _term_params(partition_by) + \
+                _term_params(order_by),
+        )
+    
+def _as_list(items):
+    if items is None:
+        return list()
+    elif isinstance(items, (list, tuple)):
+        return list(items)
+    else:
+        return [items,]
+
+def _partition_terms(items):
+    """Column, SQL_Param, string or list of them => list of expression.
+    """
+    terms = list()
+    for i in _as_list(items):
+        if isinstance(i, _str_type):
+            terms.append(i)
+        elif isinstance(i, SQL_Param):
+            terms.append(i.expression)
+        else: # Column
+            terms.append(i.full_name)
+    return terms
+
+def _order_terms(items):
+    """Column, ``asc()``, ``desc()``, string or list of them => list of
+    ordering term.
+    """
+    terms = list()
+    for i in _as_list(items):
+        if isinstance(i, _str_type):
+            terms.append("%s ASC" % i)
+        elif isinstance(i, SQL_Param):
+            terms.append(i.param)
+        else: # Column
+            terms.append("%s ASC" % i.full_name)
+    return terms
+
+def _term_params(items):
+    """Values bound to the placeholders in SQL_Param terms.
+    """
+    return [p for i in _as_list(items) if isinstance(i, SQL_Param) \
+            for p in i.params]
+
+def over_clause(partition_by=None, order_by=None):
+    """Return the ``OVER (PARTITION BY ... ORDER BY ...)`` window definition.
+    """
+    partition_terms = _partition_terms(partition_by)
+    order_terms = _order_terms(order_by)
+    window = list()
+    if partition_terms:
+        window.append("PARTITION BY %s" % ", ".join(partition_terms))
+    if order_terms:
+        window.append("ORDER BY %s" % ", ".join(order_terms))
+    return "OVER (%s)" % " ".join(window)
+
 _sql_value_error_message = ("Input has to be list of sqlite4dummy.sql.SQL_Param "
                             "object. Your is {0}")
 
@@ -96,6 +242,7 @@ def and_(*clauses):
         return SQL_Param(
             param="(%s)" % " AND ".join([i.param for i in clauses]),
             sql_name="AND",
+            params=[p for i in clauses for p in i.params],
         )
     except AttributeError:
         raise ValueError(_sql_value_error_message.format(repr(clauses)))
@@ -109,6 +256,7 @@ def or_(*clauses):
         return SQL_Param(
             param="(%s)" % " OR ".join([i.param for i in clauses]),
             sql_name="OR",
+            params=[p for i in clauses for p in i.params],
         )
     except AttributeError:
         raise ValueError(_sql_value_error_message.format(repr(clauses)))
@@ -171,6 +319,28 @@ if __name__ == "__main__":
                 "(col1 >= 0 OR col2 <= 1)",
             )
         
+        def test_params(self):
+            self.assertEqual(
+                and_(SQL_Param("col1 >= ?", params=[0]), 
+                     or_(SQL_Param("col2 <= 1"), 
+                         SQL_Param("col3 = ?", params=["a"]))).params,
+                [0, "a"],
+            )
+            
+        def test_compare(self):
+            p = SQL_Param("COUNT(_id)").as_("n")
+            self.assertEqual(p.param, "COUNT(_id) AS n")
+            self.assertEqual((p >= 2).param, "COUNT(_id) >= ?")
+            self.assertEqual((p >= 2).params, [2])
+            self.assertEqual((p == None).param, "COUNT(_id) IS NULL")
+            
+        def test_over(self):
+            p = SQL_Param("ROW_NUMBER()").over(
+                partition_by="year", order_by=[desc("rate"), "title"])
+            self.assertEqual(p.param, "ROW_NUMBER() OVER "
+                "(PARTITION BY year ORDER BY rate DESC, title ASC)")
+            self.assertEqual(over_clause(), "OVER ()")
+            
         def test_asc(self):
             self.assertEqual(asc("col1").param, "col1 ASC")
             
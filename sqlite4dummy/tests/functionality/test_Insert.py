@@ -160,6 +160,59 @@ class InsertUnittest(unittest.TestCase):
         self.engine.insert_row_stream(ins, (row for row in self.rows))
         self.assertEqual(
             len(list(self.engine.execute("SELECT * FROM movie"))), 4)
+
+    def test_sql_cache(self):
+        """测试Insert Sql语句的缓存。
+        """
+        ins = self.movie.insert()
+        self.assertIs(ins.sql_from_record(), ins.sql_from_record())
+        self.assertIs(ins.sql_from_row(self.rows[0]), 
+                      ins.sql_from_row(self.rows[1]))
+        self.assertNotEqual(ins.sql_from_row(Row(["_id"], [1])),
+                            ins.sql_from_row(self.rows[0]))
+
+    def test_conflict(self):
+        """测试INSERT OR IGNORE, INSERT OR REPLACE。
+        """
+        ins = self.movie.insert(conflict="ignore")
+        self.assertEqual(ins.sql_from_record(), 
+            "INSERT OR IGNORE INTO\tmovie\nVALUES\n\t(?, ?, ?, ?, ?, ?, ?, ?);")
+        self.assertRaises(ValueError, self.movie.insert, "DROP")
+        
+        self.engine.insert_many_record(ins, self.records)
+        result = self.engine.insert_many_record(ins, self.records)
+        self.assertEqual((result.inserted, result.ignored), (0, 4))
+        
+        ins = self.movie.insert().on_conflict("REPLACE")
+        record = list(self.records[0])
+        record[1] = "Fantastic Five"
+        self.engine.insert_record(ins, record)
+        self.assertEqual(
+            list(self.engine.execute(
+                "SELECT title FROM movie WHERE _id = 1502712"))[0][0],
+            "Fantastic Five")
+        self.assertEqual(
+            len(list(self.engine.execute("SELECT * FROM movie"))), 4)
+
+    def test_insert_many_dict(self):
+        """测试直接插入字典。
+        """
+        ins = self.movie.insert()
+        dicts = [row.to_dict() for row in self.rows]
+        dicts[1].pop("title")
+        dicts[2]["extra_key"] = None
+        result = self.engine.insert_many_dict(ins, dicts)
+        self.assertEqual(result.inserted, 4)
+        self.assertNotIn("title", dicts[1]) # input not modified
+        self.assertEqual(dicts[0]["tag"], self.records[0][-1])
+        
+        sel = Select(self.movie.all).order_by(self.movie.c.rate)
+        records = list(self.engine.select(sel, return_tuple=True))
+        self.assertEqual(records[0], self.records[0])
+        self.assertEqual(records[1][1], "UnknownTitle")
+        
+        result = self.engine.insert_many_dict(ins, dicts)
+        self.assertEqual(result.ignored, 4)
         
 
 if __name__ == "__main__":
@@ -12,6 +12,7 @@ class, method, func, exception
 
 from __future__ import print_function, unicode_literals
 from sqlite4dummy import *
+from sqlite4dummy.schema import SelectObjectError
 from datetime import datetime, date
 import sqlalchemy
 import unittest
@@ -136,6 +137,49 @@ class SelectUnittest(unittest.TestCase):
         print("{:=^100}".format("select from formatted sql"))
         print(s.sql)
     
+    def test_generative(self):
+        """测试Select的构造方法返回新对象, 原对象不变, 且SQL只编译一次。
+        """
+        movie = self.movie
+        base = Select(movie.all)
+        base_sql = base.sql
+        s1 = base.where(movie.c.year >= 2015)
+        s2 = base.where(movie.c.rate >= 6.0).order_by(movie.c.title).\
+            limit(2).offset(1).distinct()
+        self.assertEqual(base.sql, base_sql)
+        self.assertEqual(base.params, [])
+        self.assertNotIn("year", s2.sql.split("FROM")[1])
+        self.assertIn("LIMIT 2", s2.sql)
+        self.assertNotIn("LIMIT", s1.sql)
+        self.assertIs(s1.sql, s1.sql) # cached
+        self.assertIn("year >= 2015", s1.sql)
+        self.assertNotIn("rate", s1.sql.split("FROM")[1])
+        self.assertEqual(s2.distinct().sql, s2.sql)
+        self.assertEqual(len(list(self.engine.select(base))), 4)
+        self.assertEqual(len(list(self.engine.select(s1))), 2)
+    
+    def test_result_descriptor(self):
+        """测试相同列结构的Select共享同一个ResultDescriptor, 且temp_table仍可用。
+        """
+        movie = self.movie
+        s1 = Select(movie.all)
+        s2 = Select(movie.all).where(movie.c.year >= 2015)
+        descriptor = s1.result_descriptor
+        self.assertIs(descriptor, s2.result_descriptor)
+        self.assertEqual(descriptor.column_names, movie.column_names)
+        self.assertEqual(descriptor.converted_positions, [7])
+        self.assertIsNot(descriptor, 
+                         Select([movie.c._id]).result_descriptor)
+        
+        list(self.engine.select(s1))
+        converter = descriptor.converter
+        self.assertIsNotNone(converter)
+        list(self.engine.select(s2))
+        self.assertIs(descriptor.converter, converter)
+        
+        self.assertEqual(s1.temp_table.column_names, movie.column_names)
+        self.assertIs(s1.temp_table, s1.temp_table)
+    
     # ================= #
     # query with engine #
     # ================= #
@@ -224,6 +268,76 @@ class SelectUnittest(unittest.TestCase):
         movie = self.movie
         results = self.engine.select_dict(Select([func.count(movie.c._id)]))
         self.assertEqual(results["COUNT(_id)"][0], 4)
+
+
+class JoinUnittest(unittest.TestCase):
+    """Unittest of :meth:`sqlite4dummy.schema.Select.join`.
+    """
+    def setUp(self):
+        self.metadata = MetaData()
+        self.movie = Table("movie", self.metadata,
+            Column("_id", dtype.INTEGER, primary_key=True),
+            Column("title", dtype.TEXT),
+            Column("tag", dtype.PICKLETYPE),
+            )
+        self.review = Table("review", self.metadata,
+            Column("_id", dtype.INTEGER, primary_key=True),
+            Column("movie_id", dtype.INTEGER),
+            Column("score", dtype.REAL),
+            Column("tag", dtype.PICKLETYPE),
+            )
+        self.engine = Sqlite3Engine(":memory:")
+        self.metadata.create_all(self.engine)
+        self.engine.insert_many_record(self.movie.insert(), [
+            (1, "Pixels", ["Comedy"]),
+            (2, "Fantastic Four", ["Action"]),
+            (3, "Ant-Man", ["Sci-Fi"]),
+        ])
+        self.engine.insert_many_record(self.review.insert(), [
+            (1, 1, 5.5, {"by": "a"}),
+            (2, 1, 6.0, {"by": "b"}),
+            (3, 2, 4.0, {"by": "c"}),
+        ])
+    
+    def test_join(self):
+        movie, review = self.movie, self.review
+        sel = Select([movie.c._id, movie.c.tag, review.c.score, review.c.tag]).\
+            join(review, on=movie.c._id == review.c.movie_id).\
+            order_by(review.c._id)
+        self.assertIn("FROM\tmovie\n\tJOIN review ON", sel.sql)
+        rows = list(self.engine.select_row(sel))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["movie._id"], 1)
+        self.assertEqual(rows[0]["movie.tag"], ["Comedy"]) # PICKLETYPE
+        self.assertEqual(rows[0]["review.tag"], {"by": "a"})
+        self.assertEqual(rows[2]["review.score"], 4.0)
+        self.assertEqual(sel.table_names, {"movie", "review"})
+        
+        # select from joined table only
+        sel = Select([movie.c.title]).\
+            join(review, on=movie.c._id == review.c.movie_id).\
+            where(review.c.score >= 5.0).distinct()
+        self.assertEqual(list(self.engine.select(sel)), [("Pixels",)])
+    
+    def test_outerjoin(self):
+        movie, review = self.movie, self.review
+        sel = Select([movie.c.title, func.count(review.c._id).as_("n")]).\
+            outerjoin(review, on=movie.c._id == review.c.movie_id).\
+            group_by(movie.c._id).order_by(movie.c._id)
+        self.assertEqual(list(self.engine.select(sel)),
+                         [("Pixels", 2), ("Fantastic Four", 1), ("Ant-Man", 0)])
+        df = self.engine.select_dict(sel)
+        self.assertEqual(list(df), ["movie.title", "n"])
+    
+    def test_multiple_table(self):
+        movie, review = self.movie, self.review
+        sel = Select([movie.c.title, review.c.score]).\
+            where(movie.c._id == review.c.movie_id, review.c.score > 5.0)
+        self.assertIn("FROM\tmovie, review", sel.sql)
+        self.assertEqual(list(self.engine.select(sel)), 
+                         [("Pixels", 5.5), ("Pixels", 6.0)])
+        self.assertRaises(SelectObjectError, 
+            Select([review.c.score]).join, review)
         
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
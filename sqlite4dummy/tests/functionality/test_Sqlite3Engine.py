@@ -0,0 +1,913 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本测试模块用于测试与 :class:`sqlite4dummy.engine.Sqlite3Engine` 有关的功能。
+
+
+class, method, func, exception
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+from __future__ import print_function, unicode_literals
+from sqlite4dummy import *
+from sqlite4dummy.schema import SelectObjectError
+from sqlite4dummy.sql import SQL_Param
+from sqlite4dummy.coerce import CoerceError
+from datetime import datetime, date
+import unittest
+import tempfile
+import shutil
+import gzip
+import json
+import os
+
+class EngineBaseUnittest(unittest.TestCase):
+    """Create a movie table with 4 records.
+    """
+    cache_size = 0
+
+    def setUp(self):
+        self.metadata = MetaData()
+        self.movie = Table("movie", self.metadata,
+            Column("_id", dtype.INTEGER, primary_key=True),
+            Column("title", dtype.TEXT),
+            Column("year", dtype.INTEGER),
+            Column("release_date", dtype.DATE),
+            Column("rate", dtype.REAL),
+            Column("tag", dtype.PICKLETYPE),
+            )
+        self.engine = Sqlite3Engine(":memory:", cache_size=self.cache_size)
+        self.metadata.create_all(self.engine)
+        self.records = [
+            (1, "Fantastic Four", 2015, date(2015, 8, 7), 4.0,
+             ["Action", "Adventure", "Sci-Fi"]),
+            (2, "Pixels", 2015, date(2015, 7, 24), 5.5,
+             ["Action", "Comedy", "Sci-Fi"]),
+            (3, "Before Sunset", 2004, date(2004, 7, 30), 8.1,
+             ["Drama", "Romance"]),
+            (4, "Infernal Affairs", 2002, date(2002, 12, 12), 8.1,
+             ["Crime", "Mystery", "Thriller"]),
+        ]
+        self.engine.insert_many_record(self.movie.insert(), self.records)
+        self.engine.commit()
+
+    def tearDown(self):
+        self.engine.close()
+
+class ResultCacheUnittest(EngineBaseUnittest):
+    """Unittest of :class:`sqlite4dummy.cache.ResultCache` in engine.
+    """
+    cache_size = 16
+
+    def test_cache_hit(self):
+        movie = self.movie
+        sel = Select([func.count(movie.c._id)]).where(movie.c.year >= 2005)
+        self.assertEqual(list(self.engine.select(sel))[0][0], 2)
+        self.assertEqual(list(self.engine.select(sel))[0][0], 2)
+        self.assertEqual(self.engine.result_cache.hits, 1)
+
+    def test_rollback_resets_stats(self):
+        sel = Select([func.count(self.movie.c._id)])
+        list(self.engine.select(sel))
+        list(self.engine.select(sel))
+        cache = self.engine.result_cache
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.engine.rollback()
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def test_pickletype_is_decoded_on_hit(self):
+        sel = Select(self.movie.all)
+        self.assertEqual(list(self.engine.select(sel, return_tuple=True)),
+                         self.records)
+        self.assertEqual(list(self.engine.select(sel, return_tuple=True)),
+                         self.records)
+
+    def test_invalidate_on_write(self):
+        movie = self.movie
+        sel = Select([func.count(movie.c._id)])
+        self.assertEqual(list(self.engine.select(sel))[0][0], 4)
+
+        self.engine.insert_record(movie.insert(),
+            (5, "Pixels 2", 2016, date(2016, 1, 1), 1.0, None))
+        self.assertEqual(list(self.engine.select(sel))[0][0], 5)
+
+        self.engine.delete(movie.delete().where(movie.c._id >= 4))
+        self.assertEqual(list(self.engine.select(sel))[0][0], 3)
+
+        self.engine.update(movie.update().values(year=2000))
+        sel = Select([movie.c.year]).distinct()
+        self.assertEqual([r[0] for r in self.engine.select(sel)], [2000])
+
+        self.engine.remove_all(movie)
+        self.assertEqual(list(self.engine.select(sel)), [])
+
+    def test_other_table_write_keeps_cache(self):
+        other = Table("other", self.metadata, Column("_id", dtype.INTEGER))
+        other.create(self.engine)
+        sel = Select(self.movie.all)
+        list(self.engine.select(sel))
+        self.engine.insert_record(other.insert(), (1,))
+        list(self.engine.select(sel))
+        self.assertEqual(self.engine.result_cache.hits, 1)
+
+    def test_large_result_is_streamed(self):
+        self.engine.set_result_cache(16, max_bytes=500)
+        self.engine._cache_fetch_size = 1
+        sel = Select(self.movie.all)
+        self.assertEqual(list(self.engine.select(sel, return_tuple=True)),
+                         self.records)
+        self.assertEqual(len(self.engine.result_cache), 0)
+
+    def test_invalidate_on_failed_write(self):
+        movie = self.movie
+        self.engine.set_count_cache(True)
+        sel = Select([func.count(movie.c._id)])
+        self.assertEqual(list(self.engine.select(sel))[0][0], 4)
+        self.assertEqual(self.engine.howmany(movie), 4)
+        
+        rows = [Row(["_id", "title"], [5, "Pixels 2"]),
+                Row(["_id", "not_a_column"], [6, "x"])]
+        self.assertRaises(Exception, 
+                          self.engine.insert_many_row, movie.insert(), rows)
+        self.assertEqual(list(self.engine.select(sel))[0][0], 5)
+        self.assertEqual(self.engine.howmany(movie), 5)
+
+class HowmanyUnittest(EngineBaseUnittest):
+    """Unittest of :meth:`sqlite4dummy.engine.Sqlite3Engine.howmany`.
+    """
+    def test_howmany(self):
+        self.assertEqual(self.engine.howmany(self.movie), 4)
+        self.assertEqual(self.engine.howmany("movie"), 4)
+
+    def test_count_cache(self):
+        movie = self.movie
+        self.engine.set_count_cache(True)
+        self.assertEqual(self.engine.howmany(movie), 4)
+        self.assertEqual(self.engine.row_counts["movie"], 4)
+
+        self.engine.insert_many_record(movie.insert(), self.records + [
+            (5, "Pixels 2", 2016, date(2016, 1, 1), 1.0, None)])
+        self.assertEqual(self.engine.howmany(movie), 5)
+
+        self.engine.delete(movie.delete().where(movie.c._id <= 2))
+        self.assertEqual(self.engine.howmany(movie), 3)
+
+        self.engine.execute("DELETE FROM movie WHERE _id = 3")
+        self.assertNotIn("movie", self.engine.row_counts)
+        self.assertEqual(self.engine.howmany(movie), 2)
+
+        self.engine.remove_all(movie)
+        self.assertEqual(self.engine.row_counts["movie"], 0)
+
+    def test_rollback(self):
+        movie = self.movie
+        self.engine.set_count_cache(True)
+        self.engine.set_result_cache(16)
+        sel = Select([func.count(movie.c._id)])
+        self.engine.insert_record(movie.insert(),
+            (5, "Pixels 2", 2016, date(2016, 1, 1), 1.0, None))
+        self.assertEqual(self.engine.howmany(movie), 5)
+        self.assertEqual(list(self.engine.select(sel))[0][0], 5)
+        
+        self.engine.rollback()
+        self.assertEqual(self.engine.howmany(movie), 4)
+        self.assertEqual(list(self.engine.select(sel))[0][0], 4)
+
+    def test_approximate(self):
+        # no statistics, fall back to exact count
+        self.assertEqual(self.engine.howmany(self.movie, approximate=True), 4)
+        self.engine.execute("ANALYZE")
+        self.assertEqual(self.engine.howmany(self.movie, approximate=True), 4)
+
+class PaginateUnittest(EngineBaseUnittest):
+    """Unittest of :meth:`sqlite4dummy.engine.Sqlite3Engine.paginate`.
+    """
+    def test_paginate(self):
+        movie = self.movie
+        pages = list(self.engine.paginate(
+            Select(movie.all), key=movie.c._id, page_size=3, return_tuple=True))
+        self.assertEqual([len(page) for page in pages], [3, 1])
+        self.assertEqual(pages[0] + pages[1], self.records)
+
+    def test_paginate_where_and_descending(self):
+        movie = self.movie
+        sel = Select([movie.c._id, movie.c.title]).where(movie.c.rate >= 5.0)
+        pages = list(self.engine.paginate(
+            sel, key=movie.c._id, page_size=2, descending=True))
+        self.assertEqual([[r[0] for r in page] for page in pages], [[4, 3], [2]])
+
+    def test_paginate_compound_key(self):
+        movie = self.movie
+        sel = Select([movie.c.year, movie.c._id])
+        pages = list(self.engine.paginate(
+            sel, key=[movie.c.year, movie.c._id], page_size=1))
+        self.assertEqual([tuple(page[0]) for page in pages],
+                         [(2002, 4), (2004, 3), (2015, 1), (2015, 2)])
+
+    def test_key_not_selected(self):
+        movie = self.movie
+        pages = self.engine.paginate(Select([movie.c.title]), key=movie.c._id)
+        self.assertRaises(SelectObjectError, list, pages)
+
+    def test_window_function_not_supported(self):
+        movie = self.movie
+        sel = Select([movie.c._id, func.row_number().over(
+            order_by=movie.c.rate).as_("rn")])
+        pages = self.engine.paginate(sel, key=movie.c._id)
+        self.assertRaises(SelectObjectError, list, pages)
+        
+        pages = self.engine.paginate(Select([movie.c._id]).select_from(sel),
+                                     key=movie.c._id, page_size=3)
+        self.assertEqual([len(page) for page in pages], [3, 1])
+
+    def test_order_by_params_ignored(self):
+        movie = self.movie
+        sel = Select([movie.c._id]).order_by(SQL_Param(
+            "CASE WHEN movie.year = ? THEN 0 ELSE 1 END", params=[2015]))
+        self.assertEqual(sel.params, [2015])
+        self.assertEqual([r[0] for r in self.engine.select(sel)][:2], [1, 2])
+        pages = list(self.engine.paginate(sel, key=movie.c._id, page_size=3))
+        self.assertEqual(pages, [[(1,), (2,), (3,)], [(4,)]])
+
+class UpdateManyUnittest(EngineBaseUnittest):
+    """Unittest of :meth:`sqlite4dummy.engine.Sqlite3Engine.update_many`.
+    """
+    def test_update_many(self):
+        movie = self.movie
+        rows = [
+            Row(("_id", "rate", "tag"), (1, 9.0, ["Classic"])),
+            Row(("_id", "rate", "tag"), (2, 9.5, ["Classic"])),
+            {"_id": 3, "title": "Before Sunrise"},
+        ]
+        self.assertEqual(self.engine.update_many(movie, rows), 3)
+        results = list(self.engine.select(Select(movie.all), return_tuple=True))
+        self.assertEqual(results[0][4:], (9.0, ["Classic"]))
+        self.assertEqual(results[1][4:], (9.5, ["Classic"]))
+        self.assertEqual(results[2][1], "Before Sunrise")
+        self.assertEqual(results[3], self.records[3])
+
+    def test_update_many_by_key(self):
+        movie = self.movie
+        rows = [Row(("year", "rate"), (2015, 0.0))]
+        self.assertEqual(
+            self.engine.update_many(movie, rows, key=movie.c.year), 2)
+        self.assertRaises(ValueError, self.engine.update_many,
+                          movie, rows, key="_id")
+
+class DeleteManyUnittest(EngineBaseUnittest):
+    """Unittest of :meth:`sqlite4dummy.engine.Sqlite3Engine.delete_many`
+    and :meth:`sqlite4dummy.engine.Sqlite3Engine.in_keys`.
+    """
+    def test_delete_many(self):
+        self.assertEqual(
+            self.engine.delete_many(self.movie, [1, 3, 5] + list(range(10, 10000))), 2)
+        self.assertEqual(
+            [r[0] for r in self.engine.select(Select([self.movie.c._id]))],
+            [2, 4])
+        self.assertEqual(self.engine.all_tablename, ["movie"])
+
+    def test_delete_many_compound_key(self):
+        movie = self.movie
+        self.engine.delete_many(movie, [(2015, 5.5), (2004, 8.1), (2002, 0.0)],
+                                key=[movie.c.year, movie.c.rate])
+        self.assertEqual(self.engine.howmany(movie), 2)
+
+    def test_in_keys(self):
+        movie = self.movie
+        sel = Select([movie.c._id]).where(
+            self.engine.in_keys(movie.c._id, range(2, 10000)),
+            movie.c.year >= 2005)
+        self.assertEqual([r[0] for r in self.engine.select(sel)], [2])
+        self.engine.drop_temp_keys()
+        self.assertEqual(self.engine._temp_key_tables, [])
+
+class LargeInUnittest(EngineBaseUnittest):
+    """Unittest of :meth:`sqlite4dummy.schema.Column.in_` with large list.
+    """
+    cache_size = 16
+
+    def test_large_in(self):
+        movie = self.movie
+        ids = [2, 4] + list(range(100, 10000))
+        sel = Select([movie.c._id]).where(movie.c._id.in_(ids))
+        self.assertEqual(sel.sql.count("?"), 1)
+        self.assertEqual([r[0] for r in self.engine.select(sel)], [2, 4])
+
+        # same sql, different values are different cache entries
+        sel = Select([movie.c._id]).where(movie.c._id.in_(ids[1:]))
+        self.assertEqual([r[0] for r in self.engine.select(sel)], [4])
+
+    def test_large_in_date_update_delete(self):
+        movie = self.movie
+        dates = [date(2015, 8, 7), date(2004, 7, 30)] + \
+            [date(1900, 1, 1)] * 2000
+        self.engine.update(movie.update().values(rate=0.0).where(
+            movie.c.release_date.in_(dates)))
+        sel = Select([movie.c._id]).where(movie.c.rate == 0.0)
+        self.assertEqual([r[0] for r in self.engine.select(sel)], [1, 3])
+
+        self.engine.delete(movie.delete().where(
+            movie.c.title.in_(["Pixels"] * 2000)))
+        self.assertEqual(self.engine.howmany(movie), 3)
+
+class IntDateUnittest(unittest.TestCase):
+    """Unittest of INTDATE, INTDATETIME data type.
+    """
+    def setUp(self):
+        self.metadata = MetaData()
+        self.event = Table("event", self.metadata,
+            Column("_id", dtype.INTEGER, primary_key=True),
+            Column("day", dtype.INTDATE),
+            Column("time", dtype.INTDATETIME),
+            Column("tag", dtype.PICKLETYPE),
+            )
+        self.engine = Sqlite3Engine(":memory:")
+        self.metadata.create_all(self.engine)
+        self.records = [
+            (1, date(2015, 8, 7), datetime(2015, 8, 7, 12, 30, 0, 123456), 0),
+            (2, date(1900, 1, 1), datetime(1900, 1, 1), [1, 2]),
+            (3, None, None, None),
+        ]
+        self.engine.insert_many_record(self.event.insert(), self.records)
+
+    def tearDown(self):
+        self.engine.close()
+
+    def test_select(self):
+        event = self.event
+        sel = Select(event.all)
+        self.assertEqual(
+            list(self.engine.select(sel, return_tuple=True)), self.records)
+
+        sel = Select([event.c._id]).where(event.c.day >= date(2000, 1, 1))
+        self.assertEqual([r[0] for r in self.engine.select(sel)], [1])
+        sel = Select([event.c._id]).where(
+            event.c.time < datetime(2000, 1, 1))
+        self.assertEqual([r[0] for r in self.engine.select(sel)], [2])
+
+    def test_select_dict(self):
+        d = self.engine.select_dict(Select(self.event.all))
+        self.assertEqual(d["day"], [r[1] for r in self.records])
+        self.assertEqual(d["time"], [r[2] for r in self.records])
+        self.assertEqual(d["tag"], [r[3] for r in self.records])
+
+        d = self.engine.select_dict(
+            Select(self.event.all).where(self.event.c._id > 100))
+        self.assertEqual(d["tag"], [])
+
+    def test_select_df(self):
+        try:
+            import pandas as pd
+        except ImportError:
+            return
+        df = self.engine.select_df(Select(self.event.all))
+        self.assertEqual(df["day"][0], pd.Timestamp(2015, 8, 7))
+        self.assertEqual(df["time"][0],
+                         pd.Timestamp(datetime(2015, 8, 7, 12, 30, 0, 123456)))
+        self.assertTrue(pd.isnull(df["time"][2]))
+        self.assertEqual(df["tag"][1], [1, 2])
+        
+        dfs = list(self.engine.iter_df(Select(self.event.all), chunksize=2))
+        for df in dfs + [self.engine.select_df(
+                Select(self.event.all).where(self.event.c._id > 100))]:
+            self.assertEqual(str(df["day"].dtype), "datetime64[us]")
+            self.assertEqual(str(df["time"].dtype), "datetime64[us]")
+        self.assertTrue(pd.isnull(dfs[1]["day"][0]))
+
+    def test_in_keys_and_delete_many(self):
+        event = self.event
+        sel = Select([event.c._id]).where(self.engine.in_keys(
+            event.c.day, [date(2015, 8, 7), date(2000, 1, 1), None]))
+        self.assertEqual([r[0] for r in self.engine.select(sel)], [1])
+        
+        self.assertEqual(self.engine.delete_many(event, 
+            [date(1900, 1, 1), date(2000, 1, 1)], key=event.c.day), 1)
+        self.assertEqual(self.engine.howmany(event), 2)
+        self.engine.drop_temp_keys()
+
+    def test_reflect(self):
+        metadata = MetaData()
+        metadata.reflect(self.engine)
+        event = metadata.get_table("event")
+        self.assertEqual(event.c.day.data_type.name, "INTDATE")
+        self.assertEqual(event.c.time.data_type.name, "INTDATETIME")
+
+class InsertResultUnittest(EngineBaseUnittest):
+    """Unittest of :class:`sqlite4dummy.engine.InsertResult`.
+    """
+    def test_no_error(self):
+        result = self.engine.insert_many_record(self.movie.insert(),
+            [(i, "Movie %s" % i, 2000, None, 1.0, None) for i in range(5, 10)])
+        self.assertEqual(
+            (result.inserted, result.ignored, result.failed), (5, 0, 0))
+        self.assertEqual(result.failures, None)
+
+    def test_ignored_and_failed(self):
+        movie = self.movie
+        records = [
+            (1, "Duplicate", 2000, None, 1.0, None), # primary key conflict
+            (5, "Bad", 2000, None, object(), None), # unsupported type
+            (6, "Good", 2000, None, 1.0, None),
+            (7, "Too short"),
+        ]
+        result = self.engine.insert_many_record(
+            movie.insert(), records, keep_failures=True)
+        self.assertEqual(
+            (result.inserted, result.ignored, result.failed), (1, 1, 2))
+        self.assertEqual(sorted([r[0][0] for r in result.failures]), [5, 7])
+        self.assertEqual(self.engine.howmany(movie), 5)
+
+    def test_rollback_and_fail_not_supported(self):
+        movie = self.movie
+        self.engine.insert_record(movie.insert(),
+            (5, "Uncommitted", 2000, None, 1.0, None))
+        records = [(1, "Duplicate", 2000, None, 1.0, None),
+                   (6, "Good", 2000, None, 1.0, None)]
+        for conflict in ["ROLLBACK", "fail"]:
+            self.assertRaises(ValueError, self.engine.insert_many_record,
+                              movie.insert(conflict), records)
+            self.assertRaises(ValueError, self.engine.insert_many_dict,
+                              movie.insert(conflict), [{"_id": 1}])
+        # the open transaction is untouched
+        self.assertEqual(self.engine.howmany(movie), 5)
+
+    def test_row_and_stream(self):
+        movie = self.movie
+        rows = [Row(("_id", "title"), (i, "Movie %s" % i)) \
+                for i in range(3, 10)]
+        result = self.engine.insert_row_stream(movie.insert(), rows,
+                                               cache_size=2)
+        self.assertEqual((result.inserted, result.ignored), (5, 2))
+
+        records = [(i, "Movie %s" % i, 2000, None, 1.0, None) \
+                   for i in range(8, 12)]
+        result = self.engine.insert_record_stream(movie.insert(), records,
+                                                  cache_size=3)
+        self.assertEqual((result.inserted, result.ignored), (2, 2))
+
+    def test_heterogeneous_rows(self):
+        movie = self.movie
+        rows = [
+            Row(("_id", "title"), (5, "Movie 5")),
+            Row(("year", "_id"), (2005, 6)),
+            Row(("_id", "title"), (7, "Movie 7")),
+            Row(("_id", "tag"), (8, ["Drama"])),
+        ]
+        result = self.engine.insert_many_row(movie.insert(), rows)
+        self.assertEqual(result.inserted, 4)
+        sel = Select([movie.c._id, movie.c.title, movie.c.year, movie.c.tag]
+                     ).where(movie.c._id >= 5)
+        self.assertEqual(list(self.engine.select(sel, return_tuple=True)), [
+            (5, "Movie 5", None, None),
+            (6, None, 2005, None),
+            (7, "Movie 7", None, None),
+            (8, None, None, ["Drama"]),
+        ])
+        self.assertEqual(
+            self.engine.insert_many_row(movie.insert(), []).inserted, 0)
+
+    def test_fatal_error_is_raised(self):
+        ins = Table("not_exists", MetaData(),
+                    Column("_id", dtype.INTEGER)).insert()
+        self.assertRaises(Exception,
+                          self.engine.insert_many_record, ins, [(1,)])
+
+class FileBaseUnittest(EngineBaseUnittest):
+    """Movie table with a temporary directory.
+    """
+    def setUp(self):
+        super(FileBaseUnittest, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        super(FileBaseUnittest, self).tearDown()
+        shutil.rmtree(self.tmp_dir)
+
+class ImportCsvUnittest(FileBaseUnittest):
+    """Unittest of :meth:`sqlite4dummy.engine.Sqlite3Engine.import_csv`.
+    """
+    def test_import_csv(self):
+        movie = self.movie
+        path = os.path.join(self.tmp_dir, "movie.csv")
+        with open(path, "w") as f:
+            f.write(
+                "_id,title,year,release_date,rate,tag\n"
+                "5,\"Pixels, 2\",2016,2016-01-01,1.0,\"[\"\"Comedy\"\"]\"\n"
+                "6,Mean Girls,,,,\n"
+                "1,Duplicate,2000,2000-01-01,1.0,\n"
+                "7,Bad Year,abc,,,\n"
+            )
+        result = self.engine.import_csv(movie, path, keep_failures=True)
+        self.assertEqual(
+            (result.inserted, result.ignored, result.failed), (2, 1, 1))
+        self.assertEqual(result.failures[0][0][0], "7")
+        sel = Select(movie.all).where(movie.c._id >= 5)
+        self.assertEqual(list(self.engine.select(sel, return_tuple=True)), [
+            (5, "Pixels, 2", 2016, date(2016, 1, 1), 1.0, ["Comedy"]),
+            (6, "Mean Girls", None, None, None, None),
+        ])
+
+    def test_import_tsv_gzip_no_header(self):
+        movie = self.movie
+        path = os.path.join(self.tmp_dir, "movie.tsv.gz")
+        with gzip.open(path, "wb") as f:
+            f.write("5\tPixels 2\n6\tMean Girls\n".encode("utf-8"))
+        result = self.engine.import_csv(movie, path, header=False,
+                                        columns=["_id", "title"], chunksize=1)
+        self.assertEqual(result.inserted, 2)
+        self.assertEqual(self.engine.howmany(movie), 6)
+        self.assertEqual(
+            self.engine.execute("PRAGMA synchronous").fetchone()[0], 2)
+
+    def test_unknown_column(self):
+        movie = self.movie
+        path = os.path.join(self.tmp_dir, "movie.csv")
+        with open(path, "w") as f:
+            f.write("_id,not_a_column\n5,abc\n")
+        self.assertRaises(ValueError, self.engine.import_csv, movie, path)
+        self.assertRaises(ValueError, self.engine.import_csv, movie, path,
+                          header=False, columns=["_id", "titel"])
+        self.assertEqual(self.engine.howmany(movie), 4)
+
+class ExportUnittest(FileBaseUnittest):
+    """Unittest of :meth:`sqlite4dummy.engine.Sqlite3Engine.export`.
+    """
+    def test_export_csv_and_import_back(self):
+        movie = self.movie
+        self.engine.insert_record(movie.insert(),
+            (5, "Pixels, 2", None, None, None, None))
+        path = os.path.join(self.tmp_dir, "movie.csv.gz")
+        self.assertEqual(
+            self.engine.export(Select(movie.all), path, chunksize=2), 5)
+
+        self.engine.remove_all(movie)
+        result = self.engine.import_csv(movie, path)
+        self.assertEqual(result.inserted, 5)
+        self.assertEqual(
+            list(self.engine.select(Select(movie.all), return_tuple=True)),
+            self.records + [(5, "Pixels, 2", None, None, None, None)])
+
+    def test_export_jsonl(self):
+        movie = self.movie
+        path = os.path.join(self.tmp_dir, "movie.jsonl")
+        sel = Select([movie.c._id, movie.c.release_date, movie.c.tag]).\
+            where(movie.c._id <= 2)
+        self.assertEqual(self.engine.export(sel, path, format="jsonl"), 2)
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines[0], {"_id": 1, "release_date": "2015-08-07",
+            "tag": ["Action", "Adventure", "Sci-Fi"]})
+        self.assertEqual(len(lines), 2)
+
+class ArrowUnittest(FileBaseUnittest):
+    """Unittest of :meth:`sqlite4dummy.engine.Sqlite3Engine.to_arrow` and 
+    :meth:`sqlite4dummy.engine.Sqlite3Engine.from_arrow`.
+    """
+    def setUp(self):
+        try:
+            import pyarrow
+        except ImportError:
+            self.skipTest("pyarrow not installed")
+        super(ArrowUnittest, self).setUp()
+
+    def test_to_arrow_and_back(self):
+        import pyarrow as pa
+        movie = self.movie
+        arrow_table = self.engine.to_arrow(Select(movie.all), chunksize=3)
+        self.assertEqual(arrow_table.num_rows, 4)
+        self.assertEqual(arrow_table.schema.field("release_date").type,
+                         pa.date32())
+        self.assertEqual(arrow_table.column("title").to_pylist()[0],
+                         "Fantastic Four")
+
+        self.engine.remove_all(movie)
+        result = self.engine.from_arrow(movie, arrow_table, chunksize=3)
+        self.assertEqual(result.inserted, 4)
+        self.assertEqual(
+            list(self.engine.select(Select(movie.all), return_tuple=True)),
+            self.records)
+
+        empty = self.engine.to_arrow(
+            Select(movie.all).where(movie.c._id > 100))
+        self.assertEqual(empty.num_rows, 0)
+
+    def test_parquet_intdate(self):
+        import pyarrow as pa
+        metadata = MetaData()
+        event = Table("event", metadata,
+            Column("_id", dtype.INTEGER, primary_key=True),
+            Column("day", dtype.INTDATE),
+            Column("time", dtype.INTDATETIME),
+            Column("tag", dtype.PICKLETYPE),
+            )
+        metadata.create_all(self.engine)
+        records = [
+            (1, date(2015, 8, 7), datetime(2015, 8, 7, 12, 30, 0, 123456), 
+             {"a": 1}),
+            (2, None, None, None),
+        ]
+        self.engine.insert_many_record(event.insert(), records)
+
+        path = os.path.join(self.tmp_dir, "event.parquet")
+        self.assertEqual(self.engine.to_parquet(Select(event.all), path), 2)
+        self.engine.remove_all(event)
+        self.assertEqual(self.engine.from_parquet(event, path).inserted, 2)
+        self.assertEqual(
+            list(self.engine.select(Select(event.all), return_tuple=True)),
+            records)
+
+        # plain arrow values are pickled for PICKLETYPE
+        self.engine.remove_all(event)
+        self.engine.from_arrow(event, pa.table({
+            "_id": [1], "day": [date(2000, 1, 1)], "tag": [[1, 2]]}))
+        self.assertEqual(
+            list(self.engine.select(Select(event.all), return_tuple=True)),
+            [(1, date(2000, 1, 1), None, [1, 2])])
+
+    def test_unknown_column(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        movie = self.movie
+        arrow_table = pa.table({"_id": [5, 6], "not_a_column": ["a", "b"]})
+        self.assertRaises(ValueError, self.engine.from_arrow, movie, 
+                          arrow_table, chunksize=1)
+        path = os.path.join(self.tmp_dir, "movie.parquet")
+        pq.write_table(arrow_table, path)
+        self.assertRaises(ValueError, self.engine.from_parquet, movie, path)
+        self.assertEqual(self.engine.howmany(movie), 4)
+
+class InsertFromSelectUnittest(FileBaseUnittest):
+    """Unittest of :meth:`sqlite4dummy.engine.Sqlite3Engine.insert_from_select`
+    and :meth:`sqlite4dummy.engine.Sqlite3Engine.copy_table`.
+    """
+    def setUp(self):
+        super(InsertFromSelectUnittest, self).setUp()
+        self.backup = Table("movie_backup", self.metadata,
+            Column("_id", dtype.INTEGER, primary_key=True),
+            Column("title", dtype.TEXT),
+            Column("tag", dtype.PICKLETYPE),
+            )
+        self.backup.create(self.engine)
+    
+    def test_insert_from_select(self):
+        movie, backup = self.movie, self.backup
+        sel = Select([movie.c._id, movie.c.title, movie.c.tag]).\
+            where(movie.c.year >= 2015)
+        n = self.engine.insert_from_select(backup.insert(), sel)
+        self.assertEqual(n, 2)
+        self.assertEqual(list(self.engine.select(Select(backup.all))), [
+            [1, "Fantastic Four", ["Action", "Adventure", "Sci-Fi"]],
+            [2, "Pixels", ["Action", "Comedy", "Sci-Fi"]],
+        ])
+        
+        # conflict option, and partial columns
+        sel = Select([movie.c._id, movie.c.title])
+        n = self.engine.insert_from_select(backup.insert("IGNORE"), sel,
+            columns=[backup.c._id, "title"])
+        self.assertEqual(n, 2)
+        self.assertEqual(self.engine.howmany(backup), 4)
+        
+        self.assertRaises(ValueError, self.engine.insert_from_select,
+                          backup.insert(), Select([movie.c._id]))
+        self.assertRaises(ValueError, self.engine.insert_from_select,
+                          backup.insert(), Select([movie.c.rate]), ["tag"])
+    
+    def test_copy_table(self):
+        movie, backup = self.movie, self.backup
+        n = self.engine.copy_table(movie, backup, where=movie.c.rate > 5.0)
+        self.assertEqual(n, 3)
+        self.assertEqual(self.engine.select_dict(Select(backup.all))["_id"],
+                         [2, 3, 4])
+        n = self.engine.copy_table(movie, backup, conflict="REPLACE")
+        self.assertEqual(n, 4)
+        self.assertEqual(self.engine.howmany(backup), 4)
+    
+    def test_copy_table_attached(self):
+        path = os.path.join(self.tmp_dir, "archive.sqlite3")
+        metadata = MetaData()
+        archive = Table("movie", metadata, *[
+            Column(column.column_name, column.data_type, 
+                   primary_key=column.primary_key) \
+            for column in self.movie.all])
+        engine = Sqlite3Engine(path, autocommit=True)
+        metadata.create_all(engine)
+        engine.close()
+        
+        self.engine.attach(path, "archive")
+        n = self.engine.copy_table(self.movie, archive, dst_schema="archive")
+        self.assertEqual(n, 4)
+        n = self.engine.copy_table(self.movie, archive, conflict="ignore",
+                                   dst_schema="archive")
+        self.assertEqual(n, 0)
+        self.engine.commit()
+        self.engine.detach("archive")
+        
+        engine = Sqlite3Engine(path)
+        self.assertEqual(list(engine.select(Select(archive.all))), 
+                         [list(record) for record in self.records])
+        engine.close()
+        
+        self.engine.remove_all(self.movie)
+        self.engine.commit()
+        self.engine.attach(path, "archive")
+        n = self.engine.copy_table(archive, self.movie, src_schema="archive",
+                                   where=archive.c.year < 2015)
+        self.assertEqual(n, 2)
+        self.engine.commit()
+        self.engine.detach("archive")
+        self.assertEqual(self.engine.howmany(self.movie), 2)
+
+class DataFrameUnittest(EngineBaseUnittest):
+    """Unittest of :meth:`sqlite4dummy.engine.Sqlite3Engine.insert_df` and
+    :meth:`sqlite4dummy.engine.Sqlite3Engine.iter_df`.
+    """
+    def setUp(self):
+        try:
+            import pandas
+        except ImportError:
+            self.skipTest("pandas not installed")
+        super(DataFrameUnittest, self).setUp()
+
+    def test_insert_df(self):
+        import pandas as pd
+        movie = self.movie
+        df = pd.DataFrame({
+            "_id": [1, 5, 6],
+            "title": ["Duplicate", "Pixels 2", None],
+            "year": [2000.0, None, 2017.0],
+            "release_date": pd.to_datetime(["2000-01-01", "2016-01-01", None]),
+            "tag": [None, ["Comedy"], {"a": 1}],
+        }, index=[10, 20, 30])
+        df["title"] = df["title"].astype("category")
+        result = self.engine.insert_df(movie, df, chunksize=2)
+        self.assertEqual((result.inserted, result.ignored), (2, 1))
+        sel = Select([movie.c._id, movie.c.title, movie.c.year, 
+                      movie.c.release_date, movie.c.tag]).\
+            where(movie.c._id >= 5)
+        self.assertEqual(list(self.engine.select(sel, return_tuple=True)), [
+            (5, "Pixels 2", None, date(2016, 1, 1), ["Comedy"]),
+            (6, None, 2017, None, {"a": 1}),
+        ])
+
+        self.assertRaises(ValueError, self.engine.insert_df, movie, 
+                          pd.DataFrame({"not_a_column": [1]}))
+
+    def test_iter_df(self):
+        import pandas as pd
+        movie = self.movie
+        self.engine.insert_record(movie.insert(), 
+            (5, "Pixels 2", None, None, None, None))
+        dfs = list(self.engine.iter_df(Select(movie.all), chunksize=2))
+        self.assertEqual([len(df) for df in dfs], [2, 2, 1])
+        for df in dfs: # same dtype in every chunk, NULL or not
+            self.assertEqual(str(df["year"].dtype), "Int64")
+            self.assertIsInstance(df["title"].dtype, pd.StringDtype)
+            # the last chunk has only NULL date
+            self.assertEqual(str(df["release_date"].dtype), "datetime64[us]")
+        self.assertTrue(pd.isnull(dfs[2]["year"][0]))
+        self.assertEqual(str(dfs[0]["rate"].dtype), "float64")
+        self.assertTrue(
+            pd.api.types.is_datetime64_any_dtype(dfs[0]["release_date"]))
+        self.assertEqual(dfs[0]["release_date"][0], pd.Timestamp(2015, 8, 7))
+        self.assertEqual(dfs[1]["tag"][1], ["Crime", "Mystery", "Thriller"])
+        self.assertTrue(pd.isnull(dfs[2]["release_date"][0]))
+        self.assertEqual(
+            list(self.engine.iter_df(Select(movie.all).where(movie.c._id > 9))),
+            [])
+
+    def test_select_df(self):
+        import pandas as pd
+        movie = self.movie
+        self.engine.insert_record(movie.insert(), 
+            (5, None, None, None, None, None))
+        df = self.engine.select_df(Select(movie.all))
+        self.assertEqual(str(df["_id"].dtype), "Int64")
+        self.assertEqual(str(df["year"].dtype), "Int64")
+        self.assertTrue(pd.isnull(df["year"][4]))
+        self.assertEqual(df["year"][0], 2015)
+        self.assertIsInstance(df["title"].dtype, pd.StringDtype)
+        self.assertEqual(str(df["rate"].dtype), "float64")
+        self.assertTrue(
+            pd.api.types.is_datetime64_any_dtype(df["release_date"]))
+        self.assertEqual(df["tag"][0], ["Action", "Adventure", "Sci-Fi"])
+
+        df = self.engine.select_df(Select(movie.all).where(movie.c._id > 9))
+        self.assertEqual(len(df), 0)
+        self.assertEqual(list(df.columns), movie.column_names)
+        self.assertEqual(str(df["release_date"].dtype), "datetime64[us]")
+
+    def test_select_df_fallback(self):
+        movie = self.movie
+        # sqlite3 doesn't enforce the declared type
+        self.engine.cursor.execute("UPDATE movie SET year = 2015.5 WHERE _id = 1")
+        df = self.engine.select_df(Select([movie.c.year]))
+        self.assertEqual(str(df["year"].dtype), "float64")
+        self.assertEqual(df["year"][0], 2015.5)
+        
+        self.engine.cursor.execute("UPDATE movie SET year = 'abc' WHERE _id = 1")
+        df = self.engine.select_df(Select([movie.c.year]))
+        self.assertEqual(str(df["year"].dtype), "object")
+        self.assertEqual(df["year"][0], "abc")
+        
+        # ROUND() is declared as TEXT, but returns REAL
+        df = self.engine.select_df(Select([func.round(movie.c.rate)]))
+        self.assertEqual(str(df.iloc[:, 0].dtype), "object")
+        self.assertIsInstance(df.iloc[0, 0], float)
+
+    def test_insert_df_intdate(self):
+        import pandas as pd
+        metadata = MetaData()
+        event = Table("event", metadata,
+            Column("_id", dtype.INTEGER, primary_key=True),
+            Column("day", dtype.INTDATE),
+            Column("time", dtype.INTDATETIME),
+            )
+        metadata.create_all(self.engine)
+        df = pd.DataFrame({
+            "_id": [1, 2],
+            "day": pd.to_datetime(["2015-08-07", None]),
+            "time": pd.to_datetime(["2015-08-07 12:30:00.123456", None]),
+        })
+        self.engine.insert_df(event, df)
+        self.assertEqual(
+            list(self.engine.select(Select(event.all), return_tuple=True)), [
+                (1, date(2015, 8, 7), datetime(2015, 8, 7, 12, 30, 0, 123456)),
+                (2, None, None),
+            ])
+
+class CoerceUnittest(unittest.TestCase):
+    """Unittest of :meth:`sqlite4dummy.engine.Sqlite3Engine.set_coerce`.
+    """
+    def setUp(self):
+        self.metadata = MetaData()
+        self.person = Table("person", self.metadata,
+            Column("_id", dtype.INTEGER, primary_key=True),
+            Column("name", dtype.TEXT, nullable=False),
+            Column("age", dtype.INTEGER, default=18),
+            Column("birthday", dtype.DATE),
+            )
+        self.engine = Sqlite3Engine(":memory:", coerce=True)
+        self.metadata.create_all(self.engine)
+
+    def tearDown(self):
+        self.engine.close()
+
+    def test_insert_many_record(self):
+        person = self.person
+        result = self.engine.insert_many_record(person.insert(), [
+            (1, "Jack", "30", "2000-01-01"),
+            (2, "Tom", None, None),
+            (3, None, 20, None), # NOT NULL
+            (4, "Bob", "abc", None), # not an integer
+            (5, "Mike"), # wrong length
+        ])
+        self.assertEqual(
+            list(self.engine.select(Select(person.all), return_tuple=True)),
+            [(1, "Jack", 30, date(2000, 1, 1)), (2, "Tom", 18, None)])
+        self.assertEqual((result.inserted, result.failed), (2, 3))
+        self.assertEqual(result.failures, None)
+        self.assertFalse(hasattr(self.engine, "rejected")) # nothing retained
+
+        result = self.engine.insert_many_record(person.insert(), [
+            (6, "Bob", "abc", None), (7, "Tom", "20", None),
+        ], keep_failures=True)
+        self.assertEqual([r[0][0] for r in result.failures], [6])
+        for _, e in result.failures:
+            self.assertIsInstance(e, CoerceError)
+
+    def test_insert_row(self):
+        person = self.person
+        rejected = list()
+        self.engine.set_coerce(True, 
+            error_sink=lambda row, e: rejected.append(row))
+        self.engine.insert_many_row(person.insert(), [
+            Row(("_id", "name", "age"), (1, "Jack", 30.0)),
+            Row(("_id", "name", "age"), (2, None, 30.0)),
+            Row(("_id", "age"), (3, 30.0)),
+        ])
+        self.assertEqual(self.engine.howmany(person), 1)
+        self.assertEqual([row._id for row in rejected], [2, 3])
+
+        self.assertRaises(CoerceError, self.engine.insert_record,
+                          person.insert(), (4, "Tom", 3.5, None))
+
+    def test_insert_many_dict(self):
+        person = self.person
+        result = self.engine.insert_many_dict(person.insert(), [
+            {"_id": 1, "name": "Jack", "birthday": "2000-01-01"},
+            {"_id": 2, "age": 30},
+        ])
+        self.assertEqual((result.inserted, result.failed), (1, 1))
+        self.assertEqual(
+            list(self.engine.select(Select(person.all), return_tuple=True)),
+            [(1, "Jack", 18, date(2000, 1, 1))])
+
+    def test_no_coerce(self):
+        self.engine.set_coerce(False)
+        self.engine.insert_record(self.person.insert(), (1, "Jack", "30", None))
+        self.assertEqual(
+            list(self.engine.select(Select([self.person.c.age])))[0][0], 30)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -78,6 +78,22 @@ class UpdateSqlUnittest(unittest.TestCase):
             where(t.c._id == 1, t.c._text == "abc")
         print("{:=^100}".format("update sql"))
         print(upd.sql)
+    
+    def test_generative(self):
+        """测试Update, Delete的构造方法返回新对象, 原对象不变。
+        """
+        t = self.table
+        base = t.update().values(_int=200)
+        upd = base.where(t.c._id == 1)
+        self.assertNotIn("WHERE", base.sql)
+        self.assertIn("WHERE", upd.sql)
+        self.assertIs(upd.sql, upd.sql)
+        self.assertIn("_id = 1", upd.sql)
+        
+        base = t.delete()
+        dlt = base.where(t.c._id == 2)
+        self.assertNotIn("WHERE", base.sql)
+        self.assertIn("_id = 2", dlt.sql)
         
     def test_update(self):
         """测试engine.update()的功能。
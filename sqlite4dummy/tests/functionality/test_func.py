@@ -12,6 +12,7 @@ class, method, func, exception
 from __future__ import print_function, unicode_literals
 from sqlite4dummy import *
 from sqlite4dummy.tests.basetest import *
+from sqlite4dummy.sql import SQL_Param
 import unittest
 
 class SqlFuncUnittest(AdvanceUnittestHasData):
@@ -112,6 +113,140 @@ class SqlFuncUnittest(AdvanceUnittestHasData):
         for row in self.engine.select_row(sel):
             print(row.data)
             break
+    
+    def test_group_by_having(self):
+        """测试GROUP BY, HAVING以及sum, avg, total, group_concat聚合函数。
+        """
+        table = self.all_type
+        expected = dict()
+        for _id, _int, _float in self.engine.select(
+                Select([table.c._id, table.c._int, table.c._float])):
+            expected.setdefault(_int, list()).append((_id, _float))
+        
+        sel = Select([
+            table.c._int,
+            func.count(table.c._id).as_("n"),
+            func.sum(table.c._id),
+            func.avg(table.c._float),
+            func.total(table.c._float),
+            func.group_concat(table.c._id, "|"),
+        ]).group_by(table.c._int).order_by(table.c._int)
+        results = list(self.engine.select(sel))
+        self.assertEqual([r[0] for r in results], sorted(expected))
+        for _int, n, sum_id, avg_float, total_float, ids in results:
+            group = expected[_int]
+            self.assertEqual(n, len(group))
+            self.assertEqual(sum_id, sum([i for i, _ in group]))
+            self.assertAlmostEqual(avg_float, 
+                                   sum([f for _, f in group]) / len(group))
+            self.assertAlmostEqual(total_float, sum([f for _, f in group]))
+            self.assertEqual(sorted(map(int, ids.split("|"))), 
+                             sorted([i for i, _ in group]))
+        
+        # result column data type
+        descriptor = sel.result_descriptor
+        self.assertEqual(descriptor.column_names[1], "n")
+        self.assertEqual([data_type.name for data_type in 
+                          descriptor.data_types[1:]],
+                         ["INTEGER", "INTEGER", "REAL", "REAL", "TEXT"])
+        
+        # HAVING
+        having = sel.having(func.count(table.c._id) >= 2)
+        self.assertEqual(having.params, [2])
+        self.assertEqual([r[0] for r in self.engine.select(having)],
+                         sorted([k for k, v in expected.items() if len(v) >= 2]))
+        self.assertEqual(len(list(self.engine.select(sel))), len(expected))
+    
+    def test_group_by_params(self):
+        """测试带有占位符的GROUP BY分组键。
+        """
+        table = self.all_type
+        parity = SQL_Param("%s %% ?" % table.c._int.full_name, params=[2])
+        sel = Select([func.count(table.c._id)]).group_by(parity).\
+            having(func.count(table.c._id) >= 1)
+        self.assertEqual(sel.params, [2, 1])
+        expected = set()
+        n = 0
+        for (_int,) in self.engine.select(Select([table.c._int])):
+            expected.add(None if _int is None else _int % 2)
+            n += 1
+        counts = [r[0] for r in self.engine.select(sel)]
+        self.assertEqual((len(counts), sum(counts)), (len(expected), n))
+    
+    def test_window_function(self):
+        """测试row_number, rank, lag, lead以及累计求和等窗口函数。
+        """
+        table = self.all_type
+        records = list(self.engine.select(
+            Select([table.c._id, table.c._int]).order_by(table.c._id)))
+        
+        sel = Select([
+            table.c._id,
+            func.row_number().over(
+                partition_by=table.c._int, order_by=table.c._id).as_("rn"),
+            func.rank().over(order_by=table.c._int).as_("rk"),
+            func.sum(table.c._int).over(order_by=table.c._id).as_("running"),
+            func.lag(table.c._id, 1, -1).over(order_by=table.c._id),
+            func.lead(table.c._id).over(order_by=table.c._id),
+            func.lag(table.c._pickle).over(order_by=table.c._id),
+        ]).order_by(table.c._id)
+        results = list(self.engine.select(sel))
+        self.assertEqual(len(results), len(records))
+        
+        seen = dict()
+        running = 0
+        sorted_int = sorted([_int for _, _int in records])
+        for i, ((_id, _int), result) in enumerate(zip(records, results)):
+            seen[_int] = seen.get(_int, 0) + 1
+            running += _int
+            self.assertEqual(result[0], _id)
+            self.assertEqual(result[1], seen[_int])
+            self.assertEqual(result[2], sorted_int.index(_int) + 1)
+            self.assertEqual(result[3], running)
+            if i == 0:
+                self.assertEqual(result[4], -1)
+                self.assertEqual(result[6], None)
+            else:
+                self.assertEqual(result[4], records[i - 1][0])
+                self.assertIsInstance(result[6], list) # PICKLETYPE
+            if i == len(records) - 1:
+                self.assertEqual(result[5], None)
+            else:
+                self.assertEqual(result[5], records[i + 1][0])
+    
+    def test_top_n_per_group(self):
+        """测试Sqlite3Engine.top_n_per_group()。
+        """
+        table = self.all_type
+        expected = dict()
+        for _id, _int, _float in self.engine.select(
+                Select([table.c._id, table.c._int, table.c._float]).\
+                where(table.c._id <= 500)):
+            expected.setdefault(_int, list()).append((-_float, _id))
+        expected_ids = list()
+        for _int in sorted(expected):
+            expected_ids.extend([_id for _, _id in sorted(expected[_int])[:2]])
+        
+        sel = Select([table.c._id, table.c._int, table.c._pickle]).\
+            where(table.c._id <= 500)
+        results = list(self.engine.top_n_per_group(sel, group=table.c._int, 
+            order=[desc(table.c._float), table.c._id], n=2))
+        self.assertEqual([r[0] for r in results], expected_ids)
+        self.assertEqual(len(results[0]), 3)
+        self.assertIsInstance(results[0][2], list)
+        
+        # grouped select with parameterised key
+        mod = SQL_Param("%s %% ?" % table.c._int.full_name, params=[3])
+        sel = Select([func.count(table.c._id)]).group_by(mod).\
+            having(func.count(table.c._id) >= 1)
+        results = list(self.engine.top_n_per_group(sel, group=mod, 
+            order=desc("COUNT(all_type._id)"), n=1))
+        counts = dict()
+        for (_int,) in self.engine.select(Select([table.c._int])):
+            key = None if _int is None else _int % 3
+            counts[key] = counts.get(key, 0) + 1
+        self.assertEqual(sorted([r[0] for r in results]), 
+                         sorted(counts.values()))
             
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
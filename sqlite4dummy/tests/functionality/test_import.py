@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本测试模块用于测试可选依赖 (pandas, numpy, pyarrow) 不会在导入包时被加载。导入
+耗时的测试在 ``tests/performance/test_performance_import.py`` 中。
+
+
+class, method, func, exception
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+from __future__ import print_function, unicode_literals
+import subprocess
+import unittest
+import json
+import sys
+import os
+
+SCRIPT = """
+import json, sys, time
+import sqlite3
+st = time.time()
+import sqlite4dummy
+elapsed = time.time() - st
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+def run_import():
+    """Import sqlite4dummy in a fresh interpreter, returns (elapsed, modules).
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None) # measure with .pyc, like users
+    root = os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__)))))
+    output = subprocess.check_output(
+        [sys.executable, "-c", SCRIPT], cwd=root, env=env)
+    data = json.loads(output.decode("utf-8").strip().splitlines()[-1])
+    return data["elapsed"], set(data["modules"])
+
+class ImportUnittest(unittest.TestCase):
+    def test_optional_dependency_not_imported(self):
+        """pandas, numpy和pyarrow只在第一次使用时导入。
+        """
+        _, modules = run_import()
+        for name in ["pandas", "numpy", "pyarrow", "gzip", "bz2", "logging"]:
+            self.assertNotIn(name, modules)
+
+if __name__ == "__main__":
+    unittest.main()
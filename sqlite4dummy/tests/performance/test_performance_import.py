@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本测试模块用于测试 ``import sqlite4dummy`` 的耗时。
+
+
+class, method, func, exception
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
+
+from __future__ import print_function, unicode_literals
+from sqlite4dummy.tests.functionality.test_import import run_import
+import unittest
+
+# seconds, import sqlite4dummy after sqlite3 is already imported, about 8 ms
+IMPORT_BUDGET = 0.02
+
+class ImportPerformanceUnittest(unittest.TestCase):
+    def test_import_time(self):
+        """``import sqlite4dummy`` 在sqlite3之外的耗时需在预算之内。
+        """
+        run_import() # warm up, compile .pyc
+        elapsed = min([run_import()[0] for _ in range(5)])
+        print("import sqlite4dummy: %.2f ms" % (elapsed * 1000))
+        self.assertLess(elapsed, IMPORT_BUDGET)
+
+if __name__ == "__main__":
+    unittest.main()